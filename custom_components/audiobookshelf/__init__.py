@@ -5,15 +5,24 @@ from collections.abc import Mapping
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_API_KEY, CONF_URL
+from homeassistant.const import CONF_API_KEY, CONF_URL, Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.typing import ConfigType
 
 from .audiobook_shelf_data_update_coordinator import AudiobookShelfDataUpdateCoordinator
-from .const import DOMAIN, PLATFORMS, scan_interval_for
+from .catalog import catalog_store_for
+from .const import (
+    CONF_TRACE_EXPORT,
+    DOMAIN,
+    check_for_updates_for,
+    platforms_for,
+    scan_interval_for,
+)
+from .poll_load import poll_load_issue_id
 from .services import async_setup_services
 
 type AudiobookshelfConfigEntry = ConfigEntry[AudiobookShelfDataUpdateCoordinator]
@@ -23,14 +32,18 @@ CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 _LOGGER = logging.getLogger(__name__)
 
 
+# The trace export URL is an option, and may carry its collector's
+# credentials in its user info or query.
+TO_REDACT = frozenset({CONF_API_KEY, CONF_TRACE_EXPORT})
+
+
 def clean_config(data: Mapping[str, Any]) -> dict[str, Any]:
-    """Return a copy of the config with the API key masked."""
+    """Return a copy of the config or options with credentials masked."""
     # Builds a new mapping rather than editing in place: the previous version
     # swallowed any exception and returned the argument untouched, so its
     # failure mode was to log the credential it exists to hide.
     return {
-        key: "<redacted>" if key == CONF_API_KEY else value
-        for key, value in data.items()
+        key: "<redacted>" if key in TO_REDACT else value for key, value in data.items()
     }
 
 
@@ -104,6 +117,10 @@ async def async_setup_entry(
         token=entry.data[CONF_API_KEY],
     )
 
+    # Restored before the first refresh so services can answer from the
+    # previous run's catalog and only fetch what changed since.
+    await coordinator.catalog.async_load()
+
     # This doubles as the setup-time connection test, raising
     # ConfigEntryNotReady or ConfigEntryAuthFailed as appropriate, so no
     # separate probe over its own session is needed.
@@ -111,23 +128,85 @@ async def async_setup_entry(
 
     entry.runtime_data = coordinator
 
+    # Not a first refresh of its own: scans are an extra, and a server
+    # without /api/tasks or a socket should not keep the entry from loading.
+    await coordinator.scans.async_refresh()
+    await coordinator.probe.async_refresh()
+
     # The options flow only writes the entry; without this a changed scan
     # interval would not take effect until Home Assistant restarted.
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    coordinator.platforms = platforms_for(entry)
+    if Platform.UPDATE not in coordinator.platforms:
+        # Opted out while Home Assistant was stopped.
+        _remove_update_entity(hass, entry)
+    await hass.config_entries.async_forward_entry_setups(entry, coordinator.platforms)
     return True
 
 
-async def async_reload_entry(
+@callback
+def _remove_update_entity(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the update entity from the registry, if it was ever created."""
+    # Otherwise it would linger as an entity no longer being provided.
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id(
+        Platform.UPDATE, DOMAIN, f"{entry.entry_id}_server_update"
+    )
+    if entity_id is not None:
+        _LOGGER.debug("Update checking is disabled, removing %s", entity_id)
+        registry.async_remove(entity_id)
+
+
+async def _async_sync_update_platform(
+    hass: HomeAssistant, entry: AudiobookshelfConfigEntry
+) -> None:
+    """Set up or unload the update platform to match its option."""
+    platforms = entry.runtime_data.platforms
+    wanted = check_for_updates_for(entry)
+    if wanted == (Platform.UPDATE in platforms):
+        return
+    # The list is changed before awaiting, so a second change arriving
+    # meanwhile sees the platform as already on its way in or out.
+    if wanted:
+        platforms.append(Platform.UPDATE)
+        await hass.config_entries.async_forward_entry_setups(entry, [Platform.UPDATE])
+        return
+    platforms.remove(Platform.UPDATE)
+    await hass.config_entries.async_unload_platforms(entry, [Platform.UPDATE])
+    _remove_update_entity(hass, entry)
+
+
+async def async_update_options(
     hass: HomeAssistant, entry: AudiobookshelfConfigEntry
 ) -> None:
-    """Reload the entry when its configuration changes."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply a configuration change, reloading only when the server changed."""
+    coordinator = entry.runtime_data
+    if (entry.data[CONF_URL], entry.data[CONF_API_KEY]) != (
+        coordinator.api_url,
+        coordinator.token,
+    ):
+        # Another server, or another account on it: nothing held is valid.
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    # Everything else is applied to the running entry.
+    await _async_sync_update_platform(hass, entry)
+    coordinator.async_apply_options(entry)
 
 
 async def async_unload_entry(
     hass: HomeAssistant, entry: AudiobookshelfConfigEntry
 ) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    return await hass.config_entries.async_unload_platforms(
+        entry, entry.runtime_data.platforms
+    )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the persisted library catalog and any issue along with the entry."""
+    # The catalog can run to megabytes on a large server and nothing else
+    # would ever clean it up.
+    await catalog_store_for(hass, entry.entry_id).async_remove()
+    # Its fix would apply to an entry that no longer exists.
+    ir.async_delete_issue(hass, DOMAIN, poll_load_issue_id(entry.entry_id))
@@ -1,10 +1,14 @@
 """Module containing the data update coordinator the Audiobookshelf integration."""
 
+import asyncio
+import math
 import time
-from dataclasses import dataclass
-from datetime import timedelta
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import partial
 from logging import getLogger
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated, Any, cast
 
 from aioaudiobookshelf import (
     AdminClient,
@@ -21,24 +25,186 @@ from aioaudiobookshelf.schema import _BaseModel
 from aioaudiobookshelf.schema.library import Library
 from aioaudiobookshelf.schema.session import PlaybackSession
 from aioaudiobookshelf.schema.user import _UserBase
-from aiohttp import ClientError
+from aiohttp import ClientError, ClientResponse, ClientSession
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 from mashumaro.types import Alias
 
-from .const import REQUEST_TIMEOUT
+from .cache import ResponseCache
+from .catalog import LibraryCatalog, catalog_store_for
+from .connection import ConnectionStats, create_session
+from .const import (
+    DOMAIN,
+    LIBRARIES_ENDPOINT,
+    LIBRARY_START_SPACING_SECONDS,
+    PAGINATION_ITEMS_PER_PAGE,
+    POLL_DEADLINE_FRACTION,
+    POLL_LOAD_ISSUE,
+    REQUEST_TIMEOUT,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTLS,
+    SERVER_SETTINGS_ENDPOINT,
+    STALE_AFTER_POLLS,
+    USER_ENDPOINT,
+    USER_PROGRESS_MAX_AGE,
+    endpoint_timeout,
+    hedge_requests_for,
+    library_max_age_for,
+    library_scan_interval_for,
+    library_stats_per_poll_for,
+    max_concurrent_requests_for,
+    max_requests_per_second_for,
+    scan_interval_for,
+)
+from .freshness import MetricFreshness, metric_key
+from .hedging import Hedger
+from .limiter import (
+    LimitedSession,
+    Priority,
+    RequestCount,
+    RequestLimiter,
+    request_priority,
+)
+from .poll_load import PollLoad, poll_load_issue_id
+from .reachability import ReachabilityProbe
+from .scans import LibraryScanCoordinator
+from .scheduler import scheduler_for
+from .tracing import SpanKind, current_span, record_response, span, tracer_for
+
+if TYPE_CHECKING:
+    from homeassistant.const import Platform
 
 _LOGGER = getLogger(__name__)
 
+type PollStep = tuple[
+    str, str, tuple[str, ...], Callable[[], Awaitable[dict[str, Any]]]
+]
+
+
+@dataclass
+class _Poll:
+    """State shared by the steps of one poll."""
+
+    # On the event loop's clock, which is monotonic.
+    deadline: float
+    failures: list[tuple[str, Exception]] = field(default_factory=list)
+    # Wall time of each step that ran, for profile_poll.
+    step_seconds: dict[str, float] = field(default_factory=dict)
+    # The users as this poll listed them, None if that failed, and those
+    # online or with a session open, whose progress may be moving.
+    users: list["UserSummary"] | None = None
+    active_users: set[str] = field(default_factory=set)
+
+
+@dataclass(kw_only=True)
+class _ProgressSummary(_BaseModel):
+    """The fields of a media progress entry the user sensors read."""
+
+    episode_id: Annotated[str | None, Alias("episodeId")] = None
+    is_finished: Annotated[bool, Alias("isFinished")] = False
+    last_update: Annotated[int | None, Alias("lastUpdate")] = None  # ms epoch
+
+
+@dataclass(kw_only=True)
+class UserSummary(_UserBase):
+    """A user as /api/users lists them, read only as far as the sensors need."""
+
+    last_seen: Annotated[int | None, Alias("lastSeen")] = None  # ms epoch
+
+
+@dataclass(kw_only=True)
+class UserWithProgress(UserSummary):
+    """A user as /api/users/{id} returns them, progress and all."""
+
+    # None when the server leaves it out, rather than claiming nothing was
+    # ever started.
+    media_progress: Annotated[list[_ProgressSummary] | None, Alias("mediaProgress")] = (
+        None
+    )
+
 
 @dataclass(kw_only=True)
 class AllUsersResponse(_BaseModel):
     """AllUsersResponse."""
 
-    users: list[_UserBase]
+    # The server lists users in their minimal form, without their progress.
+    users: list[UserSummary]
+
+
+def _from_ms(value: int | None) -> datetime | None:
+    """Return a millisecond epoch from the server as an aware datetime."""
+    return dt_util.utc_from_timestamp(value / 1000) if value else None
+
+
+@dataclass(slots=True)
+class ProgressTotals:
+    """What a user's progress adds up to, kept in place of the progress itself."""
+
+    books_in_progress: int | None
+    books_finished: int | None
+    last_listened: datetime | None
+
+    @classmethod
+    def from_user(cls, user: UserWithProgress) -> "ProgressTotals":
+        """Total user's progress in one pass."""
+        in_progress = finished = 0
+        last_update = 0
+        for progress in user.media_progress or ():
+            last_update = max(last_update, progress.last_update or 0)
+            # Podcast episodes are listened to, but not books.
+            if progress.episode_id is not None:
+                continue
+            if progress.is_finished:
+                finished += 1
+            else:
+                in_progress += 1
+        known = user.media_progress is not None
+        return cls(
+            books_in_progress=in_progress if known else None,
+            books_finished=finished if known else None,
+            last_listened=_from_ms(last_update),
+        )
+
+
+@dataclass(slots=True)
+class _FetchedProgress:
+    """A user's progress totals, with when they were fetched."""
+
+    totals: ProgressTotals
+    # On the event loop's clock.
+    fetched_at: float
+    # Whether the user was listening then, so the poll after they stop
+    # still picks up their last progress.
+    active: bool
+
+
+@dataclass(slots=True)
+class UserActivity:
+    """What the sensors show of one user, kept in place of the user itself."""
+
+    username: str
+    books_in_progress: int | None
+    books_finished: int | None
+    last_seen: datetime | None
+    last_listened: datetime | None
+
+    @classmethod
+    def from_user(
+        cls, user: UserSummary, totals: ProgressTotals | None
+    ) -> "UserActivity":
+        """Combine user as listed with their progress, None while unknown."""
+        return cls(
+            username=user.username,
+            books_in_progress=totals.books_in_progress if totals else None,
+            books_finished=totals.books_finished if totals else None,
+            last_seen=_from_ms(user.last_seen),
+            last_listened=totals.last_listened if totals else None,
+        )
 
 
 @dataclass(kw_only=True)
@@ -77,6 +243,55 @@ class OpenSessionsResponse(_BaseModel):
         ]
 
 
+def _device_name(session: PlaybackSession) -> str:
+    """Return what a session's listener would call the device it plays on."""
+    # Apps send a make and model; the web client sends neither, so it goes
+    # by its client name, and failing that by the player it uses.
+    info = session.device_info
+    make_and_model = " ".join(part for part in (info.manufacturer, info.model) if part)
+    return make_and_model or info.client_name or session.media_player
+
+
+@dataclass(slots=True)
+class Listening:
+    """Who listens where, for one user, device or library's open sessions."""
+
+    sessions: int = 0
+    users: set[str] = field(default_factory=set)
+    devices: set[str] = field(default_factory=set)
+    libraries: set[str] = field(default_factory=set)
+
+
+def listening_breakdown(
+    sessions: Sequence[PlaybackSession],
+) -> dict[str, dict[str, Listening]]:
+    """Group sessions by user, by device and by library, in one pass."""
+    # Only ids and device names are kept: a session carries its item's full
+    # metadata and chapter list, none of which the sensors show.
+    by_user: dict[str, Listening] = {}
+    by_device: dict[str, Listening] = {}
+    by_library: dict[str, Listening] = {}
+    for session in sessions:
+        device = _device_name(session)
+        for groups, key in (
+            (by_user, session.user_id),
+            (by_device, device),
+            (by_library, session.library_id),
+        ):
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = Listening()
+            group.sessions += 1
+            group.users.add(session.user_id)
+            group.devices.add(device)
+            group.libraries.add(session.library_id)
+    return {
+        "listening_by_user": by_user,
+        "listening_by_device": by_device,
+        "listening_by_library": by_library,
+    }
+
+
 @dataclass(kw_only=True)
 class AuthSessionsResponse(_BaseModel):
     """AuthSessionsResponse."""
@@ -100,6 +315,10 @@ class AudiobookShelfDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Audiobookshelf data from the API."""
 
     _client: AdminClient | None = None
+    _session: ClientSession | None = None
+    # Whether the poll load issue is raised, None until the current
+    # interval has enough polls behind it to say.
+    _poll_load_heavy: bool | None = None
     api_url: str = ""
 
     def __init__(
@@ -114,7 +333,35 @@ class AudiobookShelfDataUpdateCoordinator(DataUpdateCoordinator):
         self.api_url = api_url
         self.token = token
         self.libraries: list[Library] = []
+        # Each user's progress as last fetched, by user id.
+        self._user_progress: dict[str, _FetchedProgress] = {}
+        self.library_scan_interval = library_scan_interval_for(config_entry)
+        self.library_stats_per_poll = library_stats_per_poll_for(config_entry)
+        self.library_max_age = library_max_age_for(config_entry)
+        self.library_coordinators: dict[str, LibraryStatsCoordinator] = {}
         self.server_version: str | None = None
+        # The platforms forwarded for the entry, which change with the update
+        # option, so that unloading it unloads exactly those.
+        self.platforms: list[Platform] = []
+        # The entry's most recent poll, whose step timings profile_poll
+        # reports.
+        self.last_poll: _Poll | None = None
+        self.poll_load = PollLoad()
+        self.catalog = LibraryCatalog(catalog_store_for(hass, config_entry.entry_id))
+        self.response_cache = ResponseCache(
+            RESPONSE_CACHE_TTLS, max_entries=RESPONSE_CACHE_SIZE
+        )
+        self.connection_stats = ConnectionStats()
+        self.tracer = tracer_for(hass, config_entry, api_url)
+        self.scheduler = scheduler_for(hass)
+        self.hedger = Hedger(enabled=hedge_requests_for(config_entry))
+        self.limiter = RequestLimiter(
+            rate=max_requests_per_second_for(config_entry),
+            max_concurrent=max_concurrent_requests_for(config_entry),
+        )
+        self.freshness = MetricFreshness(
+            timedelta(seconds=scan_interval * STALE_AFTER_POLLS)
+        )
 
         super().__init__(
             hass,
@@ -123,17 +370,35 @@ class AudiobookShelfDataUpdateCoordinator(DataUpdateCoordinator):
             name="audiobookshelf",
             update_interval=timedelta(seconds=scan_interval),
         )
+        # Built after the entry's own coordinator, whose hass and entry it
+        # takes, and started once the first poll has the libraries.
+        self.scans = LibraryScanCoordinator(self)
+        self.probe = ReachabilityProbe(self)
+
+    @property
+    def http_session(self) -> ClientSession:
+        """Return the entry's own session, creating it on first use."""
+        if self._session is None:
+            self._session = create_session(self.connection_stats)
+        return self._session
 
     async def get_client(self) -> AdminClient:
         """Get the client to interact with the API."""
         if self._client is None:
-            client_session = async_get_clientsession(self.hass)
+            # Every request the client makes, including building it, goes
+            # through the limiter, whoever asked for the client.
+            client_session = LimitedSession(
+                self.http_session,
+                self.limiter,
+                self._on_response,
+                self.scheduler.budget,
+            )
             self._client = await get_admin_client_by_token(
                 session_config=SessionConfiguration(
-                    session=client_session,
+                    session=cast("ClientSession", client_session),
                     url=self.api_url,
                     logger=_LOGGER,
-                    pagination_items_per_page=30,
+                    pagination_items_per_page=PAGINATION_ITEMS_PER_PAGE,
                     token=self.token,
                     timeout=REQUEST_TIMEOUT,
                 ),
@@ -143,91 +408,360 @@ class AudiobookShelfDataUpdateCoordinator(DataUpdateCoordinator):
             # request. It is only refreshed when the client is rebuilt, which
             # is fine for something shown on the device page.
             self.server_version = self._client.server_settings.version
+            self.response_cache.set(
+                SERVER_SETTINGS_ENDPOINT, self._client.server_settings
+            )
         return self._client
 
+    def _on_response(self, response: ClientResponse, body: bytes) -> None:
+        """Account for one fully read response."""
+        self.connection_stats.record_response(response, body)
+        record_response(response, body)
+
+    async def async_shutdown(self) -> None:
+        """Stop polling and close the entry's own session."""
+        await super().async_shutdown()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._client = None
+
     async def async_refresh_server_version(self) -> str | None:
         """Re-read the server version by rebuilding the client."""
         # The version only arrives with /api/authorize, which is what building
         # the client does, so there is nowhere else to read it from without
         # relying on serverVersion in /status, which is undocumented. Dropping
         # the cached client is safe: anything mid-flight holds its own
-        # reference, and the next call rebuilds.
-        self._client = None
-        await self.get_client()
+        # reference, and the next call rebuilds. Not while the settings
+        # from the last build are fresh, such as just after setup.
+        if self.response_cache.get(SERVER_SETTINGS_ENDPOINT) is None:
+            self._client = None
+            await self.get_client()
         return self.server_version
 
-    async def get_libraries(self) -> list[Library]:
-        """Fetch library id list from API."""
-        return await (await self.get_client()).get_all_libraries()  # type: ignore[no-any-return]
+    async def get_libraries(self, *, fresh: bool = False) -> list[Library]:
+        """Fetch library id list from API, or the cached one while fresh."""
+
+        async def _fetch() -> list[Library]:
+            return await (await self.get_client()).get_all_libraries()  # type: ignore[no-any-return]
+
+        if not fresh:
+            return await self.response_cache.async_get(LIBRARIES_ENDPOINT, _fetch)
+        libraries = await _fetch()
+        # Refills the cache, so actions and searches go on from this list.
+        self.response_cache.set(LIBRARIES_ENDPOINT, libraries)
+        return libraries
+
+    async def async_sync_catalog(self) -> LibraryCatalog:
+        """Bring the library catalog up to date and return it."""
+        # Reuses the library list from the last poll when there is one. A
+        # library created since then is picked up by the next poll, and one
+        # deleted since then fails its walk the same way a full scan would.
+        client = await self.get_client()
+        libraries = self.libraries or await self.get_libraries()
+        await self.catalog.async_sync(client, [library.id_ for library in libraries])
+        return self.catalog
+
+    async def _get(self, endpoint: str, route: str | None = None) -> bytes:
+        """GET an endpoint for a poll, hedged if the user has opted in."""
+        client = await self.get_client()
+        fetch = partial(client._get, endpoint)  # noqa: SLF001
+        # Timed by route, so every user's record shares one hedging delay.
+        return await self.hedger.run(route or endpoint, fetch)  # type: ignore[no-any-return]
+
+    async def users(self) -> list[UserSummary]:
+        """Fetch every user from API."""
+        response = await self._get("api/users")
+        return AllUsersResponse.from_json(response).users
+
+    async def user_with_progress(self, user_id: str) -> UserWithProgress:
+        """Fetch one user from API, with their progress."""
+        response = await self._get(f"api/users/{user_id}", USER_ENDPOINT)
+        return UserWithProgress.from_json(response)
 
     async def count_users(self) -> int:
         """Fetch and count active users from API."""
-        response_cls: type[AllUsersResponse] = AllUsersResponse
-        client = await self.get_client()
-        response = await client._get("api/users")  # noqa: SLF001
-        users = response_cls.from_json(response).users
-        return len(users)
+        return len(await self.users())
 
     async def open_sessions(self) -> OpenSessionsResponse:
         """Fetch open sessions from API."""
         # Fetched once per poll and used for both the open and recent counts.
         # Fetching twice made it possible for a session ending between the two
         # calls to report more recent sessions than open ones.
-        client = await self.get_client()
-        response = await client._get("api/sessions/open")  # noqa: SLF001
+        response = await self._get("api/sessions/open")
         return OpenSessionsResponse.from_json(response)
 
     async def count_auth_sessions(self) -> int | None:
         """Fetch and count auth sessions from API, None if server lacks endpoint."""
-        client = await self.get_client()
         try:
-            response = await client._get("api/me/sessions")  # noqa: SLF001
+            response = await self._get("api/me/sessions")
         except NotFoundError:  # endpoint requires Audiobookshelf v2.36.0 or newer
             return None
         return AuthSessionsResponse.from_json(response).total
 
+    async def users_online(self) -> list[_UserBase]:
+        """Fetch the users online from API."""
+        response = await self._get("api/users/online")
+        return UsersOnlineResponse.from_json(response).users_online
+
     async def count_users_online(self) -> int:
         """Fetch and count users online from API."""
-        client = await self.get_client()
-        response = await client._get("api/users/online")  # noqa: SLF001
-        users_online = UsersOnlineResponse.from_json(response).users_online
-        return len(users_online)
+        return len(await self.users_online())
 
-    async def library_stats(self) -> dict[str, LibraryStats]:
-        """Fetch library stats from API."""
-        libraries = await self.get_libraries()
-        client = await self.get_client()
-        stats = {}
-        for library in libraries:
-            response = await client._get(f"api/libraries/{library.id_}/stats")  # noqa: SLF001
-            stats[library.id_] = LibraryStats.from_json(response)
+    async def library_stats(self, library: Library) -> LibraryStats:
+        """Fetch one library's stats from API."""
+        try:
+            response = await self._get(f"api/libraries/{library.id_}/stats")
+        except NotFoundError:
+            # Deleted from the server, so the cached list is out of date:
+            # the next poll fetches it again and detaches the library.
+            self.response_cache.invalidate(LIBRARIES_ENDPOINT)
+            raise
+        return LibraryStats.from_json(response)
+
+    async def _poll_users(self, poll: _Poll) -> dict[str, Any]:
+        """Poll the user count, keeping the users for their progress."""
+        poll.users = await self.users()
+        return {"count_users": len(poll.users)}
+
+    async def _poll_users_online(self, poll: _Poll) -> dict[str, Any]:
+        """Poll the online user count."""
+        users_online = await self.users_online()
+        poll.active_users.update(user.id_ for user in users_online)
+        return {"count_users_online": len(users_online)}
+
+    async def _poll_user_progress(self, poll: _Poll) -> dict[str, Any]:
+        """Poll the progress of the users whose progress may have moved."""
+        # /api/users leaves progress out, so it costs a request per user.
+        # Progress only moves while someone listens, so only those online or
+        # listening are asked again, with everyone else once in a while in
+        # case it was changed some other way.
+        if poll.users is None:
+            msg = "the user list could not be fetched"
+            raise AbsError(msg)
+        now = asyncio.get_running_loop().time()
+        listed = {user.id_ for user in poll.users}
+        for user_id in self._user_progress.keys() - listed:
+            del self._user_progress[user_id]
+        due = [
+            user_id
+            for user_id in listed
+            if (fetched := self._user_progress.get(user_id)) is None
+            or fetched.active
+            or user_id in poll.active_users
+            or now - fetched.fetched_at >= USER_PROGRESS_MAX_AGE
+        ]
+
+        async def _fetch(user_id: str) -> None:
+            try:
+                user = await self.user_with_progress(user_id)
+            except NotFoundError:
+                return  # Deleted since the list; gone from the next one.
+            # Kept one by one, so a step cut short still keeps what it got.
+            self._user_progress[user_id] = _FetchedProgress(
+                ProgressTotals.from_user(user), now, user_id in poll.active_users
+            )
+
+        # Every fetch runs to its end before the step does, so none is left
+        # writing into a later poll; a user whose fetch failed keeps their
+        # last progress, and the first failure fails the step.
+        results = await asyncio.gather(
+            *(_fetch(user_id) for user_id in due), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return {
+            "user_activity": {
+                user.id_: UserActivity.from_user(
+                    user,
+                    fetched.totals
+                    if (fetched := self._user_progress.get(user.id_))
+                    else None,
+                )
+                for user in poll.users
+            }
+        }
+
+    async def _poll_open_sessions(self, poll: _Poll) -> dict[str, Any]:
+        """Poll the open and recent session counts, and who they belong to."""
+        open_sessions = await self.open_sessions()
+        poll.active_users.update(session.user_id for session in open_sessions.sessions)
+        return {
+            "count_open_sessions": len(open_sessions.sessions),
+            "count_recent_sessions": len(open_sessions.filter_active_sessions()),
+            **listening_breakdown(open_sessions.sessions),
+        }
+
+    async def _poll_auth_sessions(self) -> dict[str, Any]:
+        """Poll the auth session count."""
+        return {"count_auth_sessions": await self.count_auth_sessions()}
+
+    async def _poll_libraries(self) -> dict[str, Any]:
+        """Poll the library list."""
         # Kept so the sensor platform can name its entities without issuing a
-        # second /api/libraries call of its own.
-        self.libraries = libraries
-        return stats
+        # second /api/libraries call of its own. Always fetched: the cached
+        # list is kept for much longer than a scan interval, and a library
+        # created meanwhile would go that long without sensors.
+        self.libraries = await self.get_libraries(fresh=True)
+        return {"count_libraries": len(self.libraries)}
 
-    async def _async_update_data(self) -> dict:
-        """Fetch data from API endpoint."""
-        step = "users"
+    @callback
+    def async_attach_library(self, library: Library) -> "LibraryStatsCoordinator":
+        """Return the coordinator for a library, starting one if it is new."""
+        child = self.library_coordinators.get(library.id_)
+        if child is not None:
+            # Picks up a rename for the step names in the log.
+            child.library = library
+            return child
+        child = LibraryStatsCoordinator(self, library)
+        # Started a little apart rather than all at once, so their stats
+        # requests stay spread across the interval instead of arriving
+        # together every time. Each keeps its phase from then on, since
+        # the next refresh is always scheduled from the end of the last.
+        delay = (
+            len(self.library_coordinators) * LIBRARY_START_SPACING_SECONDS
+        ) % self.library_scan_interval
+        self.library_coordinators[library.id_] = child
+        self.freshness.set_max_age(child.metric, self._library_max_age())
+        # Started even when rotating, so every library has stats shortly
+        # after setup rather than once rotation first reaches it.
+        child.async_start(delay)
+        return child
+
+    @callback
+    def async_detach_library(self, library_id: str) -> None:
+        """Stop polling a library that is gone from the server."""
+        child = self.library_coordinators.pop(library_id, None)
+        if child is None:
+            return
+        # Its sensors go unavailable at once rather than serving stats for a
+        # library that no longer exists.
+        self.freshness.forget(child.metric)
+        child.async_update_listeners()
+        if self.config_entry is not None:
+            self.config_entry.async_create_background_task(
+                self.hass,
+                child.async_shutdown(),
+                name=f"audiobookshelf library {library_id} shutdown",
+            )
+
+    def _library_max_age(self) -> timedelta:
+        """Return how old a library's stats may get before they are not shown."""
+        # Rotation refreshes each library once per maximum age at most, so
+        # that is what stale is measured in.
+        period = (
+            self.library_max_age
+            if self.library_stats_per_poll
+            else self.library_scan_interval
+        )
+        return timedelta(seconds=period * STALE_AFTER_POLLS)
+
+    @callback
+    def async_apply_options(self, entry: ConfigEntry) -> None:
+        """Apply changed options in place, keeping the client and the data."""
+        # A reload would rebuild the client, every entity and every library
+        # coordinator, and fetch everything again, to change one number.
+        scan_interval = scan_interval_for(entry)
+        if self.update_interval != timedelta(seconds=scan_interval):
+            # Polls timed against the old interval say nothing about the
+            # new one. An issue raised about it is left for the new
+            # interval's polls to clear or to raise again.
+            self.poll_load.reset()
+            self._poll_load_heavy = None
+        self.update_interval = timedelta(seconds=scan_interval)
+        self.freshness.max_age = timedelta(seconds=scan_interval * STALE_AFTER_POLLS)
+        self.hedger.enabled = hedge_requests_for(entry)
+        self.tracer = tracer_for(self.hass, entry, self.api_url)
+        self.limiter.configure(
+            rate=max_requests_per_second_for(entry),
+            max_concurrent=max_concurrent_requests_for(entry),
+        )
+        self.library_scan_interval = library_scan_interval_for(entry)
+        self.library_stats_per_poll = library_stats_per_poll_for(entry)
+        self.library_max_age = library_max_age_for(entry)
+        for child in self.library_coordinators.values():
+            child.update_interval = child.interval_for(self)
+            self.freshness.set_max_age(child.metric, self._library_max_age())
+            child.async_reschedule()
+        self.async_reschedule()
+
+    @callback
+    def async_reschedule(self) -> None:
+        """Start the wait for the next refresh over, on the current interval."""
+        # Otherwise a shorter interval would only apply after the refresh
+        # already scheduled on the old one, up to a whole old interval away.
+        self._async_unsub_refresh()
+        if self._listeners:
+            self._schedule_refresh()
+
+    def _libraries_to_rotate(self) -> list["LibraryStatsCoordinator"]:
+        """Pick the libraries whose stats this poll refreshes, oldest first."""
+        if not self.library_stats_per_poll:
+            return []
+        never = dt_util.utc_from_timestamp(0)
+        children = sorted(
+            self.library_coordinators.values(),
+            key=lambda child: self.freshness.fetched_at(child.metric) or never,
+        )
+        # Polls due before the oldest would pass its maximum age. Enough
+        # libraries go each time for all of them to be through by then.
+        interval = (self.update_interval or timedelta(0)).total_seconds()
+        polls = max(1, int(self.library_max_age // max(interval, 1)))
+        size = max(self.library_stats_per_poll, math.ceil(len(children) / polls))
+        return children[:size]
+
+    async def _async_step[T](
+        self,
+        poll: _Poll,
+        step: str,
+        endpoint: str,
+        keys: Sequence[str],
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T | None:
+        """Run one step of a poll, returning None when it failed."""
+        attributes = {"audiobookshelf.step": step, "url.path": endpoint}
+        with span(f"GET {endpoint}", attributes, SpanKind.CLIENT):
+            return await self._async_run_step(poll, step, endpoint, keys, fetch)
+
+    async def _async_run_step[T](
+        self,
+        poll: _Poll,
+        step: str,
+        endpoint: str,
+        keys: Sequence[str],
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T | None:
+        """Run one step of a poll within its span."""
+        loop = asyncio.get_running_loop()
+        if loop.time() >= poll.deadline:
+            # Skipped outright rather than started with no time to finish, so
+            # the poll ends on schedule and the next one starts on time.
+            err = TimeoutError("poll deadline reached")
+            self._step_failed(poll, keys, f"No time left to fetch {step}", err)
+            return None
+        # Whichever comes first, the endpoint's own limit or the poll's.
+        started = loop.time()
+        timeout_at = min(poll.deadline, started + endpoint_timeout(endpoint))
         try:
-            count_users = await self.count_users()
-            step = "users online"
-            count_users_online = await self.count_users_online()
-            step = "open sessions"
-            open_sessions = await self.open_sessions()
-            step = "auth sessions"
-            count_auth_sessions = await self.count_auth_sessions()
-            step = "library stats"
-            library_stats = await self.library_stats()
+            async with asyncio.timeout_at(timeout_at):
+                result = await fetch()
         except BadUserError as err:
             msg = "The Audiobookshelf API key must belong to an admin user"
             raise ConfigEntryAuthFailed(msg) from err
         except AbsAuthError as err:
             msg = "Authentication with Audiobookshelf failed"
             raise ConfigEntryAuthFailed(msg) from err
+        except TimeoutError as err:
+            # Caught ahead of ClientError, which aiohttp's own timeouts also
+            # are, so every timeout reads the same way whichever fired.
+            msg = f"Timed out fetching {step} from Audiobookshelf"
+            self._step_failed(poll, keys, msg, err)
+            return None
         except (AbsError, ClientError) as err:
             msg = f"Error fetching {step} from Audiobookshelf"
-            raise UpdateFailed(msg) from err
+            self._step_failed(poll, keys, msg, err)
+            return None
         except (ValueError, LookupError) as err:
             # Every from_json call raises mashumaro's MissingField (LookupError)
             # or InvalidFieldValue (ValueError) on schema drift, and a non-JSON
@@ -235,16 +769,259 @@ class AudiobookShelfDataUpdateCoordinator(DataUpdateCoordinator):
             # AbsError or ClientError, so without this they escape as an
             # unhandled exception and log a traceback on every poll.
             msg = f"Unexpected response from Audiobookshelf fetching {step}"
+            self._step_failed(poll, keys, msg, err)
+            return None
+        finally:
+            poll.step_seconds[step] = loop.time() - started
+        for key in keys:
+            self.freshness.succeeded(key)
+        return result
+
+    def _step_failed(
+        self, poll: _Poll, keys: Sequence[str], msg: str, err: Exception
+    ) -> None:
+        """Mark the metrics of a failed step stale and remember why."""
+        poll.failures.append((msg, err))
+        current_span().set_error(f"{msg}: {err}")
+        # Logged once when a metric goes stale rather than on every poll it
+        # stays that way, the same as the coordinator does for a whole poll.
+        newly_failed = [key for key in keys if self.freshness.failed(key, str(err))]
+        if newly_failed:
+            _LOGGER.warning("%s, keeping the last value: %s", msg, err)
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch data from API endpoint."""
+        if self.probe.server_down:
+            # Every request would only wait out its timeout. The values age
+            # as they would through failed polls, and the probe asks for a
+            # poll as soon as the server answers again.
+            msg = f"Skipped polling, {self.api_url} is not answering"
+            raise UpdateFailed(msg)
+        # Ahead of actions and the update entity in the limiter's queue, so
+        # a long remove_my_progress cannot make the sensors late.
+        # Another server's poll may have just started; this one waits its
+        # turn so the two do not run in lockstep.
+        await self.scheduler.async_wait_turn()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        # Only this poll's own, not the actions, probes and library polls
+        # sharing the session meanwhile.
+        requests = RequestCount()
+        try:
+            with (
+                self.tracer.root_span("poll"),
+                request_priority(Priority.POLL, requests),
+            ):
+                return await self._async_poll()
+        finally:
+            # Failed polls too: one that ran into its deadline is the
+            # clearest sign of an interval that is too short.
+            self.poll_load.record(loop.time() - started, requests.responses)
+            self._async_check_poll_load()
+
+    @callback
+    def _async_check_poll_load(self) -> None:
+        """Raise or clear the repairs issue for an interval polls outgrow."""
+        if not self.poll_load.is_full:
+            return
+        entry = self.config_entry
+        if entry is None:
+            return
+        interval = (self.update_interval or timedelta(0)).total_seconds()
+        heavy = self.poll_load.is_heavy(interval)
+        if heavy == self._poll_load_heavy:
+            # Raised once with the measurements at the time, rather than
+            # rewritten after every poll with a suggestion that drifts.
+            return
+        self._poll_load_heavy = heavy
+        if not heavy:
+            ir.async_delete_issue(self.hass, DOMAIN, poll_load_issue_id(entry.entry_id))
+            return
+        typical = self.poll_load.typical()
+        suggested = self.poll_load.suggested_interval()
+        ir.async_create_issue(
+            self.hass,
+            DOMAIN,
+            poll_load_issue_id(entry.entry_id),
+            is_fixable=True,
+            severity=ir.IssueSeverity.WARNING,
+            translation_key=POLL_LOAD_ISSUE,
+            translation_placeholders={
+                "server": entry.title,
+                "interval": str(round(interval)),
+                "seconds": f"{typical.seconds:.1f}",
+                "requests": str(typical.requests),
+                "suggested": str(suggested),
+            },
+            data={"entry_id": entry.entry_id, "scan_interval": suggested},
+        )
+
+    async def _async_poll(self) -> dict[str, Any]:
+        """Fetch every metric, each step standing alone."""
+        # One failing endpoint used to fail the whole poll and take every
+        # sensor with it. Each step now stands alone: a failed one keeps the
+        # value from the last poll it succeeded in, and each sensor goes
+        # unavailable only once its own value is too old.
+        data: dict[str, Any] = dict(self.data or {})
+        # Bounded by the scan interval, so a server that accepts connections
+        # but stalls cannot hold one poll open into the next.
+        interval = (self.update_interval or timedelta(0)).total_seconds()
+        poll = _Poll(
+            deadline=asyncio.get_running_loop().time()
+            + interval * POLL_DEADLINE_FRACTION
+        )
+        self.last_poll = poll
+        # Each step with its endpoint and the metrics it produces, so a
+        # failure marks them. Library stats are not among them: each library
+        # has a coordinator of its own, see LibraryStatsCoordinator.
+        steps: tuple[PollStep, ...] = (
+            ("users", "api/users", ("count_users",), partial(self._poll_users, poll)),
+            (
+                "users online",
+                "api/users/online",
+                ("count_users_online",),
+                partial(self._poll_users_online, poll),
+            ),
+            (
+                "open sessions",
+                "api/sessions/open",
+                (
+                    "count_open_sessions",
+                    "count_recent_sessions",
+                    "listening_by_user",
+                    "listening_by_device",
+                    "listening_by_library",
+                ),
+                partial(self._poll_open_sessions, poll),
+            ),
+            # After the steps that say who is listening.
+            (
+                "user progress",
+                USER_ENDPOINT,
+                ("user_activity",),
+                partial(self._poll_user_progress, poll),
+            ),
+            (
+                "auth sessions",
+                "api/me/sessions",
+                ("count_auth_sessions",),
+                self._poll_auth_sessions,
+            ),
+            ("libraries", "api/libraries", ("count_libraries",), self._poll_libraries),
+        )
+        succeeded = 0
+        for step, endpoint, keys, fetch in steps:
+            values = await self._async_step(poll, step, endpoint, keys, fetch)
+            if values is not None:
+                data.update(values)
+                succeeded += 1
+
+        for child in self._libraries_to_rotate():
+            child.async_set_updated_data(await child.async_fetch(poll))
+
+        if not succeeded and poll.failures:
+            # Nothing got through, so the server itself is most likely down.
+            # Failing the poll keeps the coordinator's own error reporting,
+            # while sensors still serve their last values until too old.
+            msg, err = poll.failures[0]
             raise UpdateFailed(msg) from err
-        else:
-            data = {
-                "count_users": count_users,
-                "count_users_online": count_users_online,
-                "count_open_sessions": len(open_sessions.sessions),
-                "count_recent_sessions": len(open_sessions.filter_active_sessions()),
-                "count_auth_sessions": count_auth_sessions,
-                "library_stats": library_stats,
-                "count_libraries": len(library_stats),
-            }
-            _LOGGER.debug("Fetched Audiobookshelf data: %s", data)
-            return data
+
+        _LOGGER.debug("Fetched Audiobookshelf data: %s", data)
+        return data
+
+
+class LibraryStatsCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Polls one library's stats on a schedule of its own."""
+
+    # Stats total a whole library, so they are the slowest thing polled and
+    # the most likely to time out. Apart, one slow library no longer holds
+    # up or fails the rest, and none of them delays the entry's own poll.
+
+    def __init__(
+        self, parent: AudiobookShelfDataUpdateCoordinator, library: Library
+    ) -> None:
+        """Poll library through parent's client, limiter and freshness record."""
+        self.parent = parent
+        self.library = library
+        self.metric = metric_key("library_stats", library.id_)
+        # The entry's record rather than one of its own, so diagnostics and
+        # the sensors see every metric in one place.
+        self.freshness = parent.freshness
+        self._unsub_start: CALLBACK_TYPE | None = None
+        super().__init__(
+            parent.hass,
+            _LOGGER,
+            config_entry=parent.config_entry,
+            name=f"audiobookshelf library {library.id_}",
+            update_interval=self.interval_for(parent),
+        )
+
+    @staticmethod
+    def interval_for(parent: AudiobookShelfDataUpdateCoordinator) -> timedelta | None:
+        """Return how often a library polls itself under parent's options."""
+        # No schedule of its own while rotating: the entry's poll decides
+        # when each library is next refreshed.
+        if parent.library_stats_per_poll:
+            return None
+        return timedelta(seconds=parent.library_scan_interval)
+
+    @callback
+    def async_reschedule(self) -> None:
+        """Start the wait for the next refresh over, on the current interval."""
+        self._async_unsub_refresh()
+        if self._listeners:
+            self._schedule_refresh()
+
+    @callback
+    def async_start(self, delay: float) -> None:
+        """Make the first refresh after delay seconds."""
+
+        async def _start(_now: Any) -> None:
+            self._unsub_start = None
+            await self.async_refresh()
+
+        self._unsub_start = async_call_later(self.hass, delay, _start)
+
+    async def async_shutdown(self) -> None:
+        """Stop polling, including a first refresh still waiting to start."""
+        if self._unsub_start is not None:
+            self._unsub_start()
+            self._unsub_start = None
+        await super().async_shutdown()
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch the library's stats on its own schedule."""
+        if self.parent.probe.server_down:
+            # Skipped with the entry's poll, as quietly as a failed fetch.
+            return self.data or {"library_stats": {}}
+        interval = (
+            self.update_interval or self.parent.update_interval or timedelta(0)
+        ).total_seconds()
+        attributes = {"audiobookshelf.library": self.library.id_}
+        with (
+            self.parent.tracer.root_span("library stats poll", attributes),
+            request_priority(Priority.POLL),
+        ):
+            poll = _Poll(
+                deadline=asyncio.get_running_loop().time()
+                + interval * POLL_DEADLINE_FRACTION
+            )
+            return await self.async_fetch(poll)
+
+    async def async_fetch(self, poll: _Poll) -> dict[str, Any]:
+        """Fetch the library's stats within poll, keeping the last if that fails."""
+        # The entry's step, so a library fails, times out and is marked stale
+        # exactly as any other metric is.
+        stats = await self.parent._async_step(  # noqa: SLF001
+            poll,
+            f"stats for library {self.library.name}",
+            "api/libraries/{id}/stats",
+            (self.metric,),
+            partial(self.parent.library_stats, self.library),
+        )
+        if stats is None:
+            # Already logged and marked stale. Not UpdateFailed: the sensors
+            # go by the metric's age, and that would log the failure twice.
+            return self.data or {"library_stats": {}}
+        # Shaped like the entry's own data, so one sensor class reads both.
+        return {"library_stats": {self.library.id_: stats}}
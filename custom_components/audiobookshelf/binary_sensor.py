@@ -0,0 +1,58 @@
+"""Binary sensor platform saying whether the Audiobookshelf server answers."""
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from custom_components.audiobookshelf import AudiobookshelfConfigEntry
+from custom_components.audiobookshelf.entity import device_info_for
+from custom_components.audiobookshelf.reachability import ReachabilityProbe
+
+# Read-only platform, as the sensors are.
+PARALLEL_UPDATES = 0
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,  # noqa: ARG001
+    entry: AudiobookshelfConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the binary sensor platform."""
+    async_add_entities([AudiobookshelfConnectivity(entry.runtime_data.probe, entry)])
+
+
+class AudiobookshelfConnectivity(
+    CoordinatorEntity[ReachabilityProbe], BinarySensorEntity
+):
+    """Whether the server answers its pings."""
+
+    _attr_has_entity_name = True
+    _attr_translation_key = "server_reachable"
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self, probe: ReachabilityProbe, entry: AudiobookshelfConfigEntry
+    ) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(probe)
+        self._attr_unique_id = f"{entry.entry_id}_server_reachable"
+        self._attr_device_info = device_info_for(entry, probe.parent)
+
+    @property
+    def available(self) -> bool:
+        """Return whether the server has been pinged yet."""
+        # Not last_update_success: a ping going unanswered is this sensor's
+        # off state, not a failure to know it.
+        return self.coordinator.data is not None
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return whether the server answers."""
+        reachable: bool | None = self.coordinator.data.get("server_reachable")
+        return reachable
@@ -0,0 +1,117 @@
+"""Small in-memory cache with per-entry expiry and a size bound."""
+
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Mapping
+from typing import Any, cast
+
+from .tracing import current_span
+
+
+class TTLCache[ValueT]:
+    """Least-recently-used cache whose entries also expire after a fixed time."""
+
+    def __init__(self, *, ttl: float, max_entries: int) -> None:
+        """Hold at most max_entries values, each for ttl seconds."""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, ValueT]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return how many entries are held, expired or not."""
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> ValueT | None:
+        """Return the cached value, or None when absent or expired."""
+        entry = self._entries.get(key)
+        # Monotonic, so a clock change on the host cannot make an entry live
+        # for a day or expire the moment it was stored.
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: ValueT, *, ttl: float | None = None) -> None:
+        """Store value, evicting the least recently used entry when full."""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, matches: Callable[[Hashable], bool]) -> None:
+        """Drop every entry whose key matches."""
+        for key in [key for key in self._entries if matches(key)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every entry, keeping the hit and miss counts."""
+        self._entries.clear()
+
+
+class ResponseCache:
+    """One server's slow-changing responses, each endpoint kept for its own time."""
+
+    # One size bound across every endpoint, so a burst of searches pushes
+    # out older searches and, at worst, one library list that is fetched
+    # again, rather than growing without end.
+
+    def __init__(self, ttls: Mapping[str, float], *, max_entries: int) -> None:
+        """Keep each endpoint in ttls for its time, at most max_entries in all."""
+        self.ttls = dict(ttls)
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self._entries: TTLCache[Any] = TTLCache(ttl=0, max_entries=max_entries)
+
+    def __len__(self) -> int:
+        """Return how many responses are held, expired or not."""
+        return len(self._entries)
+
+    def get(self, endpoint: str, key: Hashable = None) -> Any:
+        """Return endpoint's cached response for key, or None."""
+        value = self._entries.get((endpoint, key))
+        (self.misses if value is None else self.hits)[endpoint] += 1
+        return value
+
+    def set(self, endpoint: str, value: Any, key: Hashable = None) -> None:
+        """Keep endpoint's response for key for the endpoint's time."""
+        self._entries.set((endpoint, key), value, ttl=self.ttls[endpoint])
+
+    async def async_get[T](
+        self, endpoint: str, fetch: Callable[[], Awaitable[T]], key: Hashable = None
+    ) -> T:
+        """Return endpoint's cached response for key, fetching it if there is none."""
+        cached = self.get(endpoint, key)
+        current_span().set_attribute(
+            "audiobookshelf.cache", "miss" if cached is None else "hit"
+        )
+        if cached is not None:
+            return cast("T", cached)
+        value = await fetch()
+        self.set(endpoint, value, key)
+        return value
+
+    def invalidate(self, *endpoints: str) -> None:
+        """Drop every cached response of endpoints, once the server has changed."""
+        self._entries.discard(lambda key: cast("tuple[str, Any]", key)[0] in endpoints)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cache's size and each endpoint's hits and misses."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self._entries.max_entries,
+            "endpoints": {
+                endpoint: {
+                    "ttl": ttl,
+                    "hits": self.hits[endpoint],
+                    "misses": self.misses[endpoint],
+                }
+                for endpoint, ttl in self.ttls.items()
+            },
+        }
@@ -0,0 +1,288 @@
+"""Local catalog of library items, kept in sync incrementally."""
+
+import asyncio
+from collections.abc import Iterator, Sequence
+from contextlib import aclosing
+from dataclasses import asdict, dataclass
+from logging import getLogger
+from typing import TYPE_CHECKING, Annotated, Any
+
+from aioaudiobookshelf.schema import _BaseModel
+from homeassistant.helpers.storage import Store
+from mashumaro.types import Alias
+
+from .const import (
+    CATALOG_SAVE_DELAY,
+    CATALOG_STORAGE_VERSION,
+    DOMAIN,
+)
+from .pagination import AdaptivePageSize, async_iter_pages
+from .tracing import SpanKind, span
+
+if TYPE_CHECKING:
+    from aioaudiobookshelf import AdminClient
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = getLogger(__name__)
+
+
+@dataclass(kw_only=True)
+class _CatalogMetadata(_BaseModel):
+    """The handful of metadata fields the catalog keeps."""
+
+    title: str | None = None
+    # Only minified book metadata carries these. Podcasts have an author but
+    # no series, and neither has authorName, so all of them are optional.
+    series_name: Annotated[str | None, Alias("seriesName")] = None
+    author_name: Annotated[str | None, Alias("authorName")] = None
+    author: str | None = None
+
+
+@dataclass(kw_only=True)
+class _CatalogMedia(_BaseModel):
+    """Minified media, of which only metadata and duration are read."""
+
+    metadata: _CatalogMetadata
+    duration: float | None = None
+
+
+@dataclass(kw_only=True)
+class CatalogItemResponse(_BaseModel):
+    """One minified library item, parsed no further than the catalog needs."""
+
+    # Parsed with a narrow model rather than LibraryItemMinified, whose
+    # discriminated book and podcast variants fail the whole page over one
+    # field the catalog does not use.
+    id_: Annotated[str, Alias("id")]
+    media_type: Annotated[str, Alias("mediaType")]
+    added_at: Annotated[int, Alias("addedAt")]
+    updated_at: Annotated[int, Alias("updatedAt")]
+    size: int | None = None
+    media: _CatalogMedia
+
+
+@dataclass(kw_only=True)
+class _CatalogPageResponse(_BaseModel):
+    """One page of /api/libraries/{id}/items."""
+
+    results: list[CatalogItemResponse]
+    total: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class CatalogItem:
+    """A library item as held in the catalog."""
+
+    id_: str
+    library_id: str
+    media_type: str
+    title: str | None
+    series: str | None
+    author: str | None
+    added_at: int  # ms epoch, server clock
+    updated_at: int  # ms epoch, server clock
+    duration: float | None  # s
+    size: int | None  # bytes
+
+    @classmethod
+    def from_response(cls, library_id: str, item: CatalogItemResponse) -> "CatalogItem":
+        """Flatten one parsed item from the API."""
+        metadata = item.media.metadata
+        return cls(
+            id_=item.id_,
+            library_id=library_id,
+            media_type=item.media_type,
+            title=metadata.title,
+            series=metadata.series_name or None,
+            author=metadata.author_name or metadata.author or None,
+            added_at=item.added_at,
+            updated_at=item.updated_at,
+            duration=item.media.duration,
+            size=item.size,
+        )
+
+
+def catalog_store_for(hass: "HomeAssistant", entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store one entry's catalog is persisted in."""
+    # Shared by setup and removal so the two cannot disagree on the key.
+    return Store(hass, CATALOG_STORAGE_VERSION, f"{DOMAIN}.catalog.{entry_id}")
+
+
+class LibraryCatalog:
+    """Items of every library, persisted and refreshed by what has changed."""
+
+    def __init__(self, store: Store[dict[str, Any]]) -> None:
+        """Initialize an empty catalog backed by the given store."""
+        self._store = store
+        self._items: dict[str, dict[str, CatalogItem]] = {}
+        # Per library, the newest updatedAt seen. It is the server's own
+        # timestamp, so unlike a "last synced at" taken from this host's clock
+        # it cannot skip edits when the two clocks disagree.
+        self._cursors: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+        # Kept across syncs so what was learnt about the server's speed
+        # carries over to the next walk.
+        self._page_size = AdaptivePageSize()
+
+    async def async_load(self) -> None:
+        """Restore the catalog saved by a previous run."""
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        try:
+            self._items = {
+                library_id: {item["id_"]: CatalogItem(**item) for item in library_items}
+                for library_id, library_items in stored["items"].items()
+            }
+            self._cursors = dict(stored["cursors"])
+        except (KeyError, TypeError) as err:
+            # A catalog that cannot be read back costs one full walk to
+            # rebuild, which beats failing setup over a cache.
+            _LOGGER.warning("Discarding unreadable library catalog: %s", err)
+            self._items = {}
+            self._cursors = {}
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Serialise the catalog for the store."""
+        return {
+            "items": {
+                library_id: [asdict(item) for item in library_items.values()]
+                for library_id, library_items in self._items.items()
+            },
+            "cursors": self._cursors,
+        }
+
+    def __len__(self) -> int:
+        """Return how many items the catalog holds across all libraries."""
+        return sum(len(library_items) for library_items in self._items.values())
+
+    def items(self, library_id: str | None = None) -> Iterator[CatalogItem]:
+        """Iterate the items of one library, or of all of them."""
+        if library_id is not None:
+            yield from self._items.get(library_id, {}).values()
+            return
+        for library_items in self._items.values():
+            yield from library_items.values()
+
+    def in_series(self, text: str) -> list[CatalogItem]:
+        """Return books whose series contains text, ignoring case."""
+        needle = text.casefold()
+        return [
+            item
+            for item in self.items()
+            if item.media_type == "book"
+            and item.series is not None
+            and needle in item.series.casefold()
+        ]
+
+    async def async_sync(
+        self, client: "AdminClient", library_ids: Sequence[str]
+    ) -> None:
+        """Bring the catalog up to date with the server."""
+        # Serialised so two service calls arriving together do not both walk
+        # the same pages.
+        async with self._lock:
+            for library_id in set(self._items) - set(library_ids):
+                # A library deleted on the server takes its items with it.
+                del self._items[library_id]
+                self._cursors.pop(library_id, None)
+            for library_id in library_ids:
+                await self._async_sync_library(client, library_id)
+            self._store.async_delay_save(self._data_to_save, CATALOG_SAVE_DELAY)
+
+    async def _async_sync_library(self, client: "AdminClient", library_id: str) -> None:
+        """Fetch what changed in one library since its cursor."""
+        cursor = self._cursors.get(library_id)
+        library_items = self._items.setdefault(library_id, {})
+        attributes = {
+            "audiobookshelf.library": library_id,
+            "audiobookshelf.incremental": cursor is not None,
+        }
+        with span("catalog sync", attributes) as sync:
+            total = await self._async_walk(client, library_id, library_items, cursor)
+            if total is not None and total == len(library_items):
+                return
+            sync.set_attribute("audiobookshelf.rebuilt", value=True)
+            await self._async_rebuild(client, library_id, library_items)
+
+    async def _async_rebuild(
+        self,
+        client: "AdminClient",
+        library_id: str,
+        library_items: dict[str, CatalogItem],
+    ) -> None:
+        """Walk every page of one library again, from an empty catalog."""
+        # Deletions do not bump anything's updatedAt, so they only show up as
+        # a count that no longer matches. Nor does an unsorted response (from
+        # a server ignoring the sort parameter) allow an early stop. Either
+        # way the only correct answer is a full walk.
+        _LOGGER.debug("Rebuilding the catalog of library %s", library_id)
+        library_items.clear()
+        self._cursors.pop(library_id, None)
+        await self._async_walk(client, library_id, library_items, None)
+
+    async def _async_walk(
+        self,
+        client: "AdminClient",
+        library_id: str,
+        library_items: dict[str, CatalogItem],
+        cursor: int | None,
+    ) -> int | None:
+        """
+        Upsert items newest-first until reaching the cursor.
+
+        Without a cursor this walks every page. Returns the server's total
+        item count, or None when an incremental walk found the pages out of
+        order and so cannot be trusted to have stopped in the right place.
+        """
+
+        async def _fetch(page: int, limit: int) -> _CatalogPageResponse:
+            attributes = {
+                "audiobookshelf.page": page,
+                "audiobookshelf.page_size": limit,
+            }
+            with span(
+                "GET api/libraries/{id}/items", attributes, SpanKind.CLIENT
+            ) as fetched:
+                response = _CatalogPageResponse.from_json(
+                    await client._get(  # noqa: SLF001
+                        f"api/libraries/{library_id}/items",
+                        {
+                            "minified": 1,
+                            "sort": "updatedAt",
+                            "desc": 1,
+                            "limit": limit,
+                            "page": page,
+                        },
+                    )
+                )
+                fetched.set_attribute("audiobookshelf.results", len(response.results))
+                return response
+
+        def _reaches_back_past_cursor(page: _CatalogPageResponse) -> bool:
+            # Newest-first, so once a page ends at or before the cursor there
+            # is nothing further back worth prefetching.
+            return cursor is None or (
+                bool(page.results) and page.results[-1].updated_at >= cursor
+            )
+
+        previous: int | None = None
+        total = 0
+        async with aclosing(
+            async_iter_pages(_fetch, self._page_size, _reaches_back_past_cursor)
+        ) as pages:
+            async for response in pages:
+                total = response.total
+                for result in response.results:
+                    if cursor is not None:
+                        if previous is not None and result.updated_at > previous:
+                            return None
+                        if result.updated_at < cursor:
+                            return total
+                        previous = result.updated_at
+                    library_items[result.id_] = CatalogItem.from_response(
+                        library_id, result
+                    )
+                    newest = self._cursors.get(library_id, 0)
+                    self._cursors[library_id] = max(newest, result.updated_at)
+        return total
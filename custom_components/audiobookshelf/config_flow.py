@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
@@ -13,7 +14,6 @@ from aiohttp import ClientError
 from homeassistant import config_entries
 from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL, CONF_URL
 from homeassistant.core import callback
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 if TYPE_CHECKING:
     from collections.abc import Mapping
@@ -21,19 +21,38 @@ if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry, ConfigFlowResult
     from homeassistant.core import HomeAssistant
 
+from .connection import ConnectionStats, create_session
 from .const import (
     CONF_CHECK_FOR_UPDATES,
+    CONF_HEDGE_REQUESTS,
+    CONF_LIBRARY_MAX_AGE,
+    CONF_LIBRARY_SCAN_INTERVAL,
+    CONF_LIBRARY_STATS_PER_POLL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_REQUESTS_PER_SECOND,
+    CONF_TRACE_EXPORT,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
     MIN_SCAN_INTERVAL,
+    PAGINATION_ITEMS_PER_PAGE,
     REQUEST_TIMEOUT,
     check_for_updates_for,
+    hedge_requests_for,
+    library_max_age_for,
+    library_scan_interval_for,
+    library_stats_per_poll_for,
+    max_concurrent_requests_for,
+    max_requests_per_second_for,
     scan_interval_for,
+    trace_export_for,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 SCAN_INTERVAL_SELECTOR = vol.All(cv.positive_int, vol.Range(min=MIN_SCAN_INTERVAL))
+REQUESTS_PER_SECOND_SELECTOR = vol.All(cv.positive_int, vol.Range(min=1, max=100))
+CONCURRENT_REQUESTS_SELECTOR = vol.All(cv.positive_int, vol.Range(min=1, max=16))
+LIBRARIES_PER_POLL_SELECTOR = vol.All(vol.Coerce(int), vol.Range(min=0, max=100))
 
 
 def validate_config(data: dict[str, Any]) -> dict:
@@ -50,19 +69,22 @@ def validate_config(data: dict[str, Any]) -> dict:
     return errors
 
 
-async def verify_config(hass: HomeAssistant, data: dict[str, str]) -> dict:
+async def verify_config(hass: HomeAssistant, data: dict[str, str]) -> dict:  # noqa: ARG001
     """Verify the configuration by testing the API connection."""
     try:
-        await get_admin_client_by_token(
-            session_config=SessionConfiguration(
-                session=async_get_clientsession(hass),
-                url=data[CONF_URL],
-                token=data[CONF_API_KEY],
-                logger=_LOGGER,
-                pagination_items_per_page=30,
-                timeout=REQUEST_TIMEOUT,
-            ),
-        )
+        # A short-lived session of the same kind the entry will use, so the
+        # check goes over the same TLS and compression settings.
+        async with create_session(ConnectionStats()) as session:
+            await get_admin_client_by_token(
+                session_config=SessionConfiguration(
+                    session=session,
+                    url=data[CONF_URL],
+                    token=data[CONF_API_KEY],
+                    logger=_LOGGER,
+                    pagination_items_per_page=PAGINATION_ITEMS_PER_PAGE,
+                    timeout=REQUEST_TIMEOUT,
+                ),
+            )
     except BadUserError:
         # A subclass of AbsAuthError, so this clause has to come first.
         return {"base": "not_admin"}
@@ -98,6 +120,9 @@ class AudiobookshelfConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             errors.update(validate_config(user_input))
             if not errors:
+                # Several servers can be set up, but the same one twice would
+                # only poll it twice as often.
+                self._async_abort_entries_match({CONF_URL: user_input[CONF_URL]})
                 errors.update(await verify_config(self.hass, user_input))
             if errors:
                 return self.async_show_form(
@@ -122,7 +147,8 @@ class AudiobookshelfConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
             return self.async_create_entry(
-                title="Audiobookshelf",
+                # Named after the server, to tell several apart.
+                title=f"Audiobookshelf ({urlsplit(user_input[CONF_URL]).netloc})",
                 data={
                     CONF_URL: user_input[CONF_URL],
                     CONF_API_KEY: user_input[CONF_API_KEY],
@@ -237,12 +263,44 @@ class AudiobookshelfOptionsFlow(config_entries.OptionsFlow):
                         CONF_SCAN_INTERVAL,
                         default=scan_interval_for(self.config_entry),
                     ): SCAN_INTERVAL_SELECTOR,
+                    vol.Required(
+                        CONF_LIBRARY_SCAN_INTERVAL,
+                        default=library_scan_interval_for(self.config_entry),
+                    ): SCAN_INTERVAL_SELECTOR,
+                    vol.Required(
+                        CONF_LIBRARY_STATS_PER_POLL,
+                        default=library_stats_per_poll_for(self.config_entry),
+                    ): LIBRARIES_PER_POLL_SELECTOR,
+                    vol.Required(
+                        CONF_LIBRARY_MAX_AGE,
+                        default=library_max_age_for(self.config_entry),
+                    ): SCAN_INTERVAL_SELECTOR,
                     # Off by default. This is the only thing the integration
                     # does that leaves the local network.
                     vol.Required(
                         CONF_CHECK_FOR_UPDATES,
                         default=check_for_updates_for(self.config_entry),
                     ): cv.boolean,
+                    vol.Required(
+                        CONF_HEDGE_REQUESTS,
+                        default=hedge_requests_for(self.config_entry),
+                    ): cv.boolean,
+                    vol.Required(
+                        CONF_MAX_REQUESTS_PER_SECOND,
+                        default=max_requests_per_second_for(self.config_entry),
+                    ): REQUESTS_PER_SECOND_SELECTOR,
+                    vol.Required(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=max_concurrent_requests_for(self.config_entry),
+                    ): CONCURRENT_REQUESTS_SELECTOR,
+                    # Optional rather than defaulting to "", so the field can
+                    # be left empty to turn tracing off.
+                    vol.Optional(
+                        CONF_TRACE_EXPORT,
+                        description={
+                            "suggested_value": trace_export_for(self.config_entry)
+                        },
+                    ): cv.string,
                 }
             ),
         )
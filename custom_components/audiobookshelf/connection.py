@@ -0,0 +1,99 @@
+"""The HTTP session an entry talks to its server over."""
+
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import (
+    ClientResponse,
+    ClientSession,
+    TCPConnector,
+    TraceConfig,
+    TraceConnectionCreateEndParams,
+    TraceConnectionReuseconnParams,
+    hdrs,
+)
+from aiohttp.compression_utils import HAS_BROTLI
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import client_context, client_context_no_verify
+
+from .const import CONNECTIONS_PER_HOST, DNS_CACHE_SECONDS, KEEPALIVE_SECONDS
+
+# Only advertised when it can be decoded: a server answering br to a client
+# without the brotli package would fail every request.
+ACCEPT_ENCODING = "gzip, br" if HAS_BROTLI else "gzip, deflate"
+
+
+@dataclass
+class ConnectionStats:
+    """How well the session's connections and compression are paying off."""
+
+    # Every response read, whatever it was for, so a poll can count its own.
+    responses: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    compressed_responses: int = 0
+    # Only responses that state their compressed length can be counted here.
+    # A chunked response is decoded as it arrives, and its size on the wire
+    # is never seen.
+    bytes_on_wire: int = 0
+    bytes_decoded: int = 0
+
+    def record_response(self, response: ClientResponse, body: bytes) -> None:
+        """Count what compression saved on one fully read response."""
+        self.responses += 1
+        if response.headers.get(hdrs.CONTENT_ENCODING) is None:
+            return
+        self.compressed_responses += 1
+        length = response.headers.get(hdrs.CONTENT_LENGTH)
+        if length is not None and length.isdigit():
+            self.bytes_on_wire += int(length)
+            self.bytes_decoded += len(body)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Describe the counters, for diagnostics."""
+        return {
+            **asdict(self),
+            "bytes_saved": max(0, self.bytes_decoded - self.bytes_on_wire),
+        }
+
+
+def create_session(stats: ConnectionStats, *, verify_ssl: bool = True) -> ClientSession:
+    """Create a session tuned for bursts of requests to one server."""
+    # Not Home Assistant's shared session: its pool is sized for many hosts
+    # and shared with every other integration, and it gives no view of
+    # whether connections are actually being reused.
+
+    async def _created(
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        _params: TraceConnectionCreateEndParams,
+    ) -> None:
+        stats.connections_created += 1
+
+    async def _reused(
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        _params: TraceConnectionReuseconnParams,
+    ) -> None:
+        stats.connections_reused += 1
+
+    trace = TraceConfig()
+    # aiohttp 3.11 annotates these signals with the wrong callback type.
+    trace.on_connection_create_end.append(_created)  # type: ignore[arg-type]
+    trace.on_connection_reuseconn.append(_reused)  # type: ignore[arg-type]
+
+    return ClientSession(
+        connector=TCPConnector(
+            ssl=client_context() if verify_ssl else client_context_no_verify(),
+            limit_per_host=CONNECTIONS_PER_HOST,
+            keepalive_timeout=KEEPALIVE_SECONDS,
+            use_dns_cache=True,
+            ttl_dns_cache=DNS_CACHE_SECONDS,
+        ),
+        headers={
+            hdrs.USER_AGENT: SERVER_SOFTWARE,
+            hdrs.ACCEPT_ENCODING: ACCEPT_ENCODING,
+        },
+        trace_configs=[trace],
+    )
@@ -10,18 +10,134 @@ if TYPE_CHECKING:
 
 VERSION = "v0.5.0"
 DOMAIN = "audiobookshelf"
-PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.UPDATE]
-
 DEFAULT_SCAN_INTERVAL = 300
-# A poll costs one request per library plus five more, so a very short
-# interval is a way to hammer your own server by accident.
+# A poll costs five requests, and each library one more on its own
+# interval, so a very short interval is a way to hammer your own server by
+# accident.
 MIN_SCAN_INTERVAL = 30
 
-# aiohttp defaults to a five minute total timeout per request. A single poll
-# issues five requests plus one per library, so a server that accepts
-# connections but stops responding can hold a poll open for far longer than
-# the scan interval, with no error and no sign of staleness.
-REQUEST_TIMEOUT = ClientTimeout(total=30)
+# Library stats are polled per library, each on this interval, which
+# defaults to the main one. Stats total a whole library, so on a large
+# server they are the expensive part of polling and rarely change quickly.
+CONF_LIBRARY_SCAN_INTERVAL = "library_scan_interval"
+# Each library's first poll starts this long after the previous one's, so
+# their requests stay spread out rather than all landing together.
+LIBRARY_START_SPACING_SECONDS = 2
+# For servers with hundreds of libraries, rotation refreshes only the few
+# with the oldest stats on each poll instead, so a poll costs the same
+# however many libraries there are. Off (0) unless set. The slice grows
+# past the setting only when it has to, to refresh every library within
+# the maximum age.
+CONF_LIBRARY_STATS_PER_POLL = "library_stats_per_poll"
+DEFAULT_LIBRARY_STATS_PER_POLL = 0
+CONF_LIBRARY_MAX_AGE = "library_max_age"
+DEFAULT_LIBRARY_MAX_AGE = 3600
+
+# aiohttp defaults to a five minute total timeout per request, which would
+# let a server that accepts connections but stops responding hold anything
+# outside a poll, such as an action, open for that long. Requests made by a
+# poll are bounded more tightly still, below.
+REQUEST_TIMEOUT_SECONDS = 30
+REQUEST_TIMEOUT = ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+
+# A poll issues several requests, so even at 30 seconds each it could run
+# for minutes and overlap the next one. Every poll now finishes within this
+# share of its interval. Steps still running at that point are cancelled
+# and serve their last value, marked stale, and steps not yet started are
+# skipped the same way.
+POLL_DEADLINE_FRACTION = 0.8
+
+# MIN_SCAN_INTERVAL is the same for every server, but what a poll costs is
+# not: it grows with the libraries and the server's disk and CPU. Once at
+# least half of the last POLL_LOAD_WINDOW polls took this share of their
+# interval or more, a repairs issue suggests an interval they would take
+# POLL_LOAD_TARGET_SHARE of, rounded up to whole MIN_SCAN_INTERVALs.
+POLL_LOAD_WINDOW = 10
+POLL_LOAD_MAX_SHARE = 0.5
+POLL_LOAD_TARGET_SHARE = 0.25
+POLL_LOAD_ISSUE = "scan_interval_too_short"
+# Per-endpoint limits within that. Counting users or sessions is a table
+# lookup that answers in milliseconds even on a small ARM board; only stats,
+# which total a whole library, can legitimately take long.
+ENDPOINT_TIMEOUTS: dict[str, float] = {
+    "api/users": 10,
+    "api/users/online": 5,
+    "api/sessions/open": 10,
+    "api/me/sessions": 5,
+    "api/libraries": 10,
+}
+
+# One user's record, the only place the server gives their progress.
+USER_ENDPOINT = "api/users/{id}"
+# Progress of a user who is neither online nor listening is fetched again
+# this often, in case it was changed without either.
+USER_PROGRESS_MAX_AGE = 3600
+
+# A value whose endpoint failed is still shown until this many polls have
+# gone by without a fresh one. Long enough to ride out a restart or one
+# flaky endpoint, short enough that a dead server does not look healthy.
+STALE_AFTER_POLLS = 3
+
+# Page size for the client's own paged calls. Walks this integration does
+# itself go through pagination.AdaptivePageSize instead.
+PAGINATION_ITEMS_PER_PAGE = 30
+# Adaptive paging starts here and doubles while pages come back in under
+# half the target time, or halves once one takes longer than it. The bounds
+# are powers of two apart because the API pages by index. See pagination.py.
+PAGE_SIZE_MIN = 25
+PAGE_SIZE_INITIAL = 100
+PAGE_SIZE_MAX = 1600
+PAGE_TARGET_SECONDS = 1.0
+# Syncs arrive in bursts around service calls; batching the writes keeps a
+# large catalog from being re-serialised for each of them.
+CATALOG_SAVE_DELAY = 30
+CATALOG_STORAGE_VERSION = 1
+
+# Responses that change far more slowly than they are asked for are kept per
+# entry for a time of their own, rather than fetched again by every poll,
+# action and update check that wants them, and dropped early once the server
+# is known to have changed them. The server settings come with
+# /api/authorize, which building the client calls. Libraries are added and
+# removed rarely. Dashboards tend to repeat the same few searches, and a
+# result a minute old is as good as a fresh one for finding a book.
+SERVER_SETTINGS_ENDPOINT = "api/authorize"
+LIBRARIES_ENDPOINT = "api/libraries"
+SEARCH_ENDPOINT = "api/libraries/{id}/search"
+RESPONSE_CACHE_TTLS: dict[str, float] = {
+    SERVER_SETTINGS_ENDPOINT: 1800,
+    LIBRARIES_ENDPOINT: 900,
+    SEARCH_ENDPOINT: 60,
+}
+RESPONSE_CACHE_SIZE = 64
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+
+# Library scans are followed through the server's socket, which says when
+# one starts and finishes. /api/tasks is only polled for events the socket
+# missed: rarely while it is connected, more often while it is not, each
+# such poll also trying to connect again.
+SCAN_TASKS_POLL_INTERVAL = 900
+SCAN_TASKS_POLL_INTERVAL_DISCONNECTED = 120
+SOCKET_CONNECT_TIMEOUT = 10
+# scan_library waits up to this long for the scan it started, by default and
+# at most. Without a socket, it asks /api/tasks every SCAN_WAIT_POLL_SECONDS.
+SCAN_WAIT_DEFAULT_TIMEOUT = 600
+SCAN_WAIT_MAX_TIMEOUT = 3600
+SCAN_WAIT_POLL_SECONDS = 10
+
+# Whether the server answers at all is checked on an interval of its own,
+# with /ping, which needs no token and does no work. Polls are skipped once
+# this many pings in a row have gone unanswered. The latency shown moves
+# this share of the way towards each new round trip.
+PING_ENDPOINT = "ping"
+PROBE_INTERVAL = 15
+PROBE_TIMEOUT = ClientTimeout(total=5)
+PROBE_DOWN_AFTER_FAILURES = 2
+PROBE_LATENCY_SMOOTHING = 0.2
+
+# profile_poll answers with this many of the functions a poll spent the most
+# time in. The stats file it writes holds all of them.
+PROFILE_HOT_FUNCTIONS = 20
 
 # Audiobookshelf exposes no update-check endpoint of its own - all 112
 # documented endpoints were checked - so the only way to answer "is there a
@@ -33,6 +149,65 @@ DEFAULT_CHECK_FOR_UPDATES = False
 GITHUB_LATEST_RELEASE_URL = (
     "https://api.github.com/repos/advplyr/audiobookshelf/releases/latest"
 )
+# The newest release is the same whichever server asks, so one cache serves
+# every entry.
+RELEASE_STORAGE_KEY = f"{DOMAIN}.github_release"
+RELEASE_STORAGE_VERSION = 1
+
+
+# Hedging sends a second copy of a poll GET that has run past its endpoint's
+# recent 95th percentile, and takes whichever answers first. It trades a
+# little extra load for a poll no longer being as slow as its slowest
+# request, so it is opt-in, and bounded in how many copies can be out at once.
+CONF_HEDGE_REQUESTS = "hedge_requests"
+DEFAULT_HEDGE_REQUESTS = False
+HEDGE_MAX_IN_FLIGHT = 2
+# Latencies kept per endpoint, and how many before any hedging is done. At
+# the default interval that is the last few hours, and the first half hour.
+HEDGE_WINDOW = 50
+HEDGE_MIN_SAMPLES = 5
+
+
+# Each poll and action can be recorded as a trace, exported as OTLP/JSON to
+# a collector (an http:// or https:// URL) or appended to a file in the
+# configuration directory (any other value), to line the integration's
+# timings up with the server's. Off (empty) unless set.
+CONF_TRACE_EXPORT = "trace_export"
+DEFAULT_TRACE_EXPORT = ""
+
+
+# Every request to the server, whether from a poll, an action or the update
+# entity, shares one limit, so together they cannot swamp a small server.
+# Polls are served first; anything else waits behind them.
+CONF_MAX_REQUESTS_PER_SECOND = "max_requests_per_second"
+DEFAULT_MAX_REQUESTS_PER_SECOND = 10
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+
+# With several servers configured, each entry's poll starts at least this
+# long after the last one did, and all of them together stay within one
+# budget as well as their own limits. Sized for a handful of servers at
+# their default limits.
+ENTRY_POLL_SPACING_SECONDS = 2
+SHARED_MAX_REQUESTS_PER_SECOND = 30
+SHARED_MAX_CONCURRENT_REQUESTS = 12
+
+
+# Each entry has its own connection pool rather than Home Assistant's shared
+# one. The limiter above already caps requests in flight; this is a backstop
+# sized for its highest setting plus hedges.
+CONNECTIONS_PER_HOST = 20
+# Node's HTTP server, which Audiobookshelf runs on, drops idle connections
+# after five seconds. Letting them go a little sooner avoids sending a
+# request down a connection the server is in the middle of closing, while
+# still reusing them across a poll's burst of requests.
+KEEPALIVE_SECONDS = 4
+DNS_CACHE_SECONDS = 300
+
+
+def endpoint_timeout(endpoint: str) -> float:
+    """Return how long a poll waits for one endpoint."""
+    return ENDPOINT_TIMEOUTS.get(endpoint, REQUEST_TIMEOUT_SECONDS)
 
 
 def check_for_updates_for(entry: "ConfigEntry") -> bool:
@@ -40,6 +215,57 @@ def check_for_updates_for(entry: "ConfigEntry") -> bool:
     return bool(entry.options.get(CONF_CHECK_FOR_UPDATES, DEFAULT_CHECK_FOR_UPDATES))
 
 
+def trace_export_for(entry: "ConfigEntry") -> str:
+    """Return where traces are exported to, empty when they are not."""
+    return str(entry.options.get(CONF_TRACE_EXPORT, DEFAULT_TRACE_EXPORT)).strip()
+
+
+def platforms_for(entry: "ConfigEntry") -> list[Platform]:
+    """Return the platforms to set up, leaving update out unless opted in."""
+    # Left out rather than forwarded empty: most users never opt in, and for
+    # them neither the update platform nor Home Assistant's update
+    # integration behind it needs loading at all.
+    if check_for_updates_for(entry):
+        return [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.UPDATE]
+    return [Platform.SENSOR, Platform.BINARY_SENSOR]
+
+
+def hedge_requests_for(entry: "ConfigEntry") -> bool:
+    """Return whether the user has opted in to hedged poll requests."""
+    return bool(entry.options.get(CONF_HEDGE_REQUESTS, DEFAULT_HEDGE_REQUESTS))
+
+
+def max_requests_per_second_for(entry: "ConfigEntry") -> int:
+    """Return how many requests a second may be sent to the server."""
+    return int(
+        entry.options.get(CONF_MAX_REQUESTS_PER_SECOND, DEFAULT_MAX_REQUESTS_PER_SECOND)
+    )
+
+
+def max_concurrent_requests_for(entry: "ConfigEntry") -> int:
+    """Return how many requests may be in flight to the server at once."""
+    return int(
+        entry.options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS)
+    )
+
+
+def library_scan_interval_for(entry: "ConfigEntry") -> int:
+    """Return how often each library's stats are polled."""
+    return int(entry.options.get(CONF_LIBRARY_SCAN_INTERVAL, scan_interval_for(entry)))
+
+
+def library_stats_per_poll_for(entry: "ConfigEntry") -> int:
+    """Return how many libraries each poll refreshes, 0 when not rotating."""
+    return int(
+        entry.options.get(CONF_LIBRARY_STATS_PER_POLL, DEFAULT_LIBRARY_STATS_PER_POLL)
+    )
+
+
+def library_max_age_for(entry: "ConfigEntry") -> int:
+    """Return how old rotation may let a library's stats get."""
+    return int(entry.options.get(CONF_LIBRARY_MAX_AGE, DEFAULT_LIBRARY_MAX_AGE))
+
+
 def scan_interval_for(entry: "ConfigEntry") -> int:
     """Return the poll interval, preferring options over the original data."""
     # Entries created before the options flow existed only have the value in
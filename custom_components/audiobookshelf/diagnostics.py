@@ -0,0 +1,41 @@
+"""Diagnostics for the Audiobookshelf integration."""
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.audiobookshelf import AudiobookshelfConfigEntry, clean_config
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,  # noqa: ARG001
+    entry: AudiobookshelfConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data
+    return {
+        "config": clean_config(entry.data),
+        "options": clean_config(entry.options),
+        "server_version": coordinator.server_version,
+        "last_update_success": coordinator.last_update_success,
+        # How old each value is and why it is old, which a sensor held over
+        # from an earlier poll only hints at through its attributes.
+        "metrics": coordinator.freshness.as_dict(),
+        "hedging": {
+            "enabled": coordinator.hedger.enabled,
+            "sent": coordinator.hedger.sent,
+            "won": coordinator.hedger.won,
+        },
+        # Requests held back and for how long, to tell a slow server from
+        # one being throttled by the limits in options.
+        "rate_limiter": coordinator.limiter.as_dict(),
+        # Shared by every configured server, so a busy neighbour shows here.
+        "shared_budget": coordinator.scheduler.budget.as_dict(),
+        "connections": coordinator.connection_stats.as_dict(),
+        # Requests saved by keeping slow-changing responses, per endpoint.
+        "response_cache": coordinator.response_cache.as_dict(),
+        # Whether polls are being skipped for a server not answering.
+        "reachability": coordinator.probe.as_dict(),
+        # What the scan interval repairs issue is judged on.
+        "recent_polls": coordinator.poll_load.as_dict(),
+    }
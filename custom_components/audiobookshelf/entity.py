@@ -16,7 +16,9 @@ def device_info_for(
     return DeviceInfo(
         identifiers={(DOMAIN, entry.entry_id)},
         entry_type=DeviceEntryType.SERVICE,
-        name="Audiobookshelf",
+        # The entry's title, which names the server, so several servers'
+        # devices and entity ids can be told apart.
+        name=entry.title,
         manufacturer="advplyr",
         sw_version=coordinator.server_version,
         configuration_url=coordinator.api_url,
@@ -0,0 +1,86 @@
+"""Per-metric record of when each polled value was last fetched."""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+
+def metric_key(key: str, context: str | None = None) -> str:
+    """Return the key one metric is tracked under."""
+    # Library stats are fetched one library at a time, so each library is a
+    # metric of its own rather than one that fails along with all the others.
+    return key if context is None else f"{key}:{context}"
+
+
+@dataclass(slots=True)
+class _Freshness:
+    """When a metric last succeeded and, if it has failed since, why."""
+
+    fetched_at: datetime | None = None
+    error: str | None = None
+
+
+class MetricFreshness:
+    """Tracks how old each value is, so a failed fetch can serve the last one."""
+
+    def __init__(self, max_age: timedelta) -> None:
+        """Treat values older than max_age as no longer worth showing."""
+        self.max_age = max_age
+        self._metrics: dict[str, _Freshness] = {}
+        self._max_ages: dict[str, timedelta] = {}
+
+    def set_max_age(self, key: str, max_age: timedelta) -> None:
+        """Give key a limit of its own, for a metric polled on its own schedule."""
+        self._max_ages[key] = max_age
+
+    def succeeded(self, key: str, now: datetime | None = None) -> None:
+        """Record a fresh value for key."""
+        self._metrics[key] = _Freshness(fetched_at=now or dt_util.utcnow())
+
+    def failed(self, key: str, error: str) -> bool:
+        """Record a failed fetch of key, returning whether it had been healthy."""
+        metric = self._metrics.setdefault(key, _Freshness())
+        was_healthy = metric.error is None
+        metric.error = error
+        return was_healthy
+
+    def forget(self, key: str) -> None:
+        """Stop tracking a metric that no longer exists, such as a library."""
+        self._metrics.pop(key, None)
+        self._max_ages.pop(key, None)
+
+    def fetched_at(self, key: str) -> datetime | None:
+        """Return when key was last fetched successfully."""
+        metric = self._metrics.get(key)
+        return None if metric is None else metric.fetched_at
+
+    def is_stale(self, key: str) -> bool:
+        """Return whether the last attempt at key failed."""
+        metric = self._metrics.get(key)
+        return metric is not None and metric.error is not None
+
+    def is_fresh(self, key: str, now: datetime | None = None) -> bool:
+        """Return whether the value held for key is recent enough to show."""
+        fetched_at = self.fetched_at(key)
+        if fetched_at is None:
+            return False
+        max_age = self._max_ages.get(key, self.max_age)
+        return (now or dt_util.utcnow()) - fetched_at <= max_age
+
+    def as_dict(self, now: datetime | None = None) -> dict[str, dict[str, Any]]:
+        """Describe every metric's age and last error, for diagnostics."""
+        now = now or dt_util.utcnow()
+        return {
+            key: {
+                "age_seconds": (
+                    None
+                    if metric.fetched_at is None
+                    else round((now - metric.fetched_at).total_seconds(), 1)
+                ),
+                "fresh": self.is_fresh(key, now),
+                "error": metric.error,
+            }
+            for key, metric in sorted(self._metrics.items())
+        }
@@ -0,0 +1,104 @@
+"""Hedged requests: a second try for a GET that runs unusually long."""
+
+import asyncio
+import math
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from .const import HEDGE_MAX_IN_FLIGHT, HEDGE_MIN_SAMPLES, HEDGE_WINDOW
+from .tracing import current_span
+
+
+class Hedger:
+    """Races a duplicate request against one slower than its usual p95."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        max_in_flight: int = HEDGE_MAX_IN_FLIGHT,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        window: int = HEDGE_WINDOW,
+    ) -> None:
+        """Hedge at most max_in_flight requests at once, when enabled."""
+        self.enabled = enabled
+        self.max_in_flight = max_in_flight
+        self.min_samples = min_samples
+        self.window = window
+        self.sent = 0
+        self.won = 0
+        self._in_flight = 0
+        self._latencies: dict[str, deque[float]] = {}
+
+    def p95(self, endpoint: str) -> float | None:
+        """Return the endpoint's recent 95th percentile, once there is one."""
+        latencies = self._latencies.get(endpoint)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        return ordered[math.ceil(len(ordered) * 0.95) - 1]
+
+    def _record(self, endpoint: str, seconds: float) -> None:
+        """Add one observed latency to the endpoint's window."""
+        self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    async def run[T](self, endpoint: str, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Return fetch's result, hedging it if it runs past the usual p95."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        threshold = self.p95(endpoint) if self.enabled else None
+        if threshold is None:
+            result = await fetch()
+            self._record(endpoint, loop.time() - started)
+            return result
+
+        primary = asyncio.ensure_future(fetch())
+        tasks: set[asyncio.Future[T]] = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=threshold)
+            if not done and self._in_flight < self.max_in_flight:
+                # Only for idempotent GETs: both copies may reach the server,
+                # and it has to be harmless for both to be answered.
+                self.sent += 1
+                current_span().set_attribute("audiobookshelf.hedged", value=True)
+                self._in_flight += 1
+                tasks.add(asyncio.ensure_future(fetch()))
+                try:
+                    winner = await self._first_success(tasks)
+                finally:
+                    self._in_flight -= 1
+                if winner is not primary:
+                    self.won += 1
+                    current_span().set_attribute("audiobookshelf.hedge_won", value=True)
+            else:
+                winner = primary
+            result = await winner
+        finally:
+            # The loser, or everything if the caller gave up, e.g. on the
+            # poll deadline. Nothing is left running behind the result.
+            for task in tasks:
+                task.cancel()
+
+        # End to end from the first attempt, which is what the caller waited.
+        # Timing only the winning hedge would pull the p95 down and make
+        # hedging ever more eager.
+        self._record(endpoint, loop.time() - started)
+        return result
+
+    @staticmethod
+    async def _first_success[T](tasks: set[asyncio.Future[T]]) -> asyncio.Future[T]:
+        """Return the first task to succeed, or raise the first error."""
+        pending = set(tasks)
+        errors: list[BaseException] = []
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                error = task.exception()
+                if error is None:
+                    return task
+                errors.append(error)
+            if not pending:
+                # Both failed, and whichever failed first explains it best.
+                raise errors[0]
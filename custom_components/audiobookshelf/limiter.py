@@ -0,0 +1,228 @@
+"""Client-side rate limiting for every request made to the server."""
+
+import asyncio
+import heapq
+import itertools
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any
+
+from aiohttp import ClientResponse, ClientSession
+
+
+class Priority(IntEnum):
+    """Which requests go first when the limiter is holding some back."""
+
+    POLL = 0
+    BACKGROUND = 1
+
+
+# A context variable rather than an argument: requests are made deep inside
+# the client library, which has no way to pass one through. Tasks copy the
+# context they are created in, so a hedged copy keeps its poll's priority.
+_PRIORITY: ContextVar[Priority] = ContextVar(
+    "audiobookshelf_request_priority", default=Priority.BACKGROUND
+)
+
+
+@dataclass
+class RequestCount:
+    """How many requests were answered inside one request_priority block."""
+
+    responses: int = 0
+
+
+# Alongside the priority, so a poll counts only its own requests: another
+# poll started from within it, whose context it copied, sets its own, and
+# actions running at the same time are not in it.
+_COUNT: ContextVar[RequestCount | None] = ContextVar(
+    "audiobookshelf_request_count", default=None
+)
+
+
+@contextmanager
+def request_priority(
+    priority: Priority, count: RequestCount | None = None
+) -> Iterator[None]:
+    """Send every request made inside the block at priority, counting in count."""
+    token = _PRIORITY.set(priority)
+    count_token = _COUNT.set(count)
+    try:
+        yield
+    finally:
+        _COUNT.reset(count_token)
+        _PRIORITY.reset(token)
+
+
+class RequestLimiter:
+    """A token bucket and a concurrency cap, serving polls before the rest."""
+
+    def __init__(
+        self, *, rate: float, max_concurrent: int, burst: float | None = None
+    ) -> None:
+        """Allow rate requests a second, at most max_concurrent at once."""
+        self.rate = rate
+        # A second's worth by default, so a poll's handful of requests goes
+        # out together while a long action is still spread out.
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.max_concurrent = max_concurrent
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._tokens = self.burst
+        self._refilled_at: float | None = None
+        self._in_flight = 0
+        self._waiters: list[tuple[Priority, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def configure(self, *, rate: float, max_concurrent: int) -> None:
+        """Change the limits in place, keeping the queue and the counters."""
+        self.rate = rate
+        self.burst = max(1.0, rate)
+        self._tokens = min(self._tokens, self.burst)
+        self.max_concurrent = max_concurrent
+        if self._waiters:
+            # A higher limit may let some of the queue through straight away.
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a token and a free slot, holding the slot for the block."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        held_back = await self._acquire()
+        self.requests += 1
+        if held_back:
+            waited = loop.time() - started
+            self.throttled += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self) -> bool:
+        """Queue by priority until let through, returning whether it waited."""
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (_PRIORITY.get(), next(self._order), waiter))
+        self._dispatch()
+        if waiter.done():
+            return False
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted in the same moment the caller gave up.
+                self._release()
+            raise
+        return True
+
+    def _release(self) -> None:
+        """Free a slot and let the next waiter through."""
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Let through as many waiters as tokens and slots allow."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._refilled_at is not None:
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._refilled_at) * self.rate
+            )
+        self._refilled_at = now
+
+        while self._waiters and self._in_flight < self.max_concurrent:
+            waiter = self._waiters[0][2]
+            if waiter.done():
+                # Its caller gave up while it was queued.
+                heapq.heappop(self._waiters)
+                continue
+            if self._tokens < 1:
+                if self._timer is None:
+                    self._timer = loop.call_later(
+                        (1 - self._tokens) / self.rate, self._on_timer
+                    )
+                return
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _on_timer(self) -> None:
+        """Retry the queue once enough time has passed for another token."""
+        self._timer = None
+        self._dispatch()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Describe the limits and how often they held requests back."""
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "max_concurrent": self.max_concurrent,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+        }
+
+
+class LimitedSession:
+    """Stands in for a ClientSession, sending each request through a limiter."""
+
+    # Handed to the client library as its session. It only ever calls these
+    # four methods, so nothing else of ClientSession is needed.
+
+    def __init__(
+        self,
+        session: ClientSession,
+        limiter: RequestLimiter,
+        on_response: Callable[[ClientResponse, bytes], None] | None = None,
+        budget: RequestLimiter | None = None,
+    ) -> None:
+        """Wrap session, limited by limiter and budget, passing bodies on."""
+        self._session = session
+        self._limiter = limiter
+        self._on_response = on_response
+        self._budget = budget
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> ClientResponse:
+        """Make one request once the limiter, and any shared budget, allow it."""
+        async with AsyncExitStack() as slots:
+            # Always the server's own limiter first: waiting on the shared
+            # budget then only ever holds up requests to this server.
+            await slots.enter_async_context(self._limiter.slot())
+            if self._budget is not None:
+                await slots.enter_async_context(self._budget.slot())
+            response = await self._session.request(method, url, **kwargs)
+            # Read while the slot is held, so the cap covers the body as well
+            # as the headers. aiohttp keeps the body, so the client's own
+            # read() afterwards returns it without touching the network.
+            body = await response.read()
+        if (count := _COUNT.get()) is not None:
+            count.responses += 1
+        if self._on_response is not None:
+            self._on_response(response, body)
+        return response
+
+    async def get(self, url: str, **kwargs: Any) -> ClientResponse:
+        """Make a limited GET request."""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> ClientResponse:
+        """Make a limited POST request."""
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> ClientResponse:
+        """Make a limited PATCH request."""
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> ClientResponse:
+        """Make a limited DELETE request."""
+        return await self.request("DELETE", url, **kwargs)
@@ -0,0 +1,104 @@
+"""Paged walks whose page size follows how quickly the server answers."""
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable, Sized
+from typing import Protocol
+
+from .const import PAGE_SIZE_INITIAL, PAGE_SIZE_MAX, PAGE_SIZE_MIN, PAGE_TARGET_SECONDS
+
+
+class _Page(Protocol):
+    """Anything with a list of results, which is every paged Audiobookshelf call."""
+
+    @property
+    def results(self) -> Sized:
+        """Return the items on this page."""
+        ...
+
+
+class AdaptivePageSize:
+    """Page size that grows while pages come back quickly and shrinks when not."""
+
+    def __init__(
+        self,
+        *,
+        initial: int = PAGE_SIZE_INITIAL,
+        minimum: int = PAGE_SIZE_MIN,
+        maximum: int = PAGE_SIZE_MAX,
+        target_seconds: float = PAGE_TARGET_SECONDS,
+    ) -> None:
+        """Start at initial, within the given bounds."""
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self._wanted = initial
+
+    def record(self, seconds: float) -> None:
+        """Adjust the size wanted next from how long the last page took."""
+        # Halving and doubling rather than anything finer, because the API
+        # pages by index: a size only works at an offset it divides, and
+        # powers of two of one another always line up.
+        if seconds > self.target_seconds:
+            self._wanted = max(self.minimum, self.size // 2)
+        elif seconds < self.target_seconds / 2:
+            self._wanted = min(self.maximum, self.size * 2)
+
+    def next_size(self, offset: int) -> int:
+        """Return the size to request at offset, moving toward the wanted size."""
+        # A shrink always divides the offset. A grow that does not is put
+        # off to the next page that it does.
+        if offset % self._wanted == 0:
+            self.size = self._wanted
+        return self.size
+
+
+async def async_iter_pages[PageT: _Page](
+    fetch: Callable[[int, int], Awaitable[PageT]],
+    page_size: AdaptivePageSize,
+    wants_more: Callable[[PageT], bool] | None = None,
+) -> AsyncGenerator[PageT]:
+    """
+    Yield pages from fetch(page, limit), one request ahead of the consumer.
+
+    The next page is requested as soon as the current one arrives, so its
+    round trip overlaps whatever the consumer does with the current one.
+    wants_more, when given, can rule out the next page from the current one
+    so that a walk known to end here does not spend a request on it. A
+    consumer that stops early anyway should wrap this in contextlib.aclosing,
+    which cancels the request already in flight.
+    """
+
+    async def _timed(offset: int, limit: int) -> PageT:
+        started = time.monotonic()
+        page = await fetch(offset // limit, limit)
+        page_size.record(time.monotonic() - started)
+        return page
+
+    offset = 0
+    limit = page_size.next_size(offset)
+    pending = asyncio.ensure_future(_timed(offset, limit))
+    try:
+        while True:
+            page = await pending
+            offset += limit
+            # A short page is the last one, and asking for the next would
+            # only return an empty page.
+            last = len(page.results) < limit or (
+                wants_more is not None and not wants_more(page)
+            )
+            if not last:
+                limit = page_size.next_size(offset)
+                pending = asyncio.ensure_future(_timed(offset, limit))
+            yield page
+            if last:
+                return
+    finally:
+        # Cancel a prefetch the consumer no longer wants, and collect the
+        # outcome of one that already failed so asyncio does not log it as
+        # never retrieved.
+        if not pending.done():
+            pending.cancel()
+        elif not pending.cancelled():
+            pending.exception()
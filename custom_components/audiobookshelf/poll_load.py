@@ -0,0 +1,85 @@
+"""How much of their interval recent polls take, and what interval would fit."""
+
+import math
+import statistics
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    MIN_SCAN_INTERVAL,
+    POLL_LOAD_ISSUE,
+    POLL_LOAD_MAX_SHARE,
+    POLL_LOAD_TARGET_SHARE,
+    POLL_LOAD_WINDOW,
+)
+
+
+def poll_load_issue_id(entry_id: str) -> str:
+    """Return the id of an entry's repairs issue about its scan interval."""
+    return f"{POLL_LOAD_ISSUE}_{entry_id}"
+
+
+@dataclass(frozen=True, slots=True)
+class PollSample:
+    """What one poll cost."""
+
+    seconds: float
+    requests: int
+
+
+class PollLoad:
+    """Recent polls' durations and request counts, against their interval."""
+
+    def __init__(self, window: int = POLL_LOAD_WINDOW) -> None:
+        """Judge by the last window polls."""
+        self._samples: deque[PollSample] = deque(maxlen=window)
+
+    def record(self, seconds: float, requests: int) -> None:
+        """Add one finished poll."""
+        self._samples.append(PollSample(seconds, requests))
+
+    def reset(self) -> None:
+        """Forget every poll, as after the interval changed."""
+        self._samples.clear()
+
+    @property
+    def is_full(self) -> bool:
+        """Return whether there are enough polls to judge by."""
+        return len(self._samples) == self._samples.maxlen
+
+    def is_heavy(self, interval: float) -> bool:
+        """Return whether polls regularly take a large share of interval."""
+        # Half the window rather than any one poll, so a single slow poll,
+        # such as the first after a server restart, raises nothing.
+        if not self.is_full:
+            return False
+        heavy = [
+            s for s in self._samples if s.seconds >= interval * POLL_LOAD_MAX_SHARE
+        ]
+        return len(heavy) * 2 >= len(self._samples)
+
+    def typical(self) -> PollSample:
+        """Return the median duration and request count."""
+        return PollSample(
+            seconds=statistics.median(s.seconds for s in self._samples),
+            requests=round(statistics.median(s.requests for s in self._samples)),
+        )
+
+    def suggested_interval(self) -> int:
+        """Return an interval the slowest recent polls would fit comfortably."""
+        # The slowest rather than the typical poll, so the suggestion does
+        # not have to be raised again the next time the server is busy.
+        slowest = max(s.seconds for s in self._samples)
+        seconds = slowest / POLL_LOAD_TARGET_SHARE
+        return max(
+            MIN_SCAN_INTERVAL,
+            math.ceil(seconds / MIN_SCAN_INTERVAL) * MIN_SCAN_INTERVAL,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Describe recent polls, for diagnostics."""
+        return {
+            "seconds": [round(s.seconds, 3) for s in self._samples],
+            "requests": [s.requests for s in self._samples],
+        }
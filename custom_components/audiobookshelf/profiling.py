@@ -0,0 +1,78 @@
+"""Profiling one poll, to see where its time goes on a live server."""
+
+import cProfile
+import pstats
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .audiobook_shelf_data_update_coordinator import AudiobookShelfDataUpdateCoordinator
+from .const import DOMAIN, PROFILE_HOT_FUNCTIONS
+
+
+def hot_functions(profile: cProfile.Profile, limit: int) -> list[dict[str, Any]]:
+    """Return the functions that spent the most time in themselves."""
+    functions = pstats.Stats(profile).get_stats_profile().func_profiles
+    hottest = sorted(functions.items(), key=lambda item: item[1].tottime, reverse=True)[
+        :limit
+    ]
+    return [
+        {
+            "function": name,
+            "file": function.file_name,
+            "line": function.line_number,
+            "calls": function.ncalls,
+            "own_seconds": function.tottime,
+            "cumulative_seconds": function.cumtime,
+        }
+        for name, function in hottest
+    ]
+
+
+async def async_profile_poll(
+    hass: HomeAssistant, coordinator: AudiobookShelfDataUpdateCoordinator
+) -> dict[str, Any]:
+    """Refresh coordinator under cProfile and describe where the time went."""
+    # cProfile rather than a sampling profiler, which would be a dependency
+    # of its own. It traces the whole event loop while enabled, so anything
+    # else running meanwhile shows up too; the step timings do not.
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as err:
+        # Python allows one profiler at a time, e.g. the profiler
+        # integration's.
+        msg = f"Another profiler is already running: {err}"
+        raise HomeAssistantError(msg) from err
+    loop = hass.loop
+    previous = coordinator.last_poll
+    started = loop.time()
+    try:
+        await coordinator.async_refresh()
+    finally:
+        profile.disable()
+    seconds = loop.time() - started
+    # Only this refresh's own poll. One stopped before polling, e.g. with the
+    # probe reporting the server down, leaves the previous poll in place.
+    poll = coordinator.last_poll if coordinator.last_poll is not previous else None
+
+    # Named like the profiler integration's own files, so the same tools
+    # pick them up.
+    path = hass.config.path(f"{DOMAIN}_poll.{int(time.time())}.cprof")
+    await hass.async_add_executor_job(profile.dump_stats, path)
+    return {
+        "stats_file": path,
+        "succeeded": coordinator.last_update_success,
+        "error": None
+        if coordinator.last_update_success
+        else str(coordinator.last_exception),
+        "seconds": seconds,
+        # Library stats are among them only when rotated into the poll;
+        # otherwise each library refreshes on its own schedule, outside it.
+        "steps": dict(poll.step_seconds) if poll is not None else {},
+        "hot_functions": await hass.async_add_executor_job(
+            hot_functions, profile, PROFILE_HOT_FUNCTIONS
+        ),
+    }
@@ -0,0 +1,115 @@
+"""A cheap, frequent check of whether the server answers, and how fast."""
+
+import asyncio
+from datetime import timedelta
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientError
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    PING_ENDPOINT,
+    PROBE_DOWN_AFTER_FAILURES,
+    PROBE_INTERVAL,
+    PROBE_LATENCY_SMOOTHING,
+    PROBE_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    from .audiobook_shelf_data_update_coordinator import (
+        AudiobookShelfDataUpdateCoordinator,
+    )
+
+_LOGGER = getLogger(__name__)
+
+
+class ReachabilityProbe(DataUpdateCoordinator[dict[str, Any]]):
+    """Pings the server on a short interval of its own."""
+
+    # A poll is five requests and more, and failing all of them is a slow and
+    # costly way to find the server is down. /ping needs no token, touches no
+    # database, and answers in milliseconds, so it can be asked far more often
+    # than anything is polled, and the poll skipped while it goes unanswered.
+
+    def __init__(self, parent: "AudiobookShelfDataUpdateCoordinator") -> None:
+        """Ping parent's server over parent's session."""
+        self.parent = parent
+        self.failures = 0
+        # Exponentially weighted, so one slow answer moves it only a little.
+        self.latency: float | None = None
+        super().__init__(
+            parent.hass,
+            _LOGGER,
+            config_entry=parent.config_entry,
+            name="audiobookshelf reachability",
+            update_interval=timedelta(seconds=PROBE_INTERVAL),
+        )
+
+    @property
+    def server_down(self) -> bool:
+        """Return whether the server has stopped answering."""
+        # Only after a few misses in a row: one lost ping is not worth
+        # skipping a poll over.
+        return self.failures >= PROBE_DOWN_AFTER_FAILURES
+
+    async def _async_ping(self) -> float:
+        """Ping the server once and return the round trip in milliseconds."""
+        # Straight over the entry's session rather than through the limiter,
+        # whose queue would add its wait to the round trip, and which a
+        # long action can fill. It still reuses the poll's connections.
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with self.parent.http_session.get(
+            f"{self.parent.api_url}/{PING_ENDPOINT}", timeout=PROBE_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            await response.read()
+        return (loop.time() - started) * 1000
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Ping the server, keeping count of the misses in a row."""
+        was_down = self.server_down
+        try:
+            round_trip = await self._async_ping()
+        except (ClientError, TimeoutError) as err:
+            self.failures += 1
+            if self.server_down and not was_down:
+                _LOGGER.warning(
+                    "Audiobookshelf at %s is not answering, pausing polls: %s",
+                    self.parent.api_url,
+                    err,
+                )
+        else:
+            self.failures = 0
+            self.latency = (
+                round_trip
+                if self.latency is None
+                else self.latency
+                + PROBE_LATENCY_SMOOTHING * (round_trip - self.latency)
+            )
+            if was_down:
+                self._async_server_back()
+        return {
+            "server_reachable": not self.server_down,
+            # None while down: the last figure describes a server no longer
+            # answering at all.
+            "server_latency": None if self.server_down else self.latency,
+        }
+
+    @callback
+    def _async_server_back(self) -> None:
+        """Catch the poll up as soon as the server answers again."""
+        _LOGGER.info("Audiobookshelf at %s is answering again", self.parent.api_url)
+        # Skipped polls left every value to age, so rather than wait out
+        # the rest of the interval, poll now.
+        self.hass.async_create_task(self.parent.async_request_refresh())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Describe the probe, for diagnostics."""
+        return {
+            "server_down": self.server_down,
+            "failures_in_a_row": self.failures,
+            "latency_ms": None if self.latency is None else round(self.latency, 1),
+        }
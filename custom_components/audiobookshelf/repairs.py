@@ -0,0 +1,63 @@
+"""Fixes for the Audiobookshelf integration's repairs issues."""
+
+from typing import Any, cast
+
+import voluptuous as vol
+from homeassistant.components.repairs import RepairsFlow
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import issue_registry as ir
+
+from .const import DOMAIN
+
+
+class ScanIntervalRepairFlow(RepairsFlow):
+    """Sets the interval suggested for polls that outgrew theirs."""
+
+    def __init__(self, entry_id: str, scan_interval: int) -> None:
+        """Fix by setting entry_id's scan interval to scan_interval."""
+        self._entry_id = entry_id
+        self._scan_interval = scan_interval
+
+    async def async_step_init(
+        self,
+        user_input: dict[str, Any] | None = None,  # noqa: ARG002
+    ) -> FlowResult:
+        """Handle the first step of the fix flow."""
+        return await self.async_step_confirm()
+
+    async def async_step_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Show the suggestion, and apply it once confirmed."""
+        entry = self.hass.config_entries.async_get_entry(self._entry_id)
+        if entry is None:
+            return self.async_abort(reason="entry_removed")
+        if user_input is not None:
+            # Through the options, as the options flow would, so the update
+            # listener applies it to the running entry.
+            self.hass.config_entries.async_update_entry(
+                entry,
+                options={**entry.options, CONF_SCAN_INTERVAL: self._scan_interval},
+            )
+            return self.async_create_entry(data={})
+        issue = ir.async_get(self.hass).async_get_issue(DOMAIN, self.issue_id)
+        return self.async_show_form(
+            step_id="confirm",
+            data_schema=vol.Schema({}),
+            description_placeholders=issue.translation_placeholders if issue else None,
+        )
+
+
+async def async_create_fix_flow(
+    hass: HomeAssistant,  # noqa: ARG001
+    issue_id: str,  # noqa: ARG001
+    data: dict[str, str | int | float | None] | None,
+) -> RepairsFlow:
+    """Create the flow that fixes an issue."""
+    # The only fixable issue is the scan interval one, which always has data.
+    assert data is not None  # noqa: S101
+    return ScanIntervalRepairFlow(
+        str(data["entry_id"]), int(cast("int", data["scan_interval"]))
+    )
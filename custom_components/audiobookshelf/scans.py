@@ -0,0 +1,321 @@
+"""Library scans, followed through the server's socket events."""
+
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from logging import getLogger
+from typing import TYPE_CHECKING, Annotated, Any
+from urllib.parse import urlsplit
+
+from aioaudiobookshelf.exceptions import AbsError
+from aioaudiobookshelf.schema import _BaseModel
+from aiohttp import ClientError
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from mashumaro.types import Alias
+from socketio import AsyncClient
+from socketio.exceptions import ConnectionError as SocketConnectionError
+
+from .const import (
+    LIBRARIES_ENDPOINT,
+    SCAN_TASKS_POLL_INTERVAL,
+    SCAN_TASKS_POLL_INTERVAL_DISCONNECTED,
+    SCAN_WAIT_POLL_SECONDS,
+    SEARCH_ENDPOINT,
+    SOCKET_CONNECT_TIMEOUT,
+)
+from .limiter import Priority, request_priority
+
+if TYPE_CHECKING:
+    from .audiobook_shelf_data_update_coordinator import (
+        AudiobookShelfDataUpdateCoordinator,
+    )
+
+_LOGGER = getLogger(__name__)
+
+LIBRARY_SCAN_ACTION = "library-scan"
+TASKS_ENDPOINT = "api/tasks"
+SCAN_STATES = ["idle", "scanning"]
+
+
+def socketio_path_for(url: str) -> str:
+    """Return the path of the socket of the server at url."""
+    # Under the server's own path, which is not the root behind a reverse
+    # proxy serving it at e.g. https://host/abs. The client would otherwise
+    # look for the socket at the host's root.
+    return "/".join(filter(None, (urlsplit(url).path.strip("/"), "socket.io")))
+
+
+@dataclass(kw_only=True)
+class ServerTask(_BaseModel):
+    """A task the server is running, as /api/tasks and task events carry it."""
+
+    id_: Annotated[str, Alias("id")]
+    action: str
+    data: dict[str, Any] | None = None
+    is_failed: Annotated[bool, Alias("isFailed")] = False
+    is_finished: Annotated[bool, Alias("isFinished")] = False
+    error: str | None = None
+    finished_at: Annotated[int | None, Alias("finishedAt")] = None  # ms epoch
+
+    @property
+    def library_id(self) -> str | None:
+        """Return the library a scan task is scanning, None for other tasks."""
+        if self.action != LIBRARY_SCAN_ACTION or not self.data:
+            return None
+        library_id = self.data.get("libraryId")
+        return library_id if isinstance(library_id, str) else None
+
+
+@dataclass(kw_only=True)
+class TasksResponse(_BaseModel):
+    """TasksResponse."""
+
+    tasks: list[ServerTask]
+
+
+@dataclass
+class LibraryScan:
+    """What is known of one library's scans."""
+
+    scanning: bool = False
+    # Items the running scan, or the last one, added or updated so far. The
+    # server reports no percentage, only the items as it changes them.
+    items_changed: int = 0
+    last_scan: datetime | None = None
+    error: str | None = None
+
+    @property
+    def state(self) -> str:
+        """Return whether the library is being scanned, as a sensor state."""
+        return "scanning" if self.scanning else "idle"
+
+
+class LibraryScanCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Follows library scans through socket events, polling /api/tasks as well."""
+
+    # Polling /api/tasks often enough to catch a scan would cost a request
+    # every few seconds for something that happens a few times a day. The
+    # socket says when a scan starts and finishes instead, and the poll only
+    # catches what it missed: rarely while it is connected, and more often,
+    # trying to connect again each time, while it is not.
+
+    def __init__(self, parent: "AudiobookShelfDataUpdateCoordinator") -> None:
+        """Follow the scans of parent's server."""
+        self.parent = parent
+        self.scans: dict[str, LibraryScan] = {}
+        self._socket: AsyncClient | None = None
+        self._connecting: asyncio.Task[None] | None = None
+        self._changed = asyncio.Event()
+        super().__init__(
+            parent.hass,
+            _LOGGER,
+            config_entry=parent.config_entry,
+            name="audiobookshelf library scans",
+            update_interval=timedelta(seconds=SCAN_TASKS_POLL_INTERVAL_DISCONNECTED),
+        )
+
+    @property
+    def socket_connected(self) -> bool:
+        """Return whether scan events are arriving as they happen."""
+        return self._socket is not None and self._socket.connected
+
+    def scan_for(self, library_id: str) -> LibraryScan:
+        """Return what is known of a library's scans."""
+        return self.scans.setdefault(library_id, LibraryScan())
+
+    def _data(self) -> dict[str, Any]:
+        """Return the scans, shaped like the entry's own data for the sensors."""
+        return {"library_scans": self.scans}
+
+    def _wake_waiters(self) -> None:
+        """Have anything waiting on a scan look at it again."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @callback
+    def _async_changed(self) -> None:
+        """Pass a change an event brought on to the sensors and any waiters."""
+        self._wake_waiters()
+        self.async_set_updated_data(self._data())
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Catch up on scans from /api/tasks, missed events and all."""
+        if not self.socket_connected:
+            self.async_connect()
+        try:
+            with (
+                self.parent.tracer.root_span("library scans poll"),
+                request_priority(Priority.POLL),
+            ):
+                client = await self.parent.get_client()
+                response = TasksResponse.from_json(await client._get(TASKS_ENDPOINT))  # noqa: SLF001
+        except (AbsError, ClientError, TimeoutError, ValueError, LookupError) as err:
+            # ValueError and LookupError are what parsing raises on schema
+            # drift, failed the same way as the entry's own poll steps.
+            msg = f"Error fetching {TASKS_ENDPOINT}: {err}"
+            raise UpdateFailed(msg) from err
+        running: set[str] = set()
+        for task in response.tasks:
+            library_id = task.library_id
+            if library_id is not None and not task.is_finished:
+                running.add(library_id)
+        for library_id, scan in self.scans.items():
+            if scan.scanning and library_id not in running:
+                # Its finish was missed, so its time is when it was noticed.
+                self._finish(library_id, None)
+        for library_id in running:
+            if not self.scan_for(library_id).scanning:
+                self._start(library_id)
+        self._wake_waiters()
+        return self._data()
+
+    def _start(self, library_id: str) -> None:
+        """Record a scan of library_id starting."""
+        scan = self.scan_for(library_id)
+        scan.scanning = True
+        scan.items_changed = 0
+        scan.error = None
+
+    def _finish(self, library_id: str, task: ServerTask | None) -> None:
+        """Record a scan of library_id finishing, and what it leaves out of date."""
+        scan = self.scan_for(library_id)
+        scan.scanning = False
+        finished_at = task.finished_at if task is not None else None
+        scan.last_scan = (
+            dt_util.utc_from_timestamp(finished_at / 1000)
+            if finished_at
+            else dt_util.utcnow()
+        )
+        scan.error = task.error if task is not None and task.is_failed else None
+        # The scan changed what the library list, searches and the library's
+        # stats say, so none waits out its cache or interval to show it.
+        self.parent.response_cache.invalidate(LIBRARIES_ENDPOINT, SEARCH_ENDPOINT)
+        child = self.parent.library_coordinators.get(library_id)
+        if child is not None:
+            self.hass.async_create_task(child.async_request_refresh())
+
+    @callback
+    def async_scan_requested(self, library_id: str) -> None:
+        """Record a scan started from here, ahead of the server's event."""
+        self._start(library_id)
+        self._async_changed()
+
+    async def async_wait_scanned(self, library_id: str, seconds: float) -> bool:
+        """Wait up to seconds for a library's scan to finish."""
+        try:
+            async with asyncio.timeout(seconds):
+                while self.scan_for(library_id).scanning:
+                    changed = self._changed
+                    with suppress(TimeoutError):
+                        async with asyncio.timeout(SCAN_WAIT_POLL_SECONDS):
+                            await changed.wait()
+                    if not changed.is_set() and not self.socket_connected:
+                        # No events to wait for, so ask rather than wait for
+                        # the next fallback poll.
+                        await self.async_refresh()
+        except TimeoutError:
+            return False
+        return True
+
+    @callback
+    def async_connect(self) -> None:
+        """Start connecting to the server's socket, unless already under way."""
+        if self._connecting is not None or self.config_entry is None:
+            return
+        self._connecting = self.config_entry.async_create_background_task(
+            self.hass, self._async_connect(), name="audiobookshelf socket connect"
+        )
+
+    async def _async_connect(self) -> None:
+        """Connect to the server's socket, leaving it to the poll on failure."""
+        try:
+            if self._socket is None:
+                self._socket = self._new_socket()
+            await self._socket.connect(
+                self.parent.api_url,
+                socketio_path=socketio_path_for(self.parent.api_url),
+                wait_timeout=SOCKET_CONNECT_TIMEOUT,
+            )
+        except (SocketConnectionError, ValueError) as err:
+            _LOGGER.debug(
+                "Could not connect to the Audiobookshelf socket, polling for "
+                "library scans instead: %s",
+                err,
+            )
+        finally:
+            self._connecting = None
+
+    def _new_socket(self) -> AsyncClient:
+        """Build a socket client handling the events scans are followed by."""
+        # Reconnected by the fallback poll rather than by the client itself,
+        # so there is one way back from a lost connection, not two racing.
+        client = AsyncClient(reconnection=False, handle_sigint=False)
+        client.on("connect", self._on_connect)
+        client.on("disconnect", self._on_disconnect)
+        client.on("task_started", self._on_task)
+        client.on("task_finished", self._on_task)
+        client.on("items_added", self._on_items)
+        client.on("items_updated", self._on_items)
+        return client
+
+    async def _on_connect(self) -> None:
+        """Sign in, then only poll for what an event might have missed."""
+        if self._socket is not None:
+            await self._socket.emit("auth", self.parent.token)
+        self.update_interval = timedelta(seconds=SCAN_TASKS_POLL_INTERVAL)
+        _LOGGER.debug("Connected to the Audiobookshelf socket")
+
+    async def _on_disconnect(self, *_: Any) -> None:
+        """Poll more often, and reconnect, until the socket is back."""
+        self.update_interval = timedelta(seconds=SCAN_TASKS_POLL_INTERVAL_DISCONNECTED)
+        self.async_reschedule()
+        _LOGGER.debug("Disconnected from the Audiobookshelf socket")
+
+    async def _on_task(self, data: dict[str, Any]) -> None:
+        """Follow a scan task starting or finishing."""
+        try:
+            task = ServerTask.from_dict(data)
+        except (ValueError, LookupError, TypeError) as err:
+            # Raised inside the socket client's callback, it would only be
+            # logged there as an error; one odd event is not worth that.
+            _LOGGER.debug("Ignoring a task event that did not parse: %s", err)
+            return
+        if task.library_id is None:
+            return
+        if task.is_finished:
+            self._finish(task.library_id, task)
+        else:
+            self._start(task.library_id)
+        self._async_changed()
+
+    async def _on_items(self, items: list[dict[str, Any]]) -> None:
+        """Count the items a running scan changes, by library."""
+        # Read as plain dicts: parsing every full item in a large scan's
+        # batches would cost far more than the one field counted.
+        changed = False
+        for item in items:
+            scan = self.scans.get(item.get("libraryId", ""))
+            if scan is not None and scan.scanning:
+                scan.items_changed += 1
+                changed = True
+        if changed:
+            self._async_changed()
+
+    @callback
+    def async_reschedule(self) -> None:
+        """Start the wait for the next poll over, on the current interval."""
+        self._async_unsub_refresh()
+        if self._listeners:
+            self._schedule_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Stop polling and disconnect from the socket."""
+        await super().async_shutdown()
+        if self._connecting is not None:
+            self._connecting.cancel()
+        if self._socket is not None:
+            await self._socket.disconnect()
+            self._socket = None
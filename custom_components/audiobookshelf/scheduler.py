@@ -0,0 +1,61 @@
+"""Spreads the polls of every configured server apart."""
+
+import asyncio
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    DOMAIN,
+    ENTRY_POLL_SPACING_SECONDS,
+    SHARED_MAX_CONCURRENT_REQUESTS,
+    SHARED_MAX_REQUESTS_PER_SECOND,
+)
+from .limiter import RequestLimiter
+
+_SCHEDULER: HassKey["PollScheduler"] = HassKey(f"{DOMAIN}_scheduler")
+
+
+class PollScheduler:
+    """Staggers the start of each entry's polls and holds their shared budget."""
+
+    # Entries set up together at startup would otherwise poll in lockstep
+    # for as long as Home Assistant runs, each burst landing on the network
+    # and on the host at the same moment. Once pushed apart they stay apart,
+    # since every poll is scheduled from the end of the one before it.
+    #
+    # Only the starts are spaced: a poll does not hold its turn until it
+    # finishes, so polls longer than the spacing still overlap. Holding it
+    # would let one slow or unreachable server delay every other server's
+    # polls; what overlapping polls send together is bounded by the shared
+    # budget instead.
+
+    def __init__(self, spacing: float = ENTRY_POLL_SPACING_SECONDS) -> None:
+        """Start polls at least spacing seconds apart."""
+        self.spacing = spacing
+        # On top of each entry's own limiter, which protects its server: this
+        # one bounds what every entry together sends from this host.
+        self.budget = RequestLimiter(
+            rate=SHARED_MAX_REQUESTS_PER_SECOND,
+            max_concurrent=SHARED_MAX_CONCURRENT_REQUESTS,
+        )
+        self._next_start = 0.0
+
+    async def async_wait_turn(self) -> None:
+        """Wait until a poll may start, spacing after the last one started."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # The slot is taken before sleeping, so polls arriving together are
+        # let through in the order they asked.
+        start = max(now, self._next_start)
+        self._next_start = start + self.spacing
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+def scheduler_for(hass: HomeAssistant) -> PollScheduler:
+    """Return the scheduler every entry shares, creating it on first use."""
+    scheduler = hass.data.get(_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[_SCHEDULER] = PollScheduler()
+    return scheduler
@@ -0,0 +1,149 @@
+"""Search across every library through the server's own search endpoint."""
+
+import asyncio
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Annotated, Any
+
+from aioaudiobookshelf.schema import _BaseModel
+from mashumaro.types import Alias
+
+from .catalog import CatalogItem, CatalogItemResponse
+
+if TYPE_CHECKING:
+    from aioaudiobookshelf import AdminClient
+
+
+@dataclass(kw_only=True)
+class _SearchMatch(_BaseModel):
+    """One book or podcast the server matched."""
+
+    library_item: Annotated[CatalogItemResponse, Alias("libraryItem")]
+
+
+@dataclass(kw_only=True)
+class _SearchSeriesRef(_BaseModel):
+    """The series half of a series match."""
+
+    id_: Annotated[str, Alias("id")]
+    name: str
+
+
+@dataclass(kw_only=True)
+class _SearchSeries(_BaseModel):
+    """A matched series and the books of it in this library."""
+
+    series: _SearchSeriesRef
+    books: list[CatalogItemResponse] = field(default_factory=list)
+
+
+@dataclass(kw_only=True)
+class _SearchAuthor(_BaseModel):
+    """A matched author."""
+
+    id_: Annotated[str, Alias("id")]
+    name: str
+
+
+@dataclass(kw_only=True)
+class _SearchResponse(_BaseModel):
+    """Response of /api/libraries/{id}/search."""
+
+    # Book libraries answer with book, podcast libraries with podcast, and
+    # the rest depends on the server version, so everything is optional.
+    book: list[_SearchMatch] = field(default_factory=list)
+    podcast: list[_SearchMatch] = field(default_factory=list)
+    series: list[_SearchSeries] = field(default_factory=list)
+    authors: list[_SearchAuthor] = field(default_factory=list)
+
+
+def rank(query: str, text: str | None) -> int:
+    """Score how well text matches query, lower being better."""
+    # The server already decided these match. This only orders results from
+    # several libraries against one another, so a coarse score is enough.
+    if not text:
+        return 4
+    needle = query.casefold()
+    haystack = text.casefold()
+    if haystack == needle:
+        return 0
+    if haystack.startswith(needle):
+        return 1
+    if any(word.startswith(needle) for word in haystack.split()):
+        return 2
+    if needle in haystack:
+        return 3
+    # Matched on something else, such as an author, narrator or tag.
+    return 4
+
+
+def _item_record(item: CatalogItem) -> dict[str, Any]:
+    """Project an item onto the fields worth returning to an automation."""
+    return {
+        "id": item.id_,
+        "library_id": item.library_id,
+        "media_type": item.media_type,
+        "title": item.title,
+        "author": item.author,
+        "series": item.series,
+        "duration": item.duration,
+    }
+
+
+async def async_search(
+    client: "AdminClient", library_ids: Sequence[str], query: str, limit: int
+) -> dict[str, list[dict[str, Any]]]:
+    """Search every library at once and merge the results, best match first."""
+
+    async def _search(library_id: str) -> tuple[str, _SearchResponse]:
+        response = await client._get(  # noqa: SLF001
+            f"api/libraries/{library_id}/search", {"q": query, "limit": limit}
+        )
+        return library_id, _SearchResponse.from_json(response)
+
+    # Concurrent rather than in turn, so the reply takes as long as the
+    # slowest library rather than the sum of them all.
+    responses = await asyncio.gather(
+        *(_search(library_id) for library_id in library_ids)
+    )
+
+    items: dict[str, CatalogItem] = {}
+    series: dict[str, dict[str, Any]] = {}
+    authors: dict[str, dict[str, Any]] = {}
+    for library_id, response in responses:
+        for match in (*response.book, *response.podcast):
+            item = CatalogItem.from_response(library_id, match.library_item)
+            items[item.id_] = item
+        for found in response.series:
+            series[found.series.id_] = {
+                "id": found.series.id_,
+                "library_id": library_id,
+                "name": found.series.name,
+                "books": len(found.books),
+            }
+        for author in response.authors:
+            # Authors are per library on the server, so the same person in
+            # two libraries is two results with two ids.
+            authors[author.id_] = {
+                "id": author.id_,
+                "library_id": library_id,
+                "name": author.name,
+            }
+
+    return {
+        "items": [
+            _item_record(item)
+            for item in sorted(
+                items.values(),
+                key=lambda item: (rank(query, item.title), item.title or ""),
+            )[:limit]
+        ],
+        "series": sorted(
+            series.values(),
+            key=lambda found: (rank(query, found["name"]), found["name"]),
+        )[:limit],
+        "authors": sorted(
+            authors.values(),
+            key=lambda found: (rank(query, found["name"]), found["name"]),
+        )[:limit],
+    }
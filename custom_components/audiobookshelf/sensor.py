@@ -1,17 +1,19 @@
 """Module containing the sensor platform for the Audiobookshelf integration."""
 
 from dataclasses import dataclass
+from datetime import datetime
 from logging import getLogger
 from typing import Any, Final
 
 from aioaudiobookshelf.schema.library import Library
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfInformation
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -19,8 +21,14 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from custom_components.audiobookshelf import AudiobookshelfConfigEntry, clean_config
 from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
     AudiobookShelfDataUpdateCoordinator,
+    LibraryStatsCoordinator,
+    Listening,
+    UserActivity,
 )
 from custom_components.audiobookshelf.entity import device_info_for
+from custom_components.audiobookshelf.freshness import metric_key
+from custom_components.audiobookshelf.reachability import ReachabilityProbe
+from custom_components.audiobookshelf.scans import SCAN_STATES, LibraryScanCoordinator
 
 _LOGGER = getLogger(__name__)
 
@@ -83,6 +91,18 @@ SENSOR_DESCRIPTIONS: Final[tuple[AudiobookShelfSensorEntityDescription, ...]] =
 )
 
 
+LATENCY_DESCRIPTION: Final = AudiobookShelfSensorEntityDescription(
+    key="server_latency",
+    translation_key="server_latency",
+    icon="mdi:timer-sand",
+    device_class=SensorDeviceClass.DURATION,
+    state_class=SensorStateClass.MEASUREMENT,
+    native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+    suggested_display_precision=0,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+
 def library_descriptions(
     library: Library,
 ) -> list[AudiobookShelfSensorEntityDescription]:
@@ -127,6 +147,106 @@ def library_descriptions(
     ]
 
 
+def library_scan_descriptions(
+    library: Library,
+) -> list[AudiobookShelfSensorEntityDescription]:
+    """Build the scan sensor descriptions for one library."""
+    return [
+        AudiobookShelfSensorEntityDescription(
+            key="library_scans",
+            key_context=library.id_,
+            key_context_method="state",
+            translation_key="library_scan",
+            translation_placeholders={"library": library.name},
+            icon="mdi:folder-search-outline",
+            device_class=SensorDeviceClass.ENUM,
+            options=SCAN_STATES,
+        ),
+        AudiobookShelfSensorEntityDescription(
+            key="library_scans",
+            key_context=library.id_,
+            key_context_method="items_changed",
+            translation_key="library_scan_progress",
+            translation_placeholders={"library": library.name},
+            icon="mdi:progress-clock",
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement="items",
+        ),
+        AudiobookShelfSensorEntityDescription(
+            key="library_scans",
+            key_context=library.id_,
+            key_context_method="last_scan",
+            translation_key="library_last_scan",
+            translation_placeholders={"library": library.name},
+            icon="mdi:folder-clock-outline",
+            device_class=SensorDeviceClass.TIMESTAMP,
+        ),
+    ]
+
+
+def user_descriptions(
+    user_id: str, activity: UserActivity
+) -> list[AudiobookShelfSensorEntityDescription]:
+    """Build the sensor descriptions for one user."""
+    placeholders = {"user": activity.username}
+    return [
+        AudiobookShelfSensorEntityDescription(
+            key="user_activity",
+            key_context=user_id,
+            key_context_method="books_in_progress",
+            translation_key="user_books_in_progress",
+            translation_placeholders=placeholders,
+            icon="mdi:book-open-page-variant-outline",
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement="books",
+        ),
+        AudiobookShelfSensorEntityDescription(
+            key="user_activity",
+            key_context=user_id,
+            key_context_method="books_finished",
+            translation_key="user_books_finished",
+            translation_placeholders=placeholders,
+            icon="mdi:book-check-outline",
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement="books",
+        ),
+        AudiobookShelfSensorEntityDescription(
+            key="user_activity",
+            key_context=user_id,
+            key_context_method="last_seen",
+            translation_key="user_last_seen",
+            translation_placeholders=placeholders,
+            icon="mdi:account-clock-outline",
+            device_class=SensorDeviceClass.TIMESTAMP,
+        ),
+        AudiobookShelfSensorEntityDescription(
+            key="user_activity",
+            key_context=user_id,
+            key_context_method="last_listened",
+            translation_key="user_last_listened",
+            translation_placeholders=placeholders,
+            icon="mdi:headphones",
+            device_class=SensorDeviceClass.TIMESTAMP,
+        ),
+    ]
+
+
+def user_listening_description(
+    user_id: str, activity: UserActivity
+) -> AudiobookShelfSensorEntityDescription:
+    """Build the description of one user's open sessions sensor."""
+    return AudiobookShelfSensorEntityDescription(
+        key="listening_by_user",
+        key_context=user_id,
+        key_context_method="sessions",
+        translation_key="user_open_sessions",
+        translation_placeholders={"user": activity.username},
+        icon="mdi:account-music-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="sessions",
+    )
+
+
 async def async_setup_entry(
     hass: HomeAssistant,  # noqa: ARG001
     entry: AudiobookshelfConfigEntry,
@@ -138,21 +258,35 @@ async def async_setup_entry(
     coordinator = entry.runtime_data
 
     async_add_entities(
-        AudiobookShelfSensor(coordinator, entry, description)
+        (
+            OpenSessionsSensor
+            if description.key == "count_open_sessions"
+            else AudiobookShelfSensor
+        )(coordinator, entry, description)
         for description in SENSOR_DESCRIPTIONS
     )
+    async_add_entities(
+        [
+            ServerLatencySensor(
+                coordinator, entry, LATENCY_DESCRIPTION, coordinator.probe
+            )
+        ]
+    )
 
     known_libraries: set[str] = set()
 
     @callback
     def add_new_libraries() -> None:
-        """Create sensors for libraries seen for the first time."""
-        # coordinator.libraries is refreshed by library_stats() on every poll,
-        # and is populated by the first refresh before this platform is set up.
+        """Create sensors for new libraries and stop polling deleted ones."""
+        # coordinator.libraries is kept up to date by the poll, and is populated
+        # by the first refresh before this platform is set up.
         # Reading it rather than calling the API keeps platform setup off the
         # network: a failure there leaves the entry loaded with no entities,
         # which also stops polling, since the coordinator only schedules a
         # refresh while it has listeners.
+        current = {library.id_ for library in coordinator.libraries}
+        for library_id in coordinator.library_coordinators.keys() - current:
+            coordinator.async_detach_library(library_id)
         new = [
             library
             for library in coordinator.libraries
@@ -162,11 +296,26 @@ async def async_setup_entry(
             return
         known_libraries.update(library.id_ for library in new)
         _LOGGER.debug("Adding sensors for %s new librarie(s)", len(new))
-        async_add_entities(
-            AudiobookShelfSensor(coordinator, entry, description)
-            for library in new
-            for description in library_descriptions(library)
-        )
+        entities: list[AudiobookShelfSensor] = []
+        for library in new:
+            library_coordinator = coordinator.async_attach_library(library)
+            entities.extend(
+                AudiobookShelfSensor(
+                    coordinator, entry, description, library_coordinator
+                )
+                for description in library_descriptions(library)
+            )
+            scan_descriptions = library_scan_descriptions(library)
+            entities.extend(
+                LibraryScanSensor(coordinator, entry, description, coordinator.scans)
+                for description in scan_descriptions[:-1]
+            )
+            entities.append(
+                LibraryLastScanSensor(
+                    coordinator, entry, scan_descriptions[-1], coordinator.scans
+                )
+            )
+        async_add_entities(entities)
 
     add_new_libraries()
     # A library created on the server was previously counted by
@@ -174,11 +323,43 @@ async def async_setup_entry(
     # reloaded the integration.
     entry.async_on_unload(coordinator.async_add_listener(add_new_libraries))
 
+    known_users: set[str] = set()
+
+    @callback
+    def add_new_users() -> None:
+        """Create sensors for users new since the last poll."""
+        # A deleted user's sensors stay, unavailable, as a library's do.
+        activity: dict[str, UserActivity] = (coordinator.data or {}).get(
+            "user_activity", {}
+        )
+        new = activity.keys() - known_users
+        if not new:
+            return
+        known_users.update(new)
+        _LOGGER.debug("Adding sensors for %s new user(s)", len(new))
+        entities: list[AudiobookShelfSensor] = []
+        for user_id in new:
+            entities.extend(
+                UserSensor(coordinator, entry, description)
+                for description in user_descriptions(user_id, activity[user_id])
+            )
+            entities.append(
+                UserListeningSensor(
+                    coordinator,
+                    entry,
+                    user_listening_description(user_id, activity[user_id]),
+                )
+            )
+        async_add_entities(entities)
+
+    add_new_users()
+    entry.async_on_unload(coordinator.async_add_listener(add_new_users))
+
 
 class AudiobookShelfSensor(CoordinatorEntity, SensorEntity):
     """Representation of a sensor."""
 
-    coordinator: AudiobookShelfDataUpdateCoordinator
+    coordinator: AudiobookShelfDataUpdateCoordinator | LibraryStatsCoordinator
     _attr_has_entity_name = True
 
     def __init__(
@@ -186,12 +367,16 @@ class AudiobookShelfSensor(CoordinatorEntity, SensorEntity):
         coordinator: AudiobookShelfDataUpdateCoordinator,
         entry: AudiobookshelfConfigEntry,
         sensor_description: AudiobookShelfSensorEntityDescription,
+        follows: LibraryStatsCoordinator
+        | LibraryScanCoordinator
+        | ReachabilityProbe
+        | None = None,
     ) -> None:
-        """Initialize the sensor."""
+        """Initialize the sensor, following another of the entry's coordinators."""
         self.entity_description: AudiobookShelfSensorEntityDescription = (
             sensor_description
         )
-        super().__init__(coordinator, None)
+        super().__init__(follows or coordinator, None)
         # Keyed on the entry id rather than the API URL, which the user can
         # edit. Any change to this format needs a matching async_migrate_entry.
         self._attr_unique_id = (
@@ -201,15 +386,35 @@ class AudiobookShelfSensor(CoordinatorEntity, SensorEntity):
         )
         self._attr_device_info = device_info_for(entry, coordinator)
 
+    @property
+    def _metric(self) -> str:
+        """Return the key this sensor's value is tracked under."""
+        return metric_key(
+            self.entity_description.key, self.entity_description.key_context
+        )
+
     @property
     def available(self) -> bool:
-        """Return whether the library this sensor tracks still exists."""
+        """Return whether this sensor's own value is recent enough to show."""
+        # Deliberately not the coordinator's last_update_success: a poll that
+        # lost one endpoint, or even all of them, still has values from the
+        # last good poll worth showing until they pass their age limit.
+        if not self.coordinator.freshness.is_fresh(self._metric):
+            return False
         key_context = self.entity_description.key_context
         if key_context is None:
-            return super().available
-        return super().available and key_context in self.coordinator.data.get(
-            self.entity_description.key, {}
-        )
+            return True
+        return key_context in self.coordinator.data.get(self.entity_description.key, {})
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Say when a value held over from an earlier poll was fetched."""
+        # Only while stale, so a healthy poll does not record a new attribute
+        # value on every sensor every time.
+        if not self.coordinator.freshness.is_stale(self._metric):
+            return None
+        fetched_at = self.coordinator.freshness.fetched_at(self._metric)
+        return {"last_fetched": None if fetched_at is None else fetched_at.isoformat()}
 
     @property
     def native_value(self) -> Any | None:
@@ -227,3 +432,161 @@ class AudiobookShelfSensor(CoordinatorEntity, SensorEntity):
                 native_value, self.entity_description.key_context_method, None
             )
         return native_value
+
+
+class UserSensor(AudiobookShelfSensor):
+    """A sensor on one user, from the entry's users step."""
+
+    @property
+    def _metric(self) -> str:
+        """Return the key this sensor's value is tracked under."""
+        # Every user arrives in the one response, so they are fresh or stale
+        # together, unlike libraries, whose stats are fetched one at a time.
+        return self.entity_description.key
+
+
+def _library_names(coordinator: AudiobookShelfDataUpdateCoordinator) -> dict[str, str]:
+    """Return each known library's name by id."""
+    # Names are looked up as attributes are read, from what the entry already
+    # holds, so grouping the sessions needs no other step to have run first.
+    return {library.id_: library.name for library in coordinator.libraries}
+
+
+class OpenSessionsSensor(AudiobookShelfSensor):
+    """The open session count, with who is listening on what as attributes."""
+
+    coordinator: AudiobookShelfDataUpdateCoordinator  # type: ignore[assignment]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Count the open sessions by user, by device and by library."""
+        data = self.coordinator.data
+        activity: dict[str, UserActivity] = data.get("user_activity", {})
+        library_names = _library_names(self.coordinator)
+        by_user: dict[str, Listening] = data.get("listening_by_user", {})
+        by_device: dict[str, Listening] = data.get("listening_by_device", {})
+        by_library: dict[str, Listening] = data.get("listening_by_library", {})
+        return {
+            **(super().extra_state_attributes or {}),
+            "users": {
+                (
+                    activity[user_id].username if user_id in activity else user_id
+                ): group.sessions
+                for user_id, group in by_user.items()
+            },
+            "devices": {device: group.sessions for device, group in by_device.items()},
+            "libraries": {
+                library_names.get(library_id, library_id): group.sessions
+                for library_id, group in by_library.items()
+            },
+        }
+
+
+class UserListeningSensor(UserSensor):
+    """How many sessions one user has open, and on what."""
+
+    coordinator: AudiobookShelfDataUpdateCoordinator  # type: ignore[assignment]
+
+    @property
+    def _listening(self) -> Listening | None:
+        """Return the user's share of the open sessions, None with none open."""
+        by_user: dict[str, Listening] = self.coordinator.data.get(
+            self.entity_description.key, {}
+        )
+        return by_user.get(self.entity_description.key_context or "")
+
+    @property
+    def available(self) -> bool:
+        """Return whether the open sessions are recent enough to show."""
+        # A user with nothing open is missing from the grouping, which here
+        # means none rather than gone.
+        return self.coordinator.freshness.is_fresh(self._metric)
+
+    @property
+    def native_value(self) -> int:
+        """Return how many sessions the user has open."""
+        listening = self._listening
+        return 0 if listening is None else listening.sessions
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Name the devices and libraries the user is listening on and in."""
+        listening = self._listening or Listening()
+        library_names = _library_names(self.coordinator)
+        return {
+            **(super().extra_state_attributes or {}),
+            "devices": sorted(listening.devices),
+            "libraries": sorted(
+                library_names.get(library_id, library_id)
+                for library_id in listening.libraries
+            ),
+        }
+
+
+class LibraryScanSensor(AudiobookShelfSensor):
+    """A sensor on a library's scans, following the entry's scan coordinator."""
+
+    # Read as the other sensors are, but with no freshness record: scans are
+    # not polled for, so their values have no age to go stale at.
+    coordinator: LibraryScanCoordinator  # type: ignore[assignment]
+
+    @property
+    def available(self) -> bool:
+        """Return whether scans are being followed at all."""
+        # Scans are not a polled metric with an age: between events there is
+        # nothing to fetch, so only a failed catch-up poll says anything.
+        return (
+            self.coordinator.last_update_success and self.coordinator.data is not None
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Give the error the last scan failed with on its state, if it did."""
+        if self.entity_description.key_context_method != "state":
+            return None
+        data = self.coordinator.data or {}
+        scan = data.get(self.entity_description.key, {}).get(
+            self.entity_description.key_context
+        )
+        if scan is None or scan.error is None:
+            return None
+        return {"error": scan.error}
+
+
+class LibraryLastScanSensor(LibraryScanSensor, RestoreSensor):
+    """When a library was last scanned, kept across restarts."""
+
+    # The server only says when a scan finishes, as it happens, so the time
+    # of one from before Home Assistant started is what was last shown.
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last scan time, unless a scan has been seen since."""
+        await super().async_added_to_hass()
+        last = await self.async_get_last_sensor_data()
+        library_id = self.entity_description.key_context
+        if last is None or library_id is None:
+            return
+        restored = last.native_value
+        if not isinstance(restored, datetime):
+            return
+        scan = self.coordinator.scan_for(library_id)
+        if scan.last_scan is None or restored > scan.last_scan:
+            scan.last_scan = restored
+
+
+class ServerLatencySensor(AudiobookShelfSensor):
+    """The server's smoothed ping round trip, following the entry's probe."""
+
+    coordinator: ReachabilityProbe  # type: ignore[assignment]
+
+    @property
+    def available(self) -> bool:
+        """Return whether the server has been pinged yet."""
+        # Unknown rather than unavailable while the server is down, which the
+        # connectivity sensor already says.
+        return self.coordinator.data is not None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return no attributes: a ping's value is never held over."""
+        return None
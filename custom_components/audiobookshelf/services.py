@@ -1,103 +1,311 @@
 """Module containing the services platform for the Audiobookshelf integration."""
 
+from collections.abc import Awaitable, Callable, Coroutine
 from logging import getLogger
-from typing import cast
+from typing import Any, cast
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from aioaudiobookshelf.exceptions import AbsError
-from aioaudiobookshelf.schema.library import LibraryItemMinifiedBook
+from aiohttp import ClientError
 from homeassistant.config_entries import ConfigEntryState
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import (
+    HomeAssistantError,
+    ServiceValidationError,
+    Unauthorized,
+    UnknownUser,
+)
+from homeassistant.helpers.importlib import async_import_module
 
 from .audiobook_shelf_data_update_coordinator import AudiobookShelfDataUpdateCoordinator
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    SCAN_WAIT_DEFAULT_TIMEOUT,
+    SCAN_WAIT_MAX_TIMEOUT,
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_ENDPOINT,
+    SEARCH_MAX_LIMIT,
+)
 
 SERVICE_REMOVE_PROGRESS = "remove_my_progress"
+SERVICE_SEARCH = "search"
+SERVICE_PROFILE_POLL = "profile_poll"
+SERVICE_SCAN_LIBRARY = "scan_library"
 
+SERVICE_ATTRIBUTE_CONFIG_ENTRY_ID = "config_entry_id"
 SERVICE_ATTRIBUTE_SERIES_NAME = "series_name"
+SERVICE_ATTRIBUTE_QUERY = "query"
+SERVICE_ATTRIBUTE_LIMIT = "limit"
+SERVICE_ATTRIBUTE_LIBRARY = "library"
+SERVICE_ATTRIBUTE_FORCE = "force"
+SERVICE_ATTRIBUTE_WAIT = "wait"
+SERVICE_ATTRIBUTE_TIMEOUT = "timeout"
 
-SUPPORTED_SERVICES = (SERVICE_REMOVE_PROGRESS,)
+SUPPORTED_SERVICES = (
+    SERVICE_REMOVE_PROGRESS,
+    SERVICE_SEARCH,
+    SERVICE_PROFILE_POLL,
+    SERVICE_SCAN_LIBRARY,
+)
+
+# Only an admin can scan from the web UI, and a forced scan re-reads every
+# file in the library. A profile shows the paths and internals of the whole
+# installation, and its file lands in the config directory.
+ADMIN_SERVICES = frozenset({SERVICE_PROFILE_POLL, SERVICE_SCAN_LIBRARY})
+
+# Search exists to answer a question, so calling it without asking for the
+# response would do nothing at all. A profile is also written to a file.
+SERVICE_RESPONSES = {
+    SERVICE_SEARCH: SupportsResponse.ONLY,
+    SERVICE_PROFILE_POLL: SupportsResponse.OPTIONAL,
+    SERVICE_SCAN_LIBRARY: SupportsResponse.OPTIONAL,
+}
 
-# The match is a substring test against every item in every library, and the
-# deletion cannot be undone, so an empty or blank name must never reach the
-# handler - it would match every book on the server.
 SERVICE_SCHEMAS = {
+    # The match is a substring test against every item in every library, and
+    # the deletion cannot be undone, so an empty or blank name must never
+    # reach the handler - it would match every book on the server.
     SERVICE_REMOVE_PROGRESS: vol.Schema(
         {
+            vol.Optional(SERVICE_ATTRIBUTE_CONFIG_ENTRY_ID): cv.string,
             vol.Required(SERVICE_ATTRIBUTE_SERIES_NAME): vol.All(
                 cv.string, vol.Strip, vol.Length(min=1)
             ),
         }
     ),
+    SERVICE_SEARCH: vol.Schema(
+        {
+            vol.Optional(SERVICE_ATTRIBUTE_CONFIG_ENTRY_ID): cv.string,
+            vol.Required(SERVICE_ATTRIBUTE_QUERY): vol.All(
+                cv.string, vol.Strip, vol.Length(min=1)
+            ),
+            vol.Optional(
+                SERVICE_ATTRIBUTE_LIMIT, default=SEARCH_DEFAULT_LIMIT
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=SEARCH_MAX_LIMIT)),
+        }
+    ),
+    SERVICE_PROFILE_POLL: vol.Schema(
+        {vol.Optional(SERVICE_ATTRIBUTE_CONFIG_ENTRY_ID): cv.string}
+    ),
+    SERVICE_SCAN_LIBRARY: vol.Schema(
+        {
+            vol.Optional(SERVICE_ATTRIBUTE_CONFIG_ENTRY_ID): cv.string,
+            # A library's id or its name, as shown in the web UI.
+            vol.Required(SERVICE_ATTRIBUTE_LIBRARY): vol.All(
+                cv.string, vol.Strip, vol.Length(min=1)
+            ),
+            vol.Optional(SERVICE_ATTRIBUTE_FORCE, default=False): cv.boolean,
+            vol.Optional(SERVICE_ATTRIBUTE_WAIT, default=False): cv.boolean,
+            vol.Optional(
+                SERVICE_ATTRIBUTE_TIMEOUT, default=SCAN_WAIT_DEFAULT_TIMEOUT
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=SCAN_WAIT_MAX_TIMEOUT)),
+        }
+    ),
 }
 
 _LOGGER = getLogger(__name__)
 
 
-def async_setup_services(hass: HomeAssistant) -> bool:
-    """Set up the Audiobookshelf services."""
-
-    def loaded_coordinator() -> AudiobookShelfDataUpdateCoordinator:
-        """Return the coordinator, or explain why the action cannot run."""
-        entries = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            msg = "Audiobookshelf is not configured"
+def loaded_coordinator(
+    hass: HomeAssistant, call: ServiceCall
+) -> AudiobookShelfDataUpdateCoordinator:
+    """Return the targeted server's coordinator, or explain why it cannot run."""
+    entries = hass.config_entries.async_entries(DOMAIN)
+    if not entries:
+        msg = "Audiobookshelf is not configured"
+        raise ServiceValidationError(msg)
+    entry_id: str | None = call.data.get(SERVICE_ATTRIBUTE_CONFIG_ENTRY_ID)
+    if entry_id is not None:
+        entry = next((e for e in entries if e.entry_id == entry_id), None)
+        if entry is None:
+            msg = f"No Audiobookshelf server is configured as {entry_id}"
             raise ServiceValidationError(msg)
-        if entries[0].state is not ConfigEntryState.LOADED:
-            msg = "The Audiobookshelf configuration entry is not loaded"
+    elif len(entries) == 1:
+        # The target is optional while there is only one server, so
+        # actions written before there could be several keep working.
+        entry = entries[0]
+    else:
+        msg = "Several Audiobookshelf servers are configured, choose one"
+        raise ServiceValidationError(msg)
+    if entry.state is not ConfigEntryState.LOADED:
+        msg = "The Audiobookshelf configuration entry is not loaded"
+        raise ServiceValidationError(msg)
+    return cast("AudiobookShelfDataUpdateCoordinator", entry.runtime_data)
+
+
+async def async_check_admin(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Refuse call unless it was made by an admin, or by Home Assistant itself."""
+    # As async_register_admin_service does, which cannot register an action
+    # with a response.
+    if not call.context.user_id:
+        return
+    user = await hass.auth.async_get_user(call.context.user_id)
+    if user is None:
+        raise UnknownUser(context=call.context)
+    if not user.is_admin:
+        raise Unauthorized(context=call.context)
+
+
+async def _async_scan_library(
+    call: ServiceCall, coordinator: AudiobookShelfDataUpdateCoordinator
+) -> dict[str, Any]:
+    """Start a scan of the library call names, waiting for it if asked to."""
+    wanted: str = call.data[SERVICE_ATTRIBUTE_LIBRARY]
+    try:
+        libraries = coordinator.libraries or await coordinator.get_libraries()
+        library = next(
+            (library for library in libraries if wanted in (library.id_, library.name)),
+            None,
+        )
+        if library is None:
+            msg = f"No Audiobookshelf library is called {wanted}"
             raise ServiceValidationError(msg)
-        return cast("AudiobookShelfDataUpdateCoordinator", entries[0].runtime_data)
+        client = await coordinator.get_client()
+        query = "?force=1" if call.data[SERVICE_ATTRIBUTE_FORCE] else ""
+        await client._post(f"api/libraries/{library.id_}/scan{query}")  # noqa: SLF001
+    except (AbsError, ClientError) as err:
+        msg = f"Starting a scan of Audiobookshelf failed: {err}"
+        raise HomeAssistantError(msg) from err
 
-    async def async_handle_remove_progress(call: ServiceCall) -> None:
+    # Marked as scanning before the server's event arrives, so a wait
+    # cannot end before the scan has even been seen to start.
+    scans = coordinator.scans
+    scans.async_scan_requested(library.id_)
+    finished = False
+    if call.data[SERVICE_ATTRIBUTE_WAIT]:
+        finished = await scans.async_wait_scanned(
+            library.id_, call.data[SERVICE_ATTRIBUTE_TIMEOUT]
+        )
+    scan = scans.scan_for(library.id_)
+    return {
+        "library_id": library.id_,
+        "finished": finished,
+        "items_changed": scan.items_changed,
+        "last_scan": None if scan.last_scan is None else scan.last_scan.isoformat(),
+        "error": scan.error,
+    }
+
+
+def _traced(
+    hass: HomeAssistant,
+    service: str,
+    handler: Callable[
+        [ServiceCall, AudiobookShelfDataUpdateCoordinator],
+        Awaitable[ServiceResponse],
+    ],
+) -> Callable[[ServiceCall], Coroutine[Any, Any, ServiceResponse]]:
+    """Run handler on the targeted server, as a trace of its own."""
+
+    async def _handle(call: ServiceCall) -> ServiceResponse:
+        # Checked first, so a user who may not run the action is told that
+        # rather than which servers are configured.
+        if service in ADMIN_SERVICES:
+            await async_check_admin(hass, call)
+        coordinator = loaded_coordinator(hass, call)
+        with coordinator.tracer.root_span(f"action {service}"):
+            return await handler(call, coordinator)
+
+    return _handle
+
+
+def async_setup_services(hass: HomeAssistant) -> bool:
+    """Set up the Audiobookshelf services."""
+
+    async def async_handle_remove_progress(
+        call: ServiceCall, coordinator: AudiobookShelfDataUpdateCoordinator
+    ) -> None:
         """Handle the remove progress service call."""
-        coordinator = loaded_coordinator()
-        series_name: str = call.data[SERVICE_ATTRIBUTE_SERIES_NAME].casefold()
+        series_name: str = call.data[SERVICE_ATTRIBUTE_SERIES_NAME]
         removed = 0
 
         _LOGGER.debug("Searching for %s", series_name)
         try:
             client = await coordinator.get_client()
-            for library in await client.get_all_libraries():
-                async for response in client.get_library_items(library_id=library.id_):
-                    if not response.results:
-                        break
-                    for item in response.results:
-                        if not isinstance(item, LibraryItemMinifiedBook):
-                            continue
-                        item_series_name = item.media.metadata.series_name
-                        if (
-                            not isinstance(item_series_name, str)
-                            or series_name not in item_series_name.casefold()
-                        ):
-                            continue
-                        progress = await client.get_my_media_progress(item_id=item.id_)
-                        if progress is None:
-                            continue
-                        _LOGGER.debug(
-                            "Removing progress for %s",
-                            item.media.metadata.title_ignore_prefix,
-                        )
-                        await client.remove_my_media_progress(
-                            media_progress_id=progress.id_
-                        )
-                        removed += 1
-        except AbsError as err:
-            # Deletions already made cannot be rolled back, so say how far it
-            # got rather than reporting a bare failure.
+            # Matched against the local catalog, which only fetches what
+            # changed since the last sync, rather than paging through every
+            # item of every library on each call.
+            catalog = await coordinator.async_sync_catalog()
+            for item in catalog.in_series(series_name):
+                progress = await client.get_my_media_progress(item_id=item.id_)
+                if progress is None:
+                    continue
+                _LOGGER.debug("Removing progress for %s", item.title)
+                await client.remove_my_media_progress(media_progress_id=progress.id_)
+                removed += 1
+        except (AbsError, ClientError, ValueError, LookupError) as err:
+            # The catalog sync can fail on the connection or on an unexpected
+            # page as well as on the API itself. Deletions already made cannot
+            # be rolled back, so say how far it got rather than reporting a
+            # bare failure.
             msg = f"Removing progress failed after {removed} item(s): {err}"
             raise HomeAssistantError(msg) from err
         finally:
             _LOGGER.debug("Removed progress for %s item(s)", removed)
             await coordinator.async_request_refresh()
 
+    async def async_handle_search(
+        call: ServiceCall, coordinator: AudiobookShelfDataUpdateCoordinator
+    ) -> ServiceResponse:
+        """Handle the search service call."""
+        query: str = call.data[SERVICE_ATTRIBUTE_QUERY]
+        limit: int = call.data[SERVICE_ATTRIBUTE_LIMIT]
+
+        key = (query.casefold(), limit)
+        cached: dict[str, Any] | None = coordinator.response_cache.get(
+            SEARCH_ENDPOINT, key
+        )
+        if cached is not None:
+            return cached
+
+        # Imported on first use, in the executor: its response models are
+        # built when the module loads, and only a search ever needs them.
+        search = await async_import_module(hass, f"{__package__}.search")
+        try:
+            client = await coordinator.get_client()
+            libraries = coordinator.libraries or await coordinator.get_libraries()
+            result: dict[str, Any] = await search.async_search(
+                client, [library.id_ for library in libraries], query, limit
+            )
+        except (AbsError, ClientError, ValueError, LookupError) as err:
+            msg = f"Searching Audiobookshelf failed: {err}"
+            raise HomeAssistantError(msg) from err
+
+        coordinator.response_cache.set(SEARCH_ENDPOINT, result, key)
+        return result
+
+    async def async_handle_profile_poll(
+        _call: ServiceCall, coordinator: AudiobookShelfDataUpdateCoordinator
+    ) -> ServiceResponse:
+        """Handle the profile poll service call."""
+        profiling = await async_import_module(hass, f"{__package__}.profiling")
+        result: dict[str, Any] = await profiling.async_profile_poll(hass, coordinator)
+        return result
+
+    async def async_handle_scan_library(
+        call: ServiceCall, coordinator: AudiobookShelfDataUpdateCoordinator
+    ) -> ServiceResponse:
+        """Handle the scan library service call."""
+        return await _async_scan_library(call, coordinator)
+
     services = {
         SERVICE_REMOVE_PROGRESS: async_handle_remove_progress,
+        SERVICE_SEARCH: async_handle_search,
+        SERVICE_PROFILE_POLL: async_handle_profile_poll,
+        SERVICE_SCAN_LIBRARY: async_handle_scan_library,
     }
     for service in SUPPORTED_SERVICES:
         hass.services.async_register(
-            DOMAIN, service, services[service], schema=SERVICE_SCHEMAS[service]
+            DOMAIN,
+            service,
+            _traced(hass, service, services[service]),
+            schema=SERVICE_SCHEMAS[service],
+            supports_response=SERVICE_RESPONSES.get(service, SupportsResponse.NONE),
         )
 
     return True
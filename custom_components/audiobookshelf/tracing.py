@@ -0,0 +1,312 @@
+"""Traces of polls and actions, exported as OTLP/JSON."""
+
+import json
+import secrets
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+from aiohttp import ClientError, ClientResponse, ClientTimeout
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DOMAIN, VERSION, trace_export_for
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = getLogger(__name__)
+
+# A collector that is down must not hold anything up: each export is sent in
+# the background, and given up on quickly.
+EXPORT_TIMEOUT = ClientTimeout(total=5)
+OTLP_TRACES_PATH = "/v1/traces"
+
+
+class SpanKind(IntEnum):
+    """OTLP span kinds used here."""
+
+    INTERNAL = 1
+    CLIENT = 3
+
+
+class StatusCode(IntEnum):
+    """OTLP span status codes."""
+
+    UNSET = 0
+    OK = 1
+    ERROR = 2
+
+
+@dataclass
+class _Trace:
+    """The spans of one poll or action, exported together once it ends."""
+
+    tracer: "Tracer"
+    trace_id: str = field(default_factory=lambda: secrets.token_hex(16))
+    spans: list["Span"] = field(default_factory=list)
+
+
+@dataclass
+class Span:
+    """One timed operation within a trace."""
+
+    name: str
+    # None when nothing is being traced, so instrumented code need not care.
+    trace: _Trace | None
+    parent_id: str | None = None
+    kind: SpanKind = SpanKind.INTERNAL
+    attributes: dict[str, Any] = field(default_factory=dict)
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    status: StatusCode = StatusCode.UNSET
+    status_message: str = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set one attribute."""
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: int) -> None:
+        """Add amount to a counting attribute."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def set_error(self, message: str) -> None:
+        """Mark the span failed."""
+        self.status = StatusCode.ERROR
+        self.status_message = message
+
+
+_CURRENT: ContextVar[Span | None] = ContextVar("audiobookshelf_span", default=None)
+
+
+def current_span() -> Span:
+    """Return the span code is running in, or one nothing records."""
+    return _CURRENT.get() or Span("untraced", None)
+
+
+@contextmanager
+def _activate(span: Span) -> Iterator[Span]:
+    """Make span current for the block, ending it on the way out."""
+    token = _CURRENT.set(span)
+    try:
+        yield span
+    except BaseException as err:
+        span.set_error(str(err) or type(err).__name__)
+        raise
+    finally:
+        _CURRENT.reset(token)
+        span.end_ns = time.time_ns()
+        if span.status is StatusCode.UNSET:
+            span.status = StatusCode.OK
+        if span.trace is not None:
+            span.trace.spans.append(span)
+
+
+@contextmanager
+def span(
+    name: str,
+    attributes: dict[str, Any] | None = None,
+    kind: SpanKind = SpanKind.INTERNAL,
+) -> Iterator[Span]:
+    """Time the block as a child of the current span, if there is one."""
+    # Child tasks copy the context when created, so a span opened in a task
+    # started inside a poll still lands in the poll's trace.
+    parent = _CURRENT.get()
+    trace = parent.trace if parent is not None else None
+    child = Span(
+        name,
+        trace,
+        parent_id=parent.span_id if parent is not None and trace is not None else None,
+        kind=kind,
+        attributes=dict(attributes or {}),
+    )
+    with _activate(child):
+        yield child
+
+
+def record_response(response: ClientResponse, body: bytes) -> None:
+    """Count one response against the span it was requested in."""
+    current = _CURRENT.get()
+    if current is None or current.trace is None:
+        return
+    # More than one request per span is a hedge, or a walk of several.
+    current.add("http.request.count", 1)
+    current.add("http.response.body.size", len(body))
+    current.set_attribute("http.response.status_code", response.status)
+
+
+def _value(value: Any) -> dict[str, Any]:
+    """Return an attribute value in OTLP/JSON form."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # int64, which the protobuf JSON mapping writes as a string.
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return attributes in OTLP/JSON form."""
+    return [{"key": key, "value": _value(value)} for key, value in attributes.items()]
+
+
+def _span_json(trace_id: str, timed: Span) -> dict[str, Any]:
+    """Return one span in OTLP/JSON form."""
+    status: dict[str, Any] = {"code": int(timed.status)}
+    if timed.status_message:
+        status["message"] = timed.status_message
+    encoded: dict[str, Any] = {
+        "traceId": trace_id,
+        "spanId": timed.span_id,
+        "name": timed.name,
+        "kind": int(timed.kind),
+        "startTimeUnixNano": str(timed.start_ns),
+        "endTimeUnixNano": str(timed.end_ns),
+        "attributes": _attributes(timed.attributes),
+        "status": status,
+    }
+    if timed.parent_id is not None:
+        encoded["parentSpanId"] = timed.parent_id
+    return encoded
+
+
+def otlp_json(
+    trace_id: str, spans: list[Span], resource: dict[str, Any]
+) -> dict[str, Any]:
+    """Return spans as an OTLP/JSON ExportTraceServiceRequest."""
+    scope = {"name": f"custom_components.{DOMAIN}", "version": VERSION}
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _attributes(resource)},
+                "scopeSpans": [
+                    {
+                        "scope": scope,
+                        "spans": [_span_json(trace_id, timed) for timed in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class TraceExporter(Protocol):
+    """Somewhere finished traces are sent."""
+
+    async def async_export(self, payload: dict[str, Any]) -> None:
+        """Send one trace."""
+
+
+class FileTraceExporter:
+    """Appends each trace to a file, one OTLP/JSON request per line."""
+
+    def __init__(self, hass: "HomeAssistant", path: Path) -> None:
+        """Append to path."""
+        self._hass = hass
+        self.path = path
+
+    def _append(self, line: str) -> None:
+        """Append one line to the file."""
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write(line)
+
+    async def async_export(self, payload: dict[str, Any]) -> None:
+        """Append one trace."""
+        line = json.dumps(payload, separators=(",", ":")) + "\n"
+        try:
+            await self._hass.async_add_executor_job(self._append, line)
+        except OSError as err:
+            _LOGGER.debug("Could not write trace to %s: %s", self.path, err)
+
+
+class HttpTraceExporter:
+    """Posts each trace to an OTLP/HTTP collector."""
+
+    def __init__(self, hass: "HomeAssistant", url: str) -> None:
+        """Post to the collector at url."""
+        self._hass = hass
+        self.url = url.rstrip("/")
+        if not self.url.endswith(OTLP_TRACES_PATH):
+            self.url += OTLP_TRACES_PATH
+
+    async def async_export(self, payload: dict[str, Any]) -> None:
+        """Post one trace."""
+        # Home Assistant's shared session: the collector is not the
+        # Audiobookshelf server, and must not use up its connections.
+        session = async_get_clientsession(self._hass)
+        try:
+            async with session.post(
+                self.url, json=payload, timeout=EXPORT_TIMEOUT
+            ) as response:
+                response.raise_for_status()
+        except (ClientError, TimeoutError) as err:
+            _LOGGER.debug("Could not export trace to %s: %s", self.url, err)
+
+
+class Tracer:
+    """Starts a trace per poll or action, exporting each once it ends."""
+
+    def __init__(
+        self,
+        hass: "HomeAssistant",
+        exporter: TraceExporter | None,
+        resource: dict[str, Any],
+    ) -> None:
+        """Export to exporter, or record nothing when it is None."""
+        self._hass = hass
+        self.exporter = exporter
+        self.resource = resource
+
+    @contextmanager
+    def root_span(
+        self, name: str, attributes: dict[str, Any] | None = None
+    ) -> Iterator[Span]:
+        """Time the block as a new trace of its own."""
+        trace = _Trace(self) if self.exporter is not None else None
+        root = Span(name, trace, attributes=dict(attributes or {}))
+        try:
+            with _activate(root):
+                yield root
+        finally:
+            if trace is not None:
+                self._export(trace)
+
+    def _export(self, trace: _Trace) -> None:
+        """Send a finished trace without waiting for it to arrive."""
+        if self.exporter is None:
+            return
+        payload = otlp_json(trace.trace_id, trace.spans, self.resource)
+        self._hass.async_create_background_task(
+            self.exporter.async_export(payload), f"{DOMAIN} trace export"
+        )
+
+
+def tracer_for(hass: "HomeAssistant", entry: "ConfigEntry", api_url: str) -> Tracer:
+    """Return a tracer exporting where the entry's options say, if anywhere."""
+    target = trace_export_for(entry)
+    exporter: TraceExporter | None = None
+    if target.startswith(("http://", "https://")):
+        exporter = HttpTraceExporter(hass, target)
+    elif target:
+        # Relative to the configuration directory, like other files an
+        # integration writes.
+        exporter = FileTraceExporter(hass, Path(hass.config.path(target)))
+    return Tracer(
+        hass,
+        exporter,
+        {
+            "service.name": "home-assistant",
+            "service.namespace": DOMAIN,
+            "audiobookshelf.entry_id": entry.entry_id,
+            "server.address": api_url,
+        },
+    )
@@ -1,7 +1,9 @@
 """Update platform reporting whether a newer Audiobookshelf server exists."""
 
 from datetime import timedelta
+from http import HTTPStatus
 from logging import getLogger
+from typing import TypedDict
 
 from aioaudiobookshelf.exceptions import AbsError
 from aiohttp import ClientError
@@ -9,6 +11,7 @@ from homeassistant.components.update import UpdateDeviceClass, UpdateEntity
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.storage import Store
 
 from custom_components.audiobookshelf import AudiobookshelfConfigEntry
 from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
@@ -16,8 +19,9 @@ from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator im
 )
 from custom_components.audiobookshelf.const import (
     GITHUB_LATEST_RELEASE_URL,
+    RELEASE_STORAGE_KEY,
+    RELEASE_STORAGE_VERSION,
     REQUEST_TIMEOUT,
-    check_for_updates_for,
 )
 from custom_components.audiobookshelf.entity import device_info_for
 
@@ -32,19 +36,25 @@ SCAN_INTERVAL = timedelta(hours=1)
 PARALLEL_UPDATES = 0
 
 
+class _ReleaseCache(TypedDict):
+    """What is kept of the last release response between runs."""
+
+    etag: str
+    tag_name: str
+
+
 async def async_setup_entry(
-    hass: HomeAssistant,  # noqa: ARG001
+    hass: HomeAssistant,
     entry: AudiobookshelfConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up the update platform, when the user has opted in."""
-    if not check_for_updates_for(entry):
-        # The platform is forwarded either way so that unloading always
-        # matches what was set up. Opting out simply creates no entity.
-        _LOGGER.debug("Update checking is disabled, not adding an update entity")
-        return
-
-    async_add_entities([AudiobookshelfUpdate(entry.runtime_data, entry)], True)  # noqa: FBT003
+    """Set up the update platform, only ever forwarded once the user opts in."""
+    # Not updated before adding: the cached answer is restored once added,
+    # so a restart shows the last known release without asking GitHub.
+    store: Store[_ReleaseCache] = Store(
+        hass, RELEASE_STORAGE_VERSION, RELEASE_STORAGE_KEY
+    )
+    async_add_entities([AudiobookshelfUpdate(entry.runtime_data, entry, store)])
 
 
 class AudiobookshelfUpdate(UpdateEntity):
@@ -58,12 +68,26 @@ class AudiobookshelfUpdate(UpdateEntity):
         self,
         coordinator: AudiobookShelfDataUpdateCoordinator,
         entry: AudiobookshelfConfigEntry,
+        store: Store[_ReleaseCache],
     ) -> None:
         """Initialize the update entity."""
         self.coordinator = coordinator
+        self._store = store
+        self._cache: _ReleaseCache | None = None
         self._attr_unique_id = f"{entry.entry_id}_server_update"
         self._attr_device_info = device_info_for(entry, coordinator)
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last release seen, or look it up if there is none."""
+        await super().async_added_to_hass()
+        self._cache = await self._store.async_load()
+        if self._cache is not None:
+            self._attr_latest_version = _version_from(self._cache["tag_name"])
+            return
+        # Nothing cached yet, so ask now rather than showing unknown until
+        # the first hourly poll.
+        self.async_schedule_update_ha_state(force_refresh=True)
+
     @property
     def installed_version(self) -> str | None:
         """Return the version the server is running."""
@@ -97,15 +121,25 @@ class AudiobookshelfUpdate(UpdateEntity):
 
     async def _async_latest_release(self) -> str | None:
         """Ask GitHub for the newest release, or None if it cannot be reached."""
+        headers = {"Accept": "application/vnd.github+json"}
+        if self._cache is not None:
+            # GitHub answers an unchanged release with an empty 304 that does
+            # not count against the 60 an hour, so the common case costs
+            # neither quota nor parsing.
+            headers["If-None-Match"] = self._cache["etag"]
+
         session = async_get_clientsession(self.hass)
         try:
             async with session.get(
                 GITHUB_LATEST_RELEASE_URL,
-                headers={"Accept": "application/vnd.github+json"},
+                headers=headers,
                 timeout=REQUEST_TIMEOUT,
             ) as response:
+                if response.status == HTTPStatus.NOT_MODIFIED and self._cache:
+                    return _version_from(self._cache["tag_name"])
                 response.raise_for_status()
                 body = await response.json()
+                etag = response.headers.get("ETag")
         except (ClientError, TimeoutError) as err:
             _LOGGER.warning("Could not reach GitHub to check for updates: %s", err)
             return None
@@ -118,5 +152,13 @@ class AudiobookshelfUpdate(UpdateEntity):
             _LOGGER.warning("GitHub release response carried no usable tag_name")
             return None
 
-        # Releases are tagged v2.36.0 while the server reports 2.36.0.
-        return tag.removeprefix("v")
+        if etag:
+            self._cache = {"etag": etag, "tag_name": tag}
+            await self._store.async_save(self._cache)
+        return _version_from(tag)
+
+
+def _version_from(tag: str) -> str:
+    """Return the version a release tag names."""
+    # Releases are tagged v2.36.0 while the server reports 2.36.0.
+    return tag.removeprefix("v")
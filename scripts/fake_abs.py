@@ -0,0 +1,413 @@
+"""A local Audiobookshelf server answering what the integration asks for."""
+
+import asyncio
+import json
+import re
+import time
+from collections import Counter
+from types import TracebackType
+from typing import Any, Self
+
+import socketio
+from aiohttp import web
+
+ADMIN_TOKEN = "fake-admin-token"  # noqa: S105
+SERVER_VERSION = "2.36.0"
+
+# Every book belongs to one of this many series, so a series name matches a
+# predictable share of the catalog.
+SERIES_COUNT = 10
+
+_ITEM_PROGRESS = re.compile(r"api/me/progress/([^/]+)")
+_LIBRARY_ROUTE = re.compile(r"api/libraries/([^/]+)/(stats|items|scan)")
+_USER_ROUTE = re.compile(r"api/users/([^/]+)")
+# Left out of users as /api/users lists them, as the server does.
+_FULL_USER_KEYS = ("mediaProgress", "bookmarks")
+
+
+def _server_settings() -> dict[str, Any]:
+    """Return server settings as /api/authorize carries them."""
+    return {
+        "id": "server-settings",
+        "scannerFindCovers": False,
+        "scannerCoverProvider": "google",
+        "scannerParseSubtitle": False,
+        "scannerPreferMatchedMetadata": False,
+        "scannerDisableWatcher": False,
+        "storeCoverWithItem": False,
+        "storeMetadataWithItem": False,
+        "metadataFileFormat": "json",
+        "rateLimitLoginRequests": 10,
+        "rateLimitLoginWindow": 600000,
+        "backupSchedule": "30 1 * * *",
+        "backupsToKeep": 2,
+        "maxBackupSize": 1,
+        "loggerDailyLogsToKeep": 7,
+        "loggerScannerLogsToKeep": 2,
+        "homeBookshelfView": 1,
+        "bookshelfView": 1,
+        "sortingIgnorePrefix": False,
+        "sortingPrefixes": ["the", "a"],
+        "chromecastEnabled": False,
+        "dateFormat": "MM/dd/yyyy",
+        "timeFormat": "HH:mm",
+        "language": "en-us",
+        "logLevel": 2,
+        "version": SERVER_VERSION,
+    }
+
+
+def _user(n: int, user_type: str = "user") -> dict[str, Any]:
+    """Return one user, in the full form /api/authorize and /api/users/{id} use."""
+    return {
+        "id": f"user-{n}",
+        "username": f"listener{n}",
+        "type": user_type,
+        "token": ADMIN_TOKEN if user_type == "admin" else None,
+        "mediaProgress": [],
+        "seriesHideFromContinueListening": [],
+        "bookmarks": [],
+        "isActive": True,
+        "isLocked": False,
+        "lastSeen": 1_700_000_000_000,
+        "createdAt": 1_600_000_000_000,
+        "permissions": {
+            "download": True,
+            "update": user_type == "admin",
+            "delete": user_type == "admin",
+            "upload": user_type == "admin",
+            "accessAllLibraries": True,
+            "accessAllTags": True,
+            "accessExplicitContent": True,
+        },
+        "librariesAccessible": [],
+        "itemTagsAccessible": [],
+    }
+
+
+def _library(n: int) -> dict[str, Any]:
+    """Return one book library."""
+    library_id = f"lib-{n}"
+    return {
+        "id": library_id,
+        "name": f"Library {n}",
+        "folders": [
+            {
+                "id": f"folder-{n}",
+                "fullPath": f"/audiobooks/{n}",
+                "libraryId": library_id,
+                "addedAt": 1_600_000_000_000,
+            }
+        ],
+        "displayOrder": n,
+        "icon": "database",
+        "mediaType": "book",
+        "provider": "google",
+        "settings": {"coverAspectRatio": 1, "disableWatcher": False},
+        "createdAt": 1_600_000_000_000,
+        "lastUpdate": 1_700_000_000_000,
+    }
+
+
+def _item(library_id: str, n: int, updated_at: int) -> dict[str, Any]:
+    """Return one minified book, as a library's items page lists it."""
+    series = f"Series {n % SERIES_COUNT}"
+    return {
+        "id": f"{library_id}-item-{n}",
+        "mediaType": "book",
+        "addedAt": updated_at,
+        "updatedAt": updated_at,
+        "size": 250_000_000,
+        "media": {
+            "duration": 36_000.0,
+            "metadata": {
+                "title": f"Book {n}",
+                "seriesName": f"{series} #{n}",
+                "authorName": f"Author {n % 50}",
+            },
+        },
+    }
+
+
+def _session(n: int, user_count: int, updated_at: int) -> dict[str, Any]:
+    """Return one open playback session, touched at updated_at."""
+    return {
+        "id": f"session-{n}",
+        "userId": f"user-{n % max(user_count, 1)}",
+        "libraryId": "lib-0",
+        "libraryItemId": f"lib-0-item-{n}",
+        "mediaType": "book",
+        "mediaMetadata": {
+            "title": f"Book {n}",
+            "genres": [],
+            "explicit": False,
+            "authors": [],
+            "narrators": [],
+            "series": [],
+        },
+        "displayTitle": f"Book {n}",
+        "displayAuthor": f"Author {n % 50}",
+        "coverPath": "",
+        "duration": 36_000.0,
+        "playMethod": 0,
+        "mediaPlayer": "html5",
+        "deviceInfo": {"deviceId": f"device-{n}", "clientName": "Abs Web"},
+        "serverVersion": SERVER_VERSION,
+        "date": "2026-01-01",
+        "dayOfWeek": "Thursday",
+        "timeListening": 600.0,
+        "startTime": 0.0,
+        "currentTime": 600.0,
+        "startedAt": updated_at - 600_000,
+        "updatedAt": updated_at,
+    }
+
+
+class FakeAudiobookshelf:
+    """Serves a server of the given size, optionally slow to answer."""
+
+    def __init__(
+        self,
+        *,
+        libraries: int = 1,
+        items_per_library: int = 0,
+        users: int = 1,
+        sessions: int = 0,
+        latency: float = 0.0,
+    ) -> None:
+        """Build a server holding that many of each, answering after latency."""
+        self.libraries = [_library(n) for n in range(libraries)]
+        now = int(time.time() * 1000)
+        # Newest first, as the catalog asks for them.
+        self.items = {
+            library["id"]: [
+                _item(library["id"], n, now - n * 1000)
+                for n in range(items_per_library)
+            ]
+            for library in self.libraries
+        }
+        self.users = [_user(0, "admin")] + [_user(n) for n in range(1, users)]
+        self.sessions = [_session(n, users, now) for n in range(sessions)]
+        self.latency = latency
+        self.progress_removed: list[str] = []
+        # Scans run for scan_seconds, reporting over the socket if it is
+        # served, and listed by /api/tasks until they finish. Both are set
+        # before starting the server.
+        self.scan_seconds = 0.0
+        self.serve_socket = True
+        # Served under this path rather than at the root, as behind a
+        # reverse proxy. Also set before starting.
+        self.base_path = ""
+        self.scans_requested: list[str] = []
+        self.tasks: list[dict[str, Any]] = []
+        self.sio: socketio.AsyncServer | None = None
+        self.signed_in: set[str] = set()
+        self._background: set[asyncio.Task[None]] = set()
+        # By route rather than by path, so one library's items pages add up.
+        self.requests: Counter[str] = Counter()
+        self.bytes_sent: Counter[str] = Counter()
+        self.url = ""
+        self._runner: web.AppRunner | None = None
+
+    async def __aenter__(self) -> Self:
+        """Start serving."""
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop serving."""
+        await self.stop()
+
+    async def start(self) -> None:
+        """Listen on a free local port."""
+        app = web.Application()
+        if self.serve_socket:
+            self.sio = socketio.AsyncServer(async_mode="aiohttp")
+            # Ahead of the catch-all, which would otherwise answer it.
+            self.sio.attach(app, socketio_path=f"{self.base_path}/socket.io")
+            self.sio.on("auth", self._on_auth)
+            self.sio.on("disconnect", self._on_disconnect)
+        app.router.add_route("*", "/{path:.*}", self._answer)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}{self.base_path}"
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        for task in self._background:
+            task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _answer(self, request: web.Request) -> web.Response:
+        """Answer one request after the configured latency."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not request.path.startswith(f"{self.base_path}/"):
+            return web.Response(status=404)  # As the proxy would answer.
+        # The client library asks for some endpoints with a leading slash of
+        # its own, which arrives doubled.
+        path = request.path.removeprefix(self.base_path).strip("/")
+        route, body = self._route(request, path)
+        self.requests[route] += 1
+        if body is None:
+            return web.Response(status=404)
+        text = json.dumps(body)
+        self.bytes_sent[route] += len(text)
+        return web.Response(text=text, content_type="application/json")
+
+    def _route(self, request: web.Request, path: str) -> tuple[str, Any]:
+        """Return the route a request matched and the body to answer with."""
+        fixed = {
+            "api/authorize": self._authorize_body,
+            "api/users": self._users_body,
+            "api/users/online": self._online_body,
+            "api/sessions/open": lambda: {"sessions": self.sessions},
+            "api/me/sessions": lambda: {"total": len(self.users)},
+            "api/libraries": lambda: {"libraries": self.libraries},
+            "api/tasks": lambda: {"tasks": self.tasks, "queuedTaskData": {}},
+            "ping": lambda: {"success": True},
+        }
+        if path in fixed:
+            return path, fixed[path]()
+        if match := _LIBRARY_ROUTE.fullmatch(path):
+            library_id, kind = match.groups()
+            return f"api/libraries/{{id}}/{kind}", self._library_body(
+                request, library_id, kind
+            )
+        if match := _USER_ROUTE.fullmatch(path):
+            user = next((user for user in self.users if user["id"] == match[1]), None)
+            return "api/users/{id}", user
+        if match := _ITEM_PROGRESS.fullmatch(path):
+            return "api/me/progress/{id}", self._progress_body(request, match[1])
+        return path, None
+
+    def _authorize_body(self) -> dict[str, Any]:
+        """Return the login the client is built from."""
+        return {
+            "user": self.users[0],
+            "userDefaultLibraryId": "lib-0",
+            "serverSettings": _server_settings(),
+            "Source": "docker",
+        }
+
+    def _users_body(self) -> dict[str, Any]:
+        """Return every user, in the minimal form the server lists them in."""
+        return {
+            "users": [
+                {
+                    key: value
+                    for key, value in user.items()
+                    if key not in _FULL_USER_KEYS
+                }
+                for user in self.users
+            ]
+        }
+
+    def _online_body(self) -> dict[str, Any]:
+        """Return the users with an open session."""
+        online = {session["userId"] for session in self.sessions}
+        return {"usersOnline": [user for user in self.users if user["id"] in online]}
+
+    def _library_body(
+        self, request: web.Request, library_id: str, kind: str
+    ) -> dict[str, Any] | None:
+        """Return a library's stats or one page of its items."""
+        items = self.items.get(library_id)
+        if items is None:
+            return None
+        if kind == "scan":
+            self._start_scan(library_id)
+            return {}
+        if kind == "stats":
+            return {
+                "totalItems": len(items),
+                "totalAuthors": min(len(items), 50),
+                "totalGenres": 5,
+                "totalSize": sum(item["size"] for item in items),
+                "totalDuration": sum(item["media"]["duration"] for item in items),
+                "numAudioTracks": len(items) * 10,
+            }
+        limit = int(request.query.get("limit", 0)) or len(items)
+        page = int(request.query.get("page", 0))
+        return {
+            "results": items[page * limit : (page + 1) * limit],
+            "total": len(items),
+        }
+
+    def _progress_body(
+        self, request: web.Request, target: str
+    ) -> dict[str, Any] | None:
+        """Return an item's progress, or remove a progress entry."""
+        # Every book has been started, and its progress shares its id.
+        if request.method == "DELETE":
+            self.progress_removed.append(target)
+            return {}
+        if target in self.progress_removed:
+            return None
+        return {
+            "id": target,
+            "libraryItemId": target,
+            "duration": 36_000.0,
+            "progress": 0.5,
+            "currentTime": 18_000.0,
+            "isFinished": False,
+            "hideFromContinueListening": False,
+            "lastUpdate": 1_700_000_000_000,
+            "startedAt": 1_690_000_000_000,
+        }
+
+    async def _on_auth(self, sid: str, token: str) -> None:
+        """Sign a socket in, for the events only signed in sockets get."""
+        if token == ADMIN_TOKEN:
+            self.signed_in.add(sid)
+
+    async def _on_disconnect(self, sid: str, *_: Any) -> None:
+        """Forget a socket that went away."""
+        self.signed_in.discard(sid)
+
+    async def _emit(self, event: str, data: Any) -> None:
+        """Send an event to every signed in socket."""
+        if self.sio is None:
+            return
+        for sid in list(self.signed_in):
+            await self.sio.emit(event, data, to=sid)
+
+    def _start_scan(self, library_id: str) -> None:
+        """Start a scan of a library running, as the server does on request."""
+        self.scans_requested.append(library_id)
+        task = asyncio.get_running_loop().create_task(self._scan(library_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _scan(self, library_id: str) -> None:
+        """Scan a library, finding every one of its items updated."""
+        task: dict[str, Any] = {
+            "id": f"scan-{len(self.scans_requested)}",
+            "action": "library-scan",
+            "data": {"libraryId": library_id, "libraryMediaType": "book"},
+            "isFailed": False,
+            "isFinished": False,
+            "startedAt": int(time.time() * 1000),
+        }
+        self.tasks.append(task)
+        await self._emit("task_started", task)
+        await self._emit(
+            "items_updated",
+            [
+                {"id": item["id"], "libraryId": library_id}
+                for item in self.items[library_id]
+            ],
+        )
+        await asyncio.sleep(self.scan_seconds)
+        self.tasks.remove(task)
+        task.update(isFinished=True, finishedAt=int(time.time() * 1000))
+        await self._emit("task_finished", task)
@@ -0,0 +1,379 @@
+"""
+Measure what polling costs a server, before lowering the scan interval.
+
+Sets an entry up in a Home Assistant of its own and polls through it,
+against a server or, with no URL, a local fake one:
+
+    AUDIOBOOKSHELF_TOKEN=... python3 -m scripts.loadtest http://abs.local:13378
+    python3 -m scripts.loadtest --polls 200 --rate 5 --concurrency 4
+
+Every poll includes every library's stats, the most a poll can ask for.
+Scan tracking and the reachability probe are left out: what they cost does
+not change with the scan interval.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from itertools import count
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import MappingProxyType
+from typing import Any
+from urllib.parse import urlsplit
+
+from aiohttp import ClientResponse, ClientSession, hdrs
+from homeassistant.config_entries import SOURCE_USER, ConfigEntry
+from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL, CONF_URL
+from homeassistant.core import HomeAssistant
+
+from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
+    AudiobookShelfDataUpdateCoordinator,
+    LibraryStatsCoordinator,
+)
+from custom_components.audiobookshelf.config_flow import AudiobookshelfConfigFlow
+from custom_components.audiobookshelf.connection import create_session
+from custom_components.audiobookshelf.const import (
+    CONF_LIBRARY_STATS_PER_POLL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_REQUESTS_PER_SECOND,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_REQUESTS_PER_SECOND,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    scan_interval_for,
+)
+from custom_components.audiobookshelf.scheduler import scheduler_for
+from scripts.fake_abs import ADMIN_TOKEN, FakeAudiobookshelf
+
+PERCENTILES = (50, 95, 99)
+_ROW = "{:<28} {:>9} {:>8} {:>12} {:>11} {:>12}"
+
+# The highest the options flow allows for library stats per poll.
+ALL_LIBRARIES = 100
+
+# Ids in a path are folded into one endpoint, so every library's stats and
+# every user's record add up to one row rather than a row each.
+_LIBRARY_PATH = re.compile(r"api/libraries/[^/]+/")
+_USER_PATH = re.compile(r"api/users/(?!online$)[^/]+$")
+
+
+def endpoint_for(url: str) -> str:
+    """Return the endpoint a request URL is counted under."""
+    path = _LIBRARY_PATH.sub("api/libraries/{id}/", urlsplit(url).path.strip("/"))
+    return _USER_PATH.sub("api/users/{id}", path)
+
+
+def percentile(latencies: list[float], percent: int) -> float:
+    """Return the nearest-rank percentile of latencies."""
+    ordered = sorted(latencies)
+    return ordered[max(0, math.ceil(len(ordered) * percent / 100) - 1)]
+
+
+def transferred_bytes(response: ClientResponse, body: bytes) -> int | None:
+    """Return how much of a response crossed the network, if that is known."""
+    # aiohttp hands over the body already decompressed, so for compressed
+    # responses only the length the server declared says what was sent. A
+    # chunked compressed response declares none, and goes uncounted.
+    length = response.headers.get(hdrs.CONTENT_LENGTH)
+    if length is not None and length.isdigit():
+        return int(length)
+    if response.headers.get(hdrs.CONTENT_ENCODING) is None:
+        return len(body)
+    return None
+
+
+@dataclass
+class Usage:
+    """Requests made and bytes received, by endpoint."""
+
+    requests: Counter[str] = field(default_factory=Counter)
+    bytes_received: Counter[str] = field(default_factory=Counter)
+    bytes_decoded: Counter[str] = field(default_factory=Counter)
+    unsized_responses: Counter[str] = field(default_factory=Counter)
+
+    def clear(self) -> None:
+        """Forget everything counted so far."""
+        for counter in vars(self).values():
+            counter.clear()
+
+
+class CountingSession:
+    """Stands in for a coordinator's session, counting what each endpoint costs."""
+
+    def __init__(self, session: ClientSession, usage: Usage) -> None:
+        """Send through session, counting into usage."""
+        self._session = session
+        self._usage = usage
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> ClientResponse:
+        """Make one request and count it, body and all."""
+        response = await self._session.request(method, url, **kwargs)
+        # aiohttp keeps the body, so the limiter's read afterwards returns
+        # it without touching the network.
+        body = await response.read()
+        endpoint = endpoint_for(url)
+        self._usage.requests[endpoint] += 1
+        self._usage.bytes_decoded[endpoint] += len(body)
+        transferred = transferred_bytes(response, body)
+        if transferred is None:
+            self._usage.unsized_responses[endpoint] += 1
+        else:
+            self._usage.bytes_received[endpoint] += transferred
+        return response
+
+    async def close(self) -> None:
+        """Close the wrapped session."""
+        await self._session.close()
+
+
+@dataclass(frozen=True)
+class Settings:
+    """How hard to poll, and under which of the entry's options."""
+
+    polls: int
+    rate: float
+    concurrency: int
+    scan_interval: int = DEFAULT_SCAN_INTERVAL
+    max_requests_per_second: int = DEFAULT_MAX_REQUESTS_PER_SECOND
+    max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS
+
+    def options(self) -> dict[str, Any]:
+        """Return the options an entry polling like this would have saved."""
+        return {
+            CONF_SCAN_INTERVAL: self.scan_interval,
+            CONF_MAX_REQUESTS_PER_SECOND: self.max_requests_per_second,
+            CONF_MAX_CONCURRENT_REQUESTS: self.max_concurrent_requests,
+            # The most the options flow allows, so every poll includes every
+            # library's stats, the most a poll can ask for.
+            CONF_LIBRARY_STATS_PER_POLL: ALL_LIBRARIES,
+        }
+
+
+async def _async_started(child: LibraryStatsCoordinator) -> None:
+    """Wait out the first refresh a library is given when it is attached."""
+    started = asyncio.Event()
+    remove = child.async_add_listener(started.set)
+    try:
+        await started.wait()
+    finally:
+        remove()
+
+
+@asynccontextmanager
+async def _entry(
+    url: str, token: str, settings: Settings, usage: Usage
+) -> AsyncIterator[AudiobookShelfDataUpdateCoordinator]:
+    """Set up an entry for url in a Home Assistant of its own, as setup would."""
+    with TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        # The load test sets the pace of polls itself. The spacing is only
+        # there to keep several entries from polling in lockstep.
+        scheduler_for(hass).spacing = 0
+        entry = ConfigEntry(
+            data={CONF_URL: url, CONF_API_KEY: token},
+            discovery_keys=MappingProxyType({}),
+            domain=DOMAIN,
+            minor_version=1,
+            options=settings.options(),
+            source=SOURCE_USER,
+            title=urlsplit(url).netloc,
+            unique_id=None,
+            version=AudiobookshelfConfigFlow.VERSION,
+        )
+        coordinator = AudiobookShelfDataUpdateCoordinator(
+            hass,
+            config_entry=entry,
+            scan_interval=scan_interval_for(entry),
+            api_url=entry.data[CONF_URL],
+            token=entry.data[CONF_API_KEY],
+        )
+        coordinator._session = CountingSession(  # type: ignore[assignment]  # noqa: SLF001
+            create_session(coordinator.connection_stats), usage
+        )
+        try:
+            await coordinator.catalog.async_load()
+            await coordinator.async_refresh()
+            # What the sensor platform attaches once the first poll has the
+            # libraries, each of which then refreshes on its own.
+            await asyncio.gather(
+                *(
+                    _async_started(coordinator.async_attach_library(library))
+                    for library in coordinator.libraries
+                )
+            )
+            yield coordinator
+        finally:
+            for child in coordinator.library_coordinators.values():
+                await child.async_shutdown()
+            await coordinator.async_shutdown()
+            await hass.async_stop(force=True)
+
+
+async def async_load_test(url: str, token: str, settings: Settings) -> dict[str, Any]:
+    """Run settings.polls polls against url and return what they cost."""
+    loop = asyncio.get_running_loop()
+    usage = Usage()
+    latencies: list[float] = []
+    failures: Counter[str] = Counter()
+    polls = count()
+
+    async def _worker(coordinator: AudiobookShelfDataUpdateCoordinator) -> None:
+        while (n := next(polls)) < settings.polls:
+            # Started on a fixed schedule, so a slow poll does not lower the
+            # rate asked of the server, only delays the polls behind it.
+            if settings.rate:
+                await asyncio.sleep(max(0, started + n / settings.rate - loop.time()))
+            poll_started = loop.time()
+            await coordinator.async_refresh()
+            if not coordinator.last_update_success:
+                failures[str(coordinator.last_exception)] += 1
+            latencies.append(loop.time() - poll_started)
+
+    async with AsyncExitStack() as stack:
+        # One entry per worker, each in its own Home Assistant, as several
+        # instances polling one server would be.
+        coordinators = [
+            await stack.enter_async_context(_entry(url, token, settings, usage))
+            for _ in range(settings.concurrency)
+        ]
+        # Logging in, the library list and each library's first stats are
+        # setup, not polling.
+        usage.clear()
+        started = loop.time()
+        await asyncio.gather(*(_worker(coordinator) for coordinator in coordinators))
+        elapsed = loop.time() - started
+
+    return {
+        "settings": asdict(settings),
+        "polls": len(latencies),
+        "failed_polls": sum(failures.values()),
+        "failures": dict(failures),
+        "seconds": round(elapsed, 3),
+        "latency_seconds": {
+            f"p{percent}": round(percentile(latencies, percent), 4)
+            for percent in PERCENTILES
+        }
+        if latencies
+        else {},
+        "requests_per_second": round(sum(usage.requests.values()) / elapsed, 2),
+        "endpoints": {
+            endpoint: {
+                "requests": requests,
+                "requests_per_second": round(requests / elapsed, 2),
+                "bytes": usage.bytes_received[endpoint],
+                "bytes_per_poll": usage.bytes_received[endpoint]
+                // max(1, len(latencies)),
+                "decoded_bytes": usage.bytes_decoded[endpoint],
+                "unsized_responses": usage.unsized_responses[endpoint],
+            }
+            for endpoint, requests in sorted(usage.requests.items())
+        },
+    }
+
+
+def format_table(report: dict[str, Any]) -> str:
+    """Lay a report out for reading in a terminal."""
+    latency = "  ".join(
+        f"{name} {seconds * 1000:.1f} ms"
+        for name, seconds in report["latency_seconds"].items()
+    )
+    lines = [
+        (
+            f"{report['polls']} polls in {report['seconds']} s, "
+            f"{report['failed_polls']} failed"
+        ),
+        f"poll latency: {latency}",
+        f"requests/s: {report['requests_per_second']}",
+        "",
+        _ROW.format("endpoint", "requests", "req/s", "bytes", "bytes/poll", "decoded"),
+    ]
+    lines.extend(
+        _ROW.format(
+            endpoint,
+            row["requests"],
+            row["requests_per_second"],
+            row["bytes"],
+            row["bytes_per_poll"],
+            row["decoded_bytes"],
+        )
+        for endpoint, row in report["endpoints"].items()
+    )
+    return "\n".join(lines)
+
+
+def _arguments() -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("url", nargs="?", help="the server, or a fake one if left out")
+    parser.add_argument("--polls", type=int, default=100)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1.0,
+        help="polls started per second, 0 for flat out",
+    )
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--scan-interval", type=int, default=DEFAULT_SCAN_INTERVAL)
+    parser.add_argument(
+        "--max-requests-per-second", type=int, default=DEFAULT_MAX_REQUESTS_PER_SECOND
+    )
+    parser.add_argument(
+        "--max-concurrent-requests", type=int, default=DEFAULT_MAX_CONCURRENT_REQUESTS
+    )
+    parser.add_argument(
+        "--json", type=Path, metavar="FILE", help="also write the report here"
+    )
+    fake = parser.add_argument_group("fake server, when no URL is given")
+    fake.add_argument("--libraries", type=int, default=3)
+    fake.add_argument("--items", type=int, default=300, help="per library")
+    fake.add_argument("--users", type=int, default=50)
+    fake.add_argument("--sessions", type=int, default=20)
+    fake.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    return parser.parse_args()
+
+
+async def _async_main(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the load test the command line asks for."""
+    settings = Settings(
+        polls=args.polls,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        scan_interval=args.scan_interval,
+        max_requests_per_second=args.max_requests_per_second,
+        max_concurrent_requests=args.max_concurrent_requests,
+    )
+    if args.url:
+        token = os.environ.get("AUDIOBOOKSHELF_TOKEN")
+        if not token:
+            sys.exit("Set AUDIOBOOKSHELF_TOKEN to an admin API key")
+        return await async_load_test(args.url, token, settings)
+    async with FakeAudiobookshelf(
+        libraries=args.libraries,
+        items_per_library=args.items,
+        users=args.users,
+        sessions=args.sessions,
+        latency=args.latency,
+    ) as server:
+        return await async_load_test(server.url, ADMIN_TOKEN, settings)
+
+
+def main() -> None:
+    """Load test a server and report on it."""
+    args = _arguments()
+    report = asyncio.run(_async_main(args))
+    print(format_table(report))  # noqa: T201
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Measuring the integration's cost, and holding it to stored baselines."""
+
+import asyncio
+import json
+import os
+import statistics
+import tracemalloc
+import warnings
+from collections.abc import Awaitable, Callable, Coroutine
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_API_KEY, CONF_URL
+
+from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
+    AudiobookShelfDataUpdateCoordinator,
+    LibraryStatsCoordinator,
+)
+from custom_components.audiobookshelf.const import (
+    CONF_MAX_REQUESTS_PER_SECOND,
+    scan_interval_for,
+)
+from custom_components.audiobookshelf.scheduler import scheduler_for
+from custom_components.audiobookshelf.services import async_setup_services
+
+BASELINES = Path(__file__).parent / "benchmark_baselines.json"
+
+# Set to rewrite the baselines from this run instead of checking against them,
+# after a change that is meant to make things slower or bigger.
+SAVE_BASELINES = bool(os.environ.get("AUDIOBOOKSHELF_SAVE_BASELINES"))
+
+# Timings move with the machine and its load, so by default one well past its
+# baseline is only reported, and fails only where this is set, on a machine
+# quiet enough to trust them. Allocations hardly move at all, so they always
+# fail, and are held closer.
+CHECK_TIMINGS = bool(os.environ.get("AUDIOBOOKSHELF_CHECK_TIMINGS"))
+TIME_TOLERANCE = 3.0
+TIME_SLACK_SECONDS = 0.05
+MEMORY_TOLERANCE = 1.5
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """What one benchmark cost."""
+
+    seconds: float
+    peak_kib: float
+
+
+def summary(runs: list[Measurement]) -> Measurement:
+    """Combine repeated runs: the typical time, and the worst memory."""
+    return Measurement(
+        seconds=statistics.median(run.seconds for run in runs),
+        peak_kib=max(run.peak_kib for run in runs),
+    )
+
+
+def stub_hass() -> MagicMock:
+    """Build a Home Assistant with no loop, bus or disk behind it."""
+    hass = MagicMock()
+    # Real where the integration keeps state: entries share a scheduler
+    # through hass.data, and the catalog's store is placed by config_dir.
+    hass.data = {}
+    hass.config.config_dir = "/config"
+    # No other entries to keep polls apart from or share a budget with, so
+    # neither holds a poll back.
+    scheduler = scheduler_for(hass)
+    scheduler.spacing = 0
+    scheduler.budget.configure(rate=100_000, max_concurrent=12)
+    return hass
+
+
+def stub_entry(url: str, token: str, options: dict[str, Any] | None = None) -> Any:
+    """Build a config entry for url, with options as the options flow saves them."""
+    entry = MagicMock()
+    entry.entry_id = "entry-1"
+    entry.title = "Audiobookshelf"
+    entry.data = {CONF_URL: url, CONF_API_KEY: token}
+    # Limits far above anything reached unless asked for, so what is
+    # measured is the integration's own work rather than deliberate waiting.
+    entry.options = {CONF_MAX_REQUESTS_PER_SECOND: 100_000, **(options or {})}
+    return entry
+
+
+def standalone_coordinator(
+    url: str,
+    token: str,
+    *,
+    options: dict[str, Any] | None = None,
+    hass: Any = None,
+) -> AudiobookShelfDataUpdateCoordinator:
+    """Build an entry's coordinator for url as setup does, over a stubbed hass."""
+    # The one builder every test shares, through the real constructor, so
+    # none of them drifts from what setup builds.
+    entry = stub_entry(url, token, options)
+    coordinator = AudiobookShelfDataUpdateCoordinator(
+        hass if hass is not None else stub_hass(),
+        config_entry=entry,
+        scan_interval=scan_interval_for(entry),
+        api_url=entry.data[CONF_URL],
+        token=entry.data[CONF_API_KEY],
+    )
+    # Asked for rather than run: the stub has no loop to debounce them on.
+    coordinator.async_request_refresh = AsyncMock()  # type: ignore[method-assign]
+    return coordinator
+
+
+async def attach_libraries(coordinator: AudiobookShelfDataUpdateCoordinator) -> None:
+    """Attach every library, refreshed by the entry's own poll."""
+    # Rotating all of them each poll puts every library's stats in the
+    # measured poll, as the sensor platform would have them fetched.
+    libraries = await coordinator.get_libraries()
+    coordinator.library_stats_per_poll = len(libraries)
+    with patch.object(LibraryStatsCoordinator, "async_start"):
+        for library in libraries:
+            coordinator.async_attach_library(library)
+
+
+def service_handlers(
+    coordinator: AudiobookShelfDataUpdateCoordinator,
+) -> dict[str, Callable[[Any], Coroutine[Any, Any, Any]]]:
+    """Register the actions against coordinator, returning them by name."""
+    entry = MagicMock()
+    entry.state = ConfigEntryState.LOADED
+    entry.runtime_data = coordinator
+    hass = MagicMock()
+    hass.data = {}
+    hass.config_entries.async_entries.return_value = [entry]
+    async_setup_services(hass)
+    return {
+        registration.args[1]: registration.args[2]
+        for registration in hass.services.async_register.call_args_list
+    }
+
+
+async def close(coordinator: AudiobookShelfDataUpdateCoordinator) -> None:
+    """Close the coordinator's own session."""
+    if coordinator._session is not None:  # noqa: SLF001
+        await coordinator._session.close()  # noqa: SLF001
+
+
+async def measure(run: Callable[[], Awaitable[Any]]) -> Measurement:
+    """Time run and record the most memory it had allocated at once."""
+    loop = asyncio.get_running_loop()
+    tracemalloc.start()
+    try:
+        started = loop.time()
+        await run()
+        seconds = loop.time() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(seconds=seconds, peak_kib=peak / 1024)
+
+
+def check_baseline(name: str, measured: Measurement) -> None:
+    """Fail or warn if measured is well past the stored baseline for name."""
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    if SAVE_BASELINES:
+        baselines[name] = {
+            "seconds": round(measured.seconds, 4),
+            "peak_kib": round(measured.peak_kib, 1),
+        }
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        return
+    baseline = baselines[name]
+    slow = measured.seconds > baseline["seconds"] * TIME_TOLERANCE + TIME_SLACK_SECONDS
+    timing = f"{name} took {measured.seconds:.3f}s against {baseline['seconds']}s"
+    assert not (slow and CHECK_TIMINGS), timing
+    if slow:
+        warnings.warn(timing, stacklevel=2)
+    assert measured.peak_kib <= baseline["peak_kib"] * MEMORY_TOLERANCE, (
+        f"{name} peaked at {measured.peak_kib:.0f} KiB "
+        f"against {baseline['peak_kib']} KiB"
+    )
@@ -0,0 +1,345 @@
+"""
+Record a real server's responses, anonymised, and replay them offline.
+
+Record with the API key in the environment rather than on the command line:
+
+    AUDIOBOOKSHELF_TOKEN=... python3 -m tests.replay http://abs.local:13378
+
+Replay by handing a ReplaySession to the coordinator in place of its own
+session. Nothing leaves the process, and a multiplier scales the recorded
+lists up to a larger server of the same shape.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import sys
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from aiohttp import ClientResponseError, ClientSession, RequestInfo, hdrs
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+RECORDINGS = Path(__file__).parent / "fixtures" / "replay"
+
+# What one poll and one remove_my_progress ask for. Each user's record, and
+# each library's stats and first items page, are added once the lists of
+# users and libraries are known.
+ENDPOINTS = (
+    "api/users",
+    "api/users/online",
+    "api/sessions/open",
+    "api/me/sessions",
+    "api/libraries",
+)
+ITEMS_PAGE_SIZE = 100
+
+# String values under these keys are kept as they are: enumerations,
+# versions, formats and the server's default schedules, which say nothing
+# about who uses the server and which the client library parses into enums
+# or the integration branches on. Every other string is replaced.
+KEPT_KEYS = frozenset(
+    {
+        "authActiveAuthMethods",
+        "autoDownloadSchedule",
+        "backupSchedule",
+        "browserName",
+        "browserVersion",
+        "clientName",
+        "clientVersion",
+        "codec",
+        "date",
+        "dateFormat",
+        "dayOfWeek",
+        "deviceType",
+        "fileType",
+        "format",
+        "icon",
+        "language",
+        "lastScanVersion",
+        "manufacturer",
+        "mediaItemType",
+        "mediaPlayer",
+        "mediaType",
+        "metadataFileFormat",
+        "metadataPrecedence",
+        "mimeType",
+        "model",
+        "osName",
+        "osVersion",
+        "podcastEpisodeSchedule",
+        "podcastSearchRegion",
+        "provider",
+        "scannerCoverProvider",
+        "serverVersion",
+        "sortBy",
+        "sortingPrefixes",
+        "Source",
+        "timeFormat",
+        "type",
+        "version",
+    }
+)
+
+# Cleared outright rather than replaced: a replaced token is still a
+# working-looking token.
+SECRET_KEYS = frozenset(
+    {"accessToken", "email", "ipAddress", "password", "refreshToken", "token"}
+)
+
+# Lists that grow with the size of the server, and are repeated to scale a
+# recording up. Library lists are not: each library needs stats of its own.
+SCALED_LISTS = frozenset({"users", "usersOnline", "sessions", "results"})
+
+
+class Anonymiser:
+    """Replaces identifying strings, keeping their length and their links."""
+
+    # The same input always maps to the same output within one recording, so
+    # a library id in /api/libraries still names that library's stats. The
+    # key is random per recording, so short usernames cannot be recovered by
+    # hashing guesses.
+
+    def __init__(self, key: bytes | None = None) -> None:
+        """Anonymise with key, or with a fresh random one."""
+        self._key = key if key is not None else secrets.token_bytes(32)
+
+    def text(self, value: str) -> str:
+        """Return a stand-in of the same length for value."""
+        if not value:
+            return value
+        digest = hmac.new(self._key, value.encode(), hashlib.sha256).hexdigest()
+        return (digest * (len(value) // len(digest) + 1))[: len(value)]
+
+    def body(self, value: Any, key: str | None = None) -> Any:
+        """Return value with every identifying string replaced."""
+        if isinstance(value, dict):
+            return {k: self.body(v, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.body(v, key) for v in value]
+        if not isinstance(value, str):
+            return value
+        if key in SECRET_KEYS:
+            return None
+        if key in KEPT_KEYS:
+            return value
+        return self.text(value)
+
+
+def fixture_name(path: str) -> str:
+    """Return the file a response to path is recorded in."""
+    return path.strip("/").replace("/", "__") + ".json"
+
+
+def scale_body(body: Any, multiplier: int) -> Any:
+    """Repeat the lists that grow with the server, multiplier times over."""
+    if multiplier == 1 or not isinstance(body, dict):
+        return body
+    scaled = dict(body)
+    for key, value in body.items():
+        if key in SCALED_LISTS and isinstance(value, list):
+            scaled[key] = [
+                _copy(entry, copy) for copy in range(multiplier) for entry in value
+            ]
+    if "results" in body and "total" in body:
+        scaled["total"] = body["total"] * multiplier
+    return scaled
+
+
+# Appended to a copy's id by _copy.
+_COPY_SUFFIX = re.compile(r"-\d+$")
+
+
+def _copy(entry: Any, copy: int) -> Any:
+    """Return entry with its id made unique to the copy."""
+    if copy == 0 or not isinstance(entry, dict) or "id" not in entry:
+        return entry
+    return {**entry, "id": f"{entry['id']}-{copy}"}
+
+
+class Recording:
+    """Recorded response bodies, by path, encoded once up front."""
+
+    def __init__(self, bodies: dict[str, Any], multiplier: int = 1) -> None:
+        """Hold bodies, scaled up by multiplier."""
+        self.multiplier = multiplier
+        self.bodies = {
+            path: json.dumps(scale_body(body, multiplier)).encode()
+            for path, body in bodies.items()
+        }
+
+    @classmethod
+    def load(cls, directory: Path = RECORDINGS, multiplier: int = 1) -> "Recording":
+        """Load every recorded response in directory."""
+        bodies = {
+            file.stem.replace("__", "/"): json.loads(file.read_text())
+            for file in directory.glob("*.json")
+        }
+        return cls(bodies, multiplier)
+
+    def body(self, path: str) -> bytes | None:
+        """Return the body recorded for path, a copy's being its original's."""
+        body = self.bodies.get(path)
+        if body is None and self.multiplier > 1:
+            body = self.bodies.get(_COPY_SUFFIX.sub("", path))
+        return body
+
+
+class ReplayResponse:
+    """The part of a ClientResponse the client library and limiter read."""
+
+    def __init__(self, method: str, url: str, status: int, body: bytes) -> None:
+        """Answer with status and body."""
+        self.method = method
+        self.url = URL(url)
+        self.status = status
+        self.content_type = "application/json" if status == HTTPStatus.OK else ""
+        self.headers = CIMultiDictProxy(
+            CIMultiDict({hdrs.CONTENT_LENGTH: str(len(body))})
+        )
+        self._body = body
+
+    async def read(self) -> bytes:
+        """Return the body."""
+        return self._body
+
+    def raise_for_status(self) -> None:
+        """Raise as aiohttp does for an error status."""
+        if self.status < HTTPStatus.BAD_REQUEST:
+            return
+        raise ClientResponseError(
+            RequestInfo(self.url, self.method, CIMultiDictProxy(CIMultiDict())),
+            (),
+            status=self.status,
+        )
+
+
+class ReplaySession:
+    """Stands in for a ClientSession, answering from a recording."""
+
+    def __init__(self, recording: Recording) -> None:
+        """Answer every request from recording."""
+        self._recording = recording
+        self.requests = 0
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> ReplayResponse:
+        """Answer one request, 404 when nothing was recorded for it."""
+        self.requests += 1
+        path = urlsplit(url).path.strip("/")
+        body = self._recording.body(path)
+        params = kwargs.get("params") or {}
+        if body is not None and int(params.get("page", 0)):
+            # Only the first page of items is recorded, and a short page is
+            # the last one, so later pages are empty.
+            body = b'{"results": [], "total": 0}'
+        if body is None:
+            response = ReplayResponse(method, url, HTTPStatus.NOT_FOUND, b"")
+        else:
+            response = ReplayResponse(method, url, HTTPStatus.OK, body)
+        if kwargs.get("raise_for_status"):
+            response.raise_for_status()
+        return response
+
+    async def get(self, url: str, **kwargs: Any) -> ReplayResponse:
+        """Answer a GET request."""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> ReplayResponse:
+        """Answer a POST request."""
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> ReplayResponse:
+        """Answer a PATCH request."""
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> ReplayResponse:
+        """Answer a DELETE request."""
+        return await self.request("DELETE", url, **kwargs)
+
+    async def close(self) -> None:
+        """Nothing to close."""
+
+
+async def async_record(url: str, token: str, directory: Path) -> list[Path]:
+    """Record the responses a poll and a catalog walk use, anonymised."""
+    anonymiser = Anonymiser()
+    headers = {hdrs.AUTHORIZATION: f"Bearer {token}"}
+    written: list[Path] = []
+
+    def _write(path: str, body: Any) -> None:
+        file = directory / fixture_name(path)
+        file.write_text(json.dumps(anonymiser.body(body), indent=1) + "\n")
+        written.append(file)
+
+    def _api(path: str) -> str:
+        # Under the server's own path, as the client joins them, which a base
+        # URL would drop for these absolute paths behind a reverse proxy.
+        return f"{url.rstrip('/')}/{path}"
+
+    async with ClientSession(headers=headers) as session:
+        async with session.post(_api("api/authorize")) as response:
+            response.raise_for_status()
+            _write("api/authorize", await response.json())
+        users: list[dict[str, Any]] = []
+        libraries: list[dict[str, Any]] = []
+        for endpoint in ENDPOINTS:
+            async with session.get(_api(endpoint)) as response:
+                if response.status == HTTPStatus.NOT_FOUND:
+                    continue  # api/me/sessions before v2.36.0
+                response.raise_for_status()
+                body = await response.json()
+            _write(endpoint, body)
+            if endpoint == "api/users":
+                users = body["users"]
+            if endpoint == "api/libraries":
+                libraries = body["libraries"]
+        for user in users:
+            # The list leaves progress out; each user's own record has it.
+            async with session.get(_api(f"api/users/{user['id']}")) as response:
+                response.raise_for_status()
+                body = await response.json()
+            _write(f"api/users/{anonymiser.text(user['id'])}", body)
+        for library in libraries:
+            # Named by the anonymised id, matching the ids inside the files.
+            recorded = f"api/libraries/{anonymiser.text(library['id'])}"
+            stats = _api(f"api/libraries/{library['id']}/stats")
+            async with session.get(stats) as response:
+                response.raise_for_status()
+                _write(f"{recorded}/stats", await response.json())
+            params = {"minified": 1, "limit": ITEMS_PAGE_SIZE, "page": 0}
+            async with session.get(
+                _api(f"api/libraries/{library['id']}/items"), params=params
+            ) as response:
+                response.raise_for_status()
+                page = await response.json()
+            # Only this page is recorded, so on replay the library holds
+            # only these items.
+            page["total"] = len(page["results"])
+            _write(f"{recorded}/items", page)
+    return written
+
+
+def main() -> None:
+    """Record a server's responses into the fixtures directory."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("url", help="the server's address")
+    parser.add_argument("--out", type=Path, default=RECORDINGS)
+    args = parser.parse_args()
+    token = os.environ.get("AUDIOBOOKSHELF_TOKEN")
+    if not token:
+        sys.exit("Set AUDIOBOOKSHELF_TOKEN to an admin API key")
+    args.out.mkdir(parents=True, exist_ok=True)
+    for file in asyncio.run(async_record(args.url, token, args.out)):
+        print(file)  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
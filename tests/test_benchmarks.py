@@ -0,0 +1,110 @@
+"""Timing and memory of a poll and of remove_my_progress against a fake server."""
+
+import asyncio
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.audiobookshelf.services import (
+    SERVICE_ATTRIBUTE_SERIES_NAME,
+    SERVICE_REMOVE_PROGRESS,
+)
+from scripts.fake_abs import ADMIN_TOKEN, SERIES_COUNT, FakeAudiobookshelf
+
+from .benchmarking import (
+    Measurement,
+    attach_libraries,
+    check_baseline,
+    close,
+    measure,
+    service_handlers,
+    standalone_coordinator,
+    summary,
+)
+
+POLL_RUNS = 5
+
+
+@dataclass(frozen=True)
+class Scale:
+    """The size of server a benchmark runs against."""
+
+    name: str
+    libraries: int
+    items_per_library: int
+    users: int
+    sessions: int
+    latency: float = 0.0
+
+
+SCALES = (
+    Scale("small", libraries=1, items_per_library=100, users=5, sessions=2),
+    Scale("medium", libraries=3, items_per_library=300, users=50, sessions=20),
+    Scale("large", libraries=8, items_per_library=500, users=200, sessions=100),
+)
+# A server on a slow disk or a distant network, where a poll's time goes on
+# waiting rather than on decoding.
+SLOW = Scale(
+    "slow", libraries=8, items_per_library=50, users=20, sessions=10, latency=0.02
+)
+
+
+def _server(scale: Scale) -> FakeAudiobookshelf:
+    """Build a fake server of the given size."""
+    return FakeAudiobookshelf(
+        libraries=scale.libraries,
+        items_per_library=scale.items_per_library,
+        users=scale.users,
+        sessions=scale.sessions,
+        latency=scale.latency,
+    )
+
+
+@pytest.mark.parametrize("scale", [*SCALES, SLOW], ids=lambda scale: scale.name)
+def test_poll(scale: Scale) -> None:
+    """A steady-state poll, every library's stats included."""
+    server = _server(scale)
+
+    async def _run() -> Measurement:
+        async with server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+            try:
+                await attach_libraries(coordinator)
+                # Logs in and opens the connections, which only the first
+                # poll after setup pays for.
+                await coordinator._async_update_data()  # noqa: SLF001
+                runs = [
+                    await measure(coordinator._async_update_data)  # noqa: SLF001
+                    for _ in range(POLL_RUNS)
+                ]
+                data = await coordinator._async_update_data()  # noqa: SLF001
+            finally:
+                await close(coordinator)
+        assert data["count_users"] == scale.users
+        assert data["count_libraries"] == scale.libraries
+        return summary(runs)
+
+    check_baseline(f"poll[{scale.name}]", asyncio.run(_run()))
+
+
+@pytest.mark.parametrize("scale", SCALES, ids=lambda scale: scale.name)
+def test_remove_my_progress(scale: Scale) -> None:
+    """The action from a cold catalog: a full walk, then each matching book."""
+    server = _server(scale)
+
+    async def _run() -> Measurement:
+        async with server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+            handler = service_handlers(coordinator)[SERVICE_REMOVE_PROGRESS]
+            call = SimpleNamespace(data={SERVICE_ATTRIBUTE_SERIES_NAME: "Series 3"})
+            try:
+                return await measure(lambda: handler(call))
+            finally:
+                await close(coordinator)
+
+    measured = asyncio.run(_run())
+
+    expected = scale.libraries * scale.items_per_library // SERIES_COUNT
+    assert len(server.progress_removed) == expected
+    check_baseline(f"remove_my_progress[{scale.name}]", measured)
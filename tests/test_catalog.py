@@ -0,0 +1,167 @@
+"""Tests for the incrementally synced library catalog."""
+
+import asyncio
+import json
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.audiobookshelf.catalog import LibraryCatalog
+from custom_components.audiobookshelf.const import PAGE_SIZE_INITIAL
+
+
+def _item(item_id: str, updated_at: int, series: str = "The Expanse") -> dict:
+    """Build one minified book as the items endpoint returns it."""
+    return {
+        "id": item_id,
+        "mediaType": "book",
+        "addedAt": 1,
+        "updatedAt": updated_at,
+        "size": 1024,
+        "media": {
+            "duration": 3600.0,
+            "metadata": {
+                "title": f"Book {item_id}",
+                "seriesName": series,
+                "authorName": "James S. A. Corey",
+            },
+        },
+    }
+
+
+class _Server:
+    """Serve one library's items, newest first, and record each page asked for."""
+
+    def __init__(self, items: list[dict], *, honour_sort: bool = True) -> None:
+        """Hold the library's items."""
+        self.items = items
+        self.honour_sort = honour_sort
+        self.pages: list[int] = []
+
+    async def get(self, endpoint: str, params: dict[str, Any]) -> bytes:
+        """Answer /api/libraries/lib-1/items the way Audiobookshelf does."""
+        assert endpoint == "api/libraries/lib-1/items"
+        self.pages.append(int(params["page"]))
+        items = self.items
+        if self.honour_sort:
+            items = sorted(items, key=lambda item: item["updatedAt"], reverse=True)
+        limit = int(params["limit"])
+        start = int(params["page"]) * limit
+        return json.dumps(
+            {"results": items[start : start + limit], "total": len(items)}
+        ).encode()
+
+
+def _catalog() -> LibraryCatalog:
+    """Build an empty catalog over a stub store."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=None)
+    return LibraryCatalog(store)
+
+
+def _sync(catalog: LibraryCatalog, server: _Server) -> None:
+    """Run one sync of library lib-1 against the stub server."""
+    client = MagicMock()
+    client._get = AsyncMock(side_effect=server.get)  # noqa: SLF001
+    asyncio.run(catalog.async_sync(client, ["lib-1"]))
+
+
+def test_first_sync_walks_every_page() -> None:
+    """An empty catalog has no cursor, so everything is fetched."""
+    server = _Server([_item(str(i), i) for i in range(PAGE_SIZE_INITIAL + 5)])
+    catalog = _catalog()
+
+    _sync(catalog, server)
+
+    assert len(catalog) == PAGE_SIZE_INITIAL + 5
+    assert server.pages == [0, 1]
+
+
+def test_later_sync_stops_at_the_cursor() -> None:
+    """Only the first page is read when nothing older has changed."""
+    items = [_item(str(i), i) for i in range(PAGE_SIZE_INITIAL * 3)]
+    server = _Server(items)
+    catalog = _catalog()
+    _sync(catalog, server)
+
+    items.append(_item("new", 10_000, series="Dune"))
+    server.pages.clear()
+    _sync(catalog, server)
+
+    assert server.pages == [0]
+    assert [item.id_ for item in catalog.in_series("dune")] == ["new"]
+
+
+def test_edited_item_is_updated_in_place() -> None:
+    """An edit bumps updatedAt, which is what the incremental walk follows."""
+    items = [_item("a", 1, series="Dune"), _item("b", 2)]
+    server = _Server(items)
+    catalog = _catalog()
+    _sync(catalog, server)
+
+    items[0] = _item("a", 3, series="The Expanse")
+    _sync(catalog, server)
+
+    assert len(catalog) == 2
+    assert catalog.in_series("dune") == []
+
+
+def test_deletion_triggers_a_full_walk() -> None:
+    """A deleted item bumps nothing, so only the total gives it away."""
+    items = [_item(str(i), i) for i in range(5)]
+    server = _Server(items)
+    catalog = _catalog()
+    _sync(catalog, server)
+
+    del items[2]
+    _sync(catalog, server)
+
+    assert sorted(item.id_ for item in catalog.items()) == ["0", "1", "3", "4"]
+
+
+def test_unsorted_server_falls_back_to_a_full_walk() -> None:
+    """Stopping early is only safe when pages really are newest-first."""
+    items = [_item(str(i), i) for i in range(5)]
+    server = _Server(items, honour_sort=False)
+    catalog = _catalog()
+    _sync(catalog, server)
+
+    items.append(_item("new", 10_000))
+    _sync(catalog, server)
+
+    assert len(catalog) == 6
+
+
+def test_removed_library_drops_its_items() -> None:
+    """Items of a library deleted on the server must not stay matchable."""
+    catalog = _catalog()
+    _sync(catalog, _Server([_item("a", 1)]))
+
+    asyncio.run(catalog.async_sync(MagicMock(), []))
+
+    assert len(catalog) == 0
+
+
+def test_catalog_round_trips_through_the_store() -> None:
+    """A restart resumes from the saved cursor instead of walking again."""
+    store = MagicMock()
+    catalog = LibraryCatalog(store)
+    _sync(catalog, _Server([_item("a", 1), _item("b", 2)]))
+    saved = store.async_delay_save.call_args.args[0]()
+
+    store.async_load = AsyncMock(return_value=json.loads(json.dumps(saved)))
+    restored = LibraryCatalog(store)
+    asyncio.run(restored.async_load())
+
+    assert len(restored) == 2
+    assert restored._cursors == {"lib-1": 2}  # noqa: SLF001
+
+
+def test_unreadable_store_is_discarded() -> None:
+    """A corrupt cache costs a rebuild, not a failed setup."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value={"items": {"lib-1": [{"id_": "a"}]}})
+    catalog = LibraryCatalog(store)
+
+    asyncio.run(catalog.async_load())
+
+    assert len(catalog) == 0
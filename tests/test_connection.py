@@ -0,0 +1,96 @@
+"""Tests for the entry's own HTTP session against a local server."""
+
+import asyncio
+import gzip
+import json
+
+from aiohttp import hdrs, web
+
+from custom_components.audiobookshelf.connection import (
+    ACCEPT_ENCODING,
+    ConnectionStats,
+    create_session,
+)
+
+BODY = json.dumps({"users": [{"id": f"user-{n}"} for n in range(200)]}).encode()
+
+
+async def _serve() -> tuple[web.AppRunner, str, list[str]]:
+    """Serve a compressed users list and record the Accept-Encoding sent."""
+    accepted: list[str] = []
+
+    async def _users(request: web.Request) -> web.Response:
+        accepted.append(request.headers.get(hdrs.ACCEPT_ENCODING, ""))
+        # Compressed up front so the response states its length on the wire.
+        return web.Response(
+            body=gzip.compress(BODY),
+            content_type="application/json",
+            headers={hdrs.CONTENT_ENCODING: "gzip"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/api/users", _users)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}", accepted
+
+
+def test_connections_are_reused_and_compression_is_counted() -> None:
+    """A poll's burst of requests should share one connection, compressed."""
+    stats = ConnectionStats()
+
+    async def _run() -> list[str]:
+        runner, url, accepted = await _serve()
+        try:
+            async with create_session(stats) as session:
+                for _ in range(3):
+                    async with session.get(f"{url}/api/users") as response:
+                        body = await response.read()
+                        stats.record_response(response, body)
+                        assert body == BODY
+        finally:
+            await runner.cleanup()
+        return accepted
+
+    accepted = asyncio.run(_run())
+
+    assert accepted == [ACCEPT_ENCODING] * 3
+    assert stats.connections_created == 1
+    assert stats.connections_reused == 2
+    assert stats.compressed_responses == 3
+    counters = stats.as_dict()
+    assert counters["bytes_decoded"] == 3 * len(BODY)
+    assert counters["bytes_saved"] == 3 * (len(BODY) - len(gzip.compress(BODY)))
+
+
+def test_uncompressed_response_saves_nothing() -> None:
+    """Only responses the server actually compressed are counted."""
+    stats = ConnectionStats()
+
+    async def _run() -> None:
+        async def _plain(_request: web.Request) -> web.Response:
+            return web.json_response({"users": []})
+
+        app = web.Application()
+        app.router.add_get("/api/users", _plain)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            async with (
+                create_session(stats) as session,
+                session.get(f"http://127.0.0.1:{port}/api/users") as response,
+            ):
+                stats.record_response(response, await response.read())
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(_run())
+
+    assert stats.compressed_responses == 0
+    assert stats.as_dict()["bytes_saved"] == 0
@@ -4,9 +4,14 @@ import time
 from types import SimpleNamespace
 
 from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
+    AllUsersResponse,
     AuthSessionsResponse,
     LibraryStats,
     OpenSessionsResponse,
+    ProgressTotals,
+    UserActivity,
+    UserWithProgress,
+    listening_breakdown,
 )
 
 
@@ -40,6 +45,93 @@ def test_library_stats_with_total_authors() -> None:
     assert LibraryStats.from_json(payload).total_authors == 5
 
 
+def test_user_activity_counts_books_and_not_episodes() -> None:
+    """Podcast episodes count as listening, but not as books."""
+    payload = b"""
+    {"id": "u1", "username": "alice", "type": "user",
+     "lastSeen": 1700000000000, "mediaProgress": [
+       {"libraryItemId": "a", "isFinished": true, "lastUpdate": 1690000000000},
+       {"libraryItemId": "b", "isFinished": false, "lastUpdate": 1695000000000},
+       {"libraryItemId": "c", "episodeId": "e", "isFinished": true,
+        "lastUpdate": 1699000000000}]}
+    """
+    user = UserWithProgress.from_json(payload)
+    activity = UserActivity.from_user(user, ProgressTotals.from_user(user))
+
+    assert activity.username == "alice"
+    assert activity.books_finished == 1
+    assert activity.books_in_progress == 1
+    assert activity.last_seen is not None
+    assert activity.last_seen.timestamp() == 1_700_000_000
+    assert activity.last_listened is not None
+    assert activity.last_listened.timestamp() == 1_699_000_000
+
+
+def test_user_activity_without_progress_is_unknown() -> None:
+    """A server leaving mediaProgress out has not said nobody started a book."""
+    payload = b"""{"id": "u1", "username": "bob", "type": "user"}"""
+    user = UserWithProgress.from_json(payload)
+    activity = UserActivity.from_user(user, ProgressTotals.from_user(user))
+
+    assert activity.books_in_progress is None
+    assert activity.books_finished is None
+    assert activity.last_seen is None
+    assert activity.last_listened is None
+
+
+def test_user_activity_before_its_progress_is_fetched() -> None:
+    """Users are listed without their progress, which is unknown until fetched."""
+    payload = b"""
+    {"users": [{"id": "u1", "username": "carol", "type": "user",
+      "lastSeen": 1700000000000}]}
+    """
+    activity = UserActivity.from_user(
+        AllUsersResponse.from_json(payload).users[0], None
+    )
+
+    assert activity.username == "carol"
+    assert activity.books_finished is None
+    assert activity.last_seen is not None
+
+
+def _playing(user: str, library: str, **device_info: str) -> SimpleNamespace:
+    """Build a stand-in session carrying only what the grouping reads."""
+    info = {"manufacturer": "", "model": "", "client_name": "", **device_info}
+    return SimpleNamespace(
+        user_id=user,
+        library_id=library,
+        media_player="html5",
+        device_info=SimpleNamespace(**info),
+    )
+
+
+def test_listening_is_grouped_by_user_device_and_library() -> None:
+    """Each session counts once in each grouping."""
+    sessions = [
+        _playing("u1", "books", manufacturer="Google", model="Pixel 8"),
+        _playing("u1", "podcasts", client_name="Abs Web"),
+        _playing("u2", "books", client_name="Abs Web"),
+        _playing("u2", "books"),
+    ]
+
+    breakdown = listening_breakdown(sessions)  # type: ignore[arg-type]
+
+    by_user = breakdown["listening_by_user"]
+    assert by_user["u1"].sessions == 2
+    assert by_user["u1"].devices == {"Google Pixel 8", "Abs Web"}
+    assert by_user["u1"].libraries == {"books", "podcasts"}
+    by_device = breakdown["listening_by_device"]
+    assert {device: group.sessions for device, group in by_device.items()} == {
+        "Google Pixel 8": 1,
+        "Abs Web": 2,
+        "html5": 1,
+    }
+    assert by_device["Abs Web"].users == {"u1", "u2"}
+    by_library = breakdown["listening_by_library"]
+    assert by_library["books"].sessions == 3
+    assert by_library["books"].users == {"u1", "u2"}
+
+
 def _response_with_session_at(updated_at_ms: int) -> OpenSessionsResponse:
     """Build a response around a stand-in that only carries updated_at."""
     return OpenSessionsResponse(sessions=[SimpleNamespace(updated_at=updated_at_ms)])  # type: ignore[list-item]
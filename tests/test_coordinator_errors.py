@@ -1,18 +1,27 @@
 """Tests for how the coordinator maps API failures onto Home Assistant errors."""
 
 import asyncio
+import time
+from datetime import timedelta
 from types import SimpleNamespace
-from typing import Any
+from typing import Any, cast
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from aioaudiobookshelf.exceptions import ApiError, NotFoundError, TokenIsMissingError
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
     AudiobookShelfDataUpdateCoordinator,
+    LibraryStatsCoordinator,
 )
+from custom_components.audiobookshelf.const import (
+    ENDPOINT_TIMEOUTS,
+)
+
+from .benchmarking import standalone_coordinator
 
 LIBRARY_STATS = (
     b'{"totalAuthors": 1, "totalGenres": 3, "totalItems": 12, "totalSize": 1024,'
@@ -22,31 +31,21 @@ OPEN_SESSIONS = b'{"sessions": []}'
 USERS = b'{"users": []}'
 USERS_ONLINE = b'{"usersOnline": []}'
 AUTH_SESSIONS = b'{"total": 2}'
-
-
-def _coordinator() -> AudiobookShelfDataUpdateCoordinator:
-    """Build a coordinator with Home Assistant stubbed out."""
-    with patch.object(
-        AudiobookShelfDataUpdateCoordinator, "__init__", return_value=None
-    ):
-        coordinator = AudiobookShelfDataUpdateCoordinator(  # type: ignore[call-arg]
-            MagicMock(), MagicMock(), 300, "http://abs", "token"
-        )
-    coordinator.api_url = "http://abs"
-    coordinator.token = "api-key"  # noqa: S105
-    coordinator.libraries = []
-    return coordinator
+URL = "http://abs"
 
 
 def _with_client(responses: dict[str, Any]) -> AudiobookShelfDataUpdateCoordinator:
     """Return a coordinator whose client answers endpoints from a mapping."""
-    coordinator = _coordinator()
+    coordinator = standalone_coordinator(URL, "api-key")
 
     async def _get(endpoint: str) -> Any:
         """Return the mapped response, raising it instead if it is an exception."""
         response = responses[endpoint]
         if isinstance(response, Exception):
             raise response
+        if isinstance(response, float):
+            # A number of seconds the endpoint takes to answer at all.
+            await asyncio.sleep(response)
         return response
 
     client = MagicMock()
@@ -91,18 +90,60 @@ def test_auth_error_triggers_reauth() -> None:
         asyncio.run(coordinator._async_update_data())  # noqa: SLF001
 
 
-def test_api_error_is_update_failed() -> None:
-    """A non-auth API error must not prompt for reauth."""
+def _poll(coordinator: AudiobookShelfDataUpdateCoordinator) -> dict[str, Any]:
+    """Run one poll and keep its data, as DataUpdateCoordinator would."""
+    coordinator.data = asyncio.run(coordinator._async_update_data())  # noqa: SLF001
+    return cast("dict[str, Any]", coordinator.data)
+
+
+def test_failing_step_does_not_fail_the_poll() -> None:
+    """Other metrics still update when one endpoint fails."""
     coordinator = _with_client(_endpoints(**{"api/users": ApiError("boom")}))
-    with pytest.raises(UpdateFailed):
-        asyncio.run(coordinator._async_update_data())  # noqa: SLF001
 
+    data = _poll(coordinator)
+
+    assert "count_users" not in data
+    assert data["count_libraries"] == 1
+    assert not coordinator.freshness.is_fresh("count_users")
+    assert coordinator.freshness.is_fresh("count_users_online")
+
+
+def test_failing_step_keeps_its_last_value() -> None:
+    """A step that fails after succeeding serves what it had, marked stale."""
+    endpoints = _endpoints()
+    coordinator = _with_client(endpoints)
+    _poll(coordinator)
 
-def test_not_found_is_update_failed_not_reauth() -> None:
+    endpoints["api/me/sessions"] = ApiError("boom")
+    data = _poll(coordinator)
+
+    assert data["count_auth_sessions"] == 2
+    assert coordinator.freshness.is_stale("count_auth_sessions")
+    assert coordinator.freshness.is_fresh("count_auth_sessions")
+    assert not coordinator.freshness.is_stale("count_users")
+
+
+def test_everything_failing_is_update_failed() -> None:
+    """Nothing getting through means the server is down, not one endpoint."""
+    failure = ApiError("boom")
+    coordinator = _with_client(
+        {
+            **dict.fromkeys(_endpoints(), failure),
+            "api/libraries/lib-1/stats": failure,
+        }
+    )
+    coordinator.libraries = [SimpleNamespace(id_="lib-1", name="Books")]  # type: ignore[list-item]
+    coordinator.get_libraries = AsyncMock(side_effect=failure)  # type: ignore[method-assign]
+
+    with pytest.raises(UpdateFailed, match="users"):
+        _poll(coordinator)
+
+
+def test_not_found_is_not_reauth() -> None:
     """A 404 on a required endpoint is a failure, not an auth problem."""
     coordinator = _with_client(_endpoints(**{"api/users": NotFoundError("gone")}))
-    with pytest.raises(UpdateFailed):
-        asyncio.run(coordinator._async_update_data())  # noqa: SLF001
+    _poll(coordinator)
+    assert coordinator.freshness.is_stale("count_users")
 
 
 def test_auth_sessions_degrade_to_none_on_404() -> None:
@@ -115,6 +156,89 @@ def test_auth_sessions_degrade_to_none_on_404() -> None:
     assert data["count_libraries"] == 1
 
 
+def test_slow_endpoint_is_cut_off_at_its_own_timeout() -> None:
+    """A cheap lookup that stalls does not get the 30 seconds stats do."""
+    coordinator = _with_client(_endpoints(**{"api/users/online": 10.0}))
+
+    with patch.dict(ENDPOINT_TIMEOUTS, {"api/users/online": 0.05}):
+        started = time.monotonic()
+        data = _poll(coordinator)
+
+    assert time.monotonic() - started < 1
+    assert coordinator.freshness.is_stale("count_users_online")
+    assert data["count_users"] == 0
+    assert data["count_libraries"] == 1
+
+
+def test_poll_ends_by_its_deadline() -> None:
+    """Steps still running or not yet started at the deadline are stale."""
+    coordinator = _with_client(_endpoints(**{"api/sessions/open": 10.0}))
+    coordinator.update_interval = timedelta(seconds=0.25)
+
+    started = time.monotonic()
+    data = _poll(coordinator)
+
+    assert time.monotonic() - started < 1
+    assert data["count_users"] == 0
+    for key in ("count_open_sessions", "count_auth_sessions", "count_libraries"):
+        assert coordinator.freshness.is_stale(key)
+
+
+def _library(
+    coordinator: AudiobookShelfDataUpdateCoordinator,
+) -> LibraryStatsCoordinator:
+    """Attach the one library the test client knows, without starting it."""
+    with patch.object(LibraryStatsCoordinator, "async_start"):
+        return coordinator.async_attach_library(
+            SimpleNamespace(id_="lib-1", name="Books")  # type: ignore[arg-type]
+        )
+
+
+def _poll_library(child: LibraryStatsCoordinator) -> dict[str, Any]:
+    """Run one library poll and keep its data, as DataUpdateCoordinator would."""
+    child.data = asyncio.run(child._async_update_data())  # noqa: SLF001
+    return child.data
+
+
+def test_entry_poll_leaves_library_stats_to_their_own_coordinators() -> None:
+    """A slow library can no longer eat into the entry's poll."""
+    coordinator = _with_client(_endpoints(**{"api/libraries/lib-1/stats": 10.0}))
+
+    started = time.monotonic()
+    data = _poll(coordinator)
+
+    assert time.monotonic() - started < 1
+    assert "library_stats" not in data
+    assert data["count_libraries"] == 1
+
+
+def test_library_poll_reads_its_stats() -> None:
+    """Shaped like the entry's data, so the sensors read either the same way."""
+    coordinator = _with_client(_endpoints())
+    child = _library(coordinator)
+
+    data = _poll_library(child)
+
+    assert data["library_stats"]["lib-1"].total_items == 12
+    assert coordinator.freshness.is_fresh("library_stats:lib-1")
+
+
+def test_failing_library_keeps_its_last_stats() -> None:
+    """A library that fails after succeeding serves what it had, marked stale."""
+    endpoints = _endpoints()
+    coordinator = _with_client(endpoints)
+    child = _library(coordinator)
+    _poll_library(child)
+
+    endpoints["api/libraries/lib-1/stats"] = ApiError("boom")
+    data = _poll_library(child)
+
+    assert data["library_stats"]["lib-1"].total_items == 12
+    assert coordinator.freshness.is_stale("library_stats:lib-1")
+    assert coordinator.freshness.is_fresh("library_stats:lib-1")
+    assert child.last_update_success
+
+
 @pytest.mark.parametrize(
     "body",
     [
@@ -123,8 +247,136 @@ def test_auth_sessions_degrade_to_none_on_404() -> None:
         pytest.param(b"<html>not json</html>", id="non-json-body"),
     ],
 )
-def test_schema_drift_is_update_failed(body: bytes) -> None:
+def test_schema_drift_marks_the_library_stale(body: bytes) -> None:
     """Parse failures are neither AbsError nor ClientError and must be caught."""
     coordinator = _with_client(_endpoints(**{"api/libraries/lib-1/stats": body}))
-    with pytest.raises(UpdateFailed, match="library stats"):
-        asyncio.run(coordinator._async_update_data())  # noqa: SLF001
+    child = _library(coordinator)
+
+    data = _poll_library(child)
+
+    assert data["library_stats"] == {}
+    assert coordinator.freshness.is_stale("library_stats:lib-1")
+
+
+def test_library_auth_error_triggers_reauth() -> None:
+    """A child is no way around the entry's handling of a revoked key."""
+    coordinator = _with_client(
+        _endpoints(**{"api/libraries/lib-1/stats": TokenIsMissingError("no token")})
+    )
+    child = _library(coordinator)
+
+    with pytest.raises(ConfigEntryAuthFailed):
+        _poll_library(child)
+
+
+def test_library_starts_are_staggered() -> None:
+    """Their requests should not all arrive together on every interval."""
+    coordinator = standalone_coordinator(URL, "api-key")
+    coordinator.library_scan_interval = 5
+
+    with patch.object(LibraryStatsCoordinator, "async_start") as start:
+        for n in range(4):
+            coordinator.async_attach_library(
+                SimpleNamespace(id_=f"lib-{n}", name=f"Library {n}")  # type: ignore[arg-type]
+            )
+
+    assert [c.args[0] for c in start.call_args_list] == [0, 2, 4, 1]
+
+
+def test_attaching_a_known_library_reuses_its_coordinator() -> None:
+    """The sensor listener runs on every poll and must not start duplicates."""
+    coordinator = standalone_coordinator(URL, "api-key")
+    first = _library(coordinator)
+
+    assert _library(coordinator) is first
+    assert len(coordinator.library_coordinators) == 1
+
+
+def test_deleted_library_is_dropped() -> None:
+    """Stats for a library gone from the server are not held over."""
+    coordinator = _with_client(_endpoints())
+    child = _library(coordinator)
+    _poll_library(child)
+    entry = cast("MagicMock", coordinator.config_entry)
+
+    def _background(_hass: Any, shutdown: Any, **_kwargs: Any) -> None:
+        # Closed rather than run: the test has no event loop left to run it on.
+        shutdown.close()
+
+    entry.async_create_background_task.side_effect = _background
+
+    coordinator.async_detach_library("lib-1")
+
+    assert coordinator.library_coordinators == {}
+    assert coordinator.freshness.fetched_at("library_stats:lib-1") is None
+    entry.async_create_background_task.assert_called_once()
+
+
+def _rotating(
+    count: int, per_poll: int
+) -> tuple[AudiobookShelfDataUpdateCoordinator, MagicMock]:
+    """Build an entry rotating through count libraries, per_poll at a time."""
+    coordinator = _with_client(
+        _endpoints(
+            **{f"api/libraries/lib-{n}/stats": LIBRARY_STATS for n in range(count)}
+        )
+    )
+    coordinator.library_stats_per_poll = per_poll
+    with patch.object(LibraryStatsCoordinator, "async_start"):
+        for n in range(count):
+            coordinator.async_attach_library(
+                SimpleNamespace(id_=f"lib-{n}", name=f"Library {n}")  # type: ignore[arg-type]
+            )
+    client = cast("MagicMock", asyncio.run(coordinator.get_client()))
+    return coordinator, client
+
+
+def _stats_fetched(client: MagicMock) -> list[str]:
+    """Return the libraries whose stats were requested, in order."""
+    endpoints = [c.args[0] for c in client._get.call_args_list]  # noqa: SLF001
+    return [e.split("/")[2] for e in endpoints if e.endswith("/stats")]
+
+
+def test_rotation_refreshes_a_slice_per_poll_oldest_first() -> None:
+    """Never-fetched libraries go first, then whichever were fetched longest ago."""
+    coordinator, client = _rotating(4, per_poll=2)
+    coordinator.freshness.succeeded(
+        "library_stats:lib-0", dt_util.utcnow() - timedelta(minutes=5)
+    )
+    coordinator.freshness.succeeded(
+        "library_stats:lib-1", dt_util.utcnow() - timedelta(minutes=10)
+    )
+
+    _poll(coordinator)
+    assert _stats_fetched(client) == ["lib-2", "lib-3"]
+
+    _poll(coordinator)
+    assert _stats_fetched(client) == ["lib-2", "lib-3", "lib-1", "lib-0"]
+    child = coordinator.library_coordinators["lib-1"]
+    assert child.data["library_stats"]["lib-1"].total_items == 12
+
+
+def test_rotation_grows_the_slice_to_keep_the_max_age() -> None:
+    """Two a poll would leave some of ten libraries older than promised."""
+    coordinator, _ = _rotating(10, per_poll=2)
+    # Two polls fit inside the maximum age, so half must go each time.
+    coordinator.library_max_age = 600
+
+    assert len(coordinator._libraries_to_rotate()) == 5  # noqa: SLF001
+
+
+def test_rotating_libraries_have_no_schedule_of_their_own() -> None:
+    """Otherwise every library would still be polled on every interval."""
+    coordinator, _ = _rotating(2, per_poll=1)
+
+    for child in coordinator.library_coordinators.values():
+        assert child.update_interval is None
+
+
+def test_no_rotation_leaves_libraries_to_their_own_schedule() -> None:
+    """Off by default, and then the entry's poll fetches no stats at all."""
+    coordinator, client = _rotating(3, per_poll=0)
+
+    _poll(coordinator)
+
+    assert _stats_fetched(client) == []
@@ -0,0 +1,143 @@
+"""Tests for hedging poll requests that run past their usual latency."""
+
+import asyncio
+from typing import Any
+
+import pytest
+from aioaudiobookshelf.exceptions import ApiError
+
+from custom_components.audiobookshelf.hedging import Hedger
+
+ENDPOINT = "api/libraries/lib-1/stats"
+
+
+class _Endpoint:
+    """An endpoint answering each successive request after a set delay."""
+
+    def __init__(self, *delays: float, error: Exception | None = None) -> None:
+        """Answer the nth request after delays[n], the last delay thereafter."""
+        self.delays = delays
+        self.error = error
+        self.started = 0
+        self.finished = 0
+        self.cancelled = 0
+
+    async def fetch(self) -> bytes:
+        """Answer one request."""
+        delay = self.delays[min(self.started, len(self.delays) - 1)]
+        self.started += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        self.finished += 1
+        if self.error is not None:
+            raise self.error
+        return b"{}"
+
+
+def _warmed(seconds: float = 0.01, **kwargs: Any) -> Hedger:
+    """Build an enabled hedger that has already seen the endpoint answer."""
+    hedger = Hedger(enabled=True, min_samples=3, **kwargs)
+    for _ in range(3):
+        hedger._record(ENDPOINT, seconds)  # noqa: SLF001
+    return hedger
+
+
+def test_p95_needs_enough_samples() -> None:
+    """A couple of readings say nothing about what is unusually slow."""
+    hedger = Hedger(enabled=True, min_samples=3)
+    hedger._record(ENDPOINT, 0.1)  # noqa: SLF001
+    assert hedger.p95(ENDPOINT) is None
+
+    for seconds in (0.2, 0.3, 5.0):
+        hedger._record(ENDPOINT, seconds)  # noqa: SLF001
+    assert hedger.p95(ENDPOINT) == 5.0
+
+
+def test_slow_request_is_hedged_and_the_hedge_wins() -> None:
+    """A stalled first copy is overtaken by a fresh one, then cancelled."""
+    endpoint = _Endpoint(1.0, 0.01)
+    hedger = _warmed()
+
+    assert asyncio.run(hedger.run(ENDPOINT, endpoint.fetch)) == b"{}"
+
+    assert (hedger.sent, hedger.won) == (1, 1)
+    assert endpoint.started == 2
+    assert endpoint.cancelled == 1
+
+
+def test_fast_request_is_not_hedged() -> None:
+    """Inside its usual latency nothing extra is sent."""
+    endpoint = _Endpoint(0.001)
+    hedger = _warmed(seconds=0.5)
+
+    asyncio.run(hedger.run(ENDPOINT, endpoint.fetch))
+
+    assert hedger.sent == 0
+    assert endpoint.started == 1
+
+
+def test_first_copy_can_still_win() -> None:
+    """A hedge is a race, not a replacement."""
+    endpoint = _Endpoint(0.05, 1.0)
+    hedger = _warmed()
+
+    asyncio.run(hedger.run(ENDPOINT, endpoint.fetch))
+
+    assert (hedger.sent, hedger.won) == (1, 0)
+    assert endpoint.cancelled == 1
+
+
+def test_disabled_never_hedges() -> None:
+    """Off is the default, and then requests go out exactly once."""
+    endpoint = _Endpoint(0.05)
+    hedger = Hedger(enabled=False, min_samples=3)
+    for _ in range(3):
+        hedger._record(ENDPOINT, 0.001)  # noqa: SLF001
+
+    asyncio.run(hedger.run(ENDPOINT, endpoint.fetch))
+
+    assert hedger.sent == 0
+    assert endpoint.started == 1
+
+
+def test_hedges_in_flight_are_capped() -> None:
+    """Under a general slowdown hedging must not double the load."""
+    endpoint = _Endpoint(0.2)
+    hedger = _warmed(max_in_flight=1)
+
+    async def _burst() -> None:
+        await asyncio.gather(*(hedger.run(ENDPOINT, endpoint.fetch) for _ in range(4)))
+
+    asyncio.run(_burst())
+
+    assert hedger.sent == 1
+    assert endpoint.started == 5
+
+
+def test_both_copies_failing_raises() -> None:
+    """A hedge cannot turn a failing endpoint into a success."""
+    endpoint = _Endpoint(0.05, error=ApiError("boom"))
+    hedger = _warmed()
+
+    with pytest.raises(ApiError):
+        asyncio.run(hedger.run(ENDPOINT, endpoint.fetch))
+
+
+def test_caller_giving_up_cancels_every_copy() -> None:
+    """A poll deadline leaves no request running behind it."""
+    endpoint = _Endpoint(1.0)
+    hedger = _warmed()
+
+    async def _give_up() -> None:
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.1):
+                await hedger.run(ENDPOINT, endpoint.fetch)
+        await asyncio.sleep(0)
+
+    asyncio.run(_give_up())
+
+    assert endpoint.started == 2
+    assert endpoint.cancelled == 2
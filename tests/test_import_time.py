@@ -0,0 +1,68 @@
+"""Tests for what importing the integration costs Home Assistant's startup."""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from .benchmarking import CHECK_TIMINGS
+
+PACKAGE = "custom_components.audiobookshelf"
+
+# Only loaded once something actually needs them: a search, a profile, or
+# the user opting in to update checks.
+DEFERRED = (
+    f"{PACKAGE}.profiling",
+    f"{PACKAGE}.search",
+    f"{PACKAGE}.update",
+    "homeassistant.components.update",
+)
+
+# The integration's own modules, not the libraries they pull in. Generous
+# enough for a slow CI runner, while catching a module that starts doing real
+# work at import again.
+OWN_MODULES_BUDGET_SECONDS = 0.5
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \|\s*(\S+)")
+
+
+def _import_times() -> dict[str, float]:
+    """Import the integration in a fresh interpreter, timing every module."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {PACKAGE}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    times: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is not None:
+            times[match.group(2)] = int(match.group(1)) / 1_000_000
+    return times
+
+
+def test_import_leaves_deferred_modules_unloaded() -> None:
+    """Startup does not pay for what only a service call or option needs."""
+    times = _import_times()
+
+    assert PACKAGE in times
+    assert [module for module in DEFERRED if module in times] == []
+
+
+@pytest.mark.skipif(
+    not CHECK_TIMINGS, reason="set AUDIOBOOKSHELF_CHECK_TIMINGS to check timings"
+)
+def test_own_modules_import_within_budget() -> None:
+    """The integration's own modules add little on top of their libraries."""
+    times = _import_times()
+
+    own = sum(
+        seconds
+        for module, seconds in times.items()
+        if module == PACKAGE or module.startswith(f"{PACKAGE}.")
+    )
+    assert own < OWN_MODULES_BUDGET_SECONDS
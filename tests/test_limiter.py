@@ -0,0 +1,139 @@
+"""Tests for the request limiter shared by polls, actions and updates."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.audiobookshelf.limiter import (
+    LimitedSession,
+    Priority,
+    RequestLimiter,
+    request_priority,
+)
+
+
+async def _request(
+    limiter: RequestLimiter, order: list[str], name: str, seconds: float = 0.0
+) -> None:
+    """Make one request through the limiter that takes seconds to answer."""
+    async with limiter.slot():
+        order.append(name)
+        await asyncio.sleep(seconds)
+
+
+def test_rate_is_enforced() -> None:
+    """Past the burst, requests go out no faster than the rate."""
+    limiter = RequestLimiter(rate=50, max_concurrent=10, burst=1)
+    order: list[str] = []
+
+    async def _burst() -> float:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.gather(*(_request(limiter, order, str(n)) for n in range(6)))
+        return loop.time() - started
+
+    elapsed = asyncio.run(_burst())
+
+    # One straight away, then five more at 20 ms apart.
+    assert elapsed >= 0.09
+    assert len(order) == 6
+
+
+def test_concurrency_is_capped() -> None:
+    """A slow server never has more than max_concurrent requests waiting on it."""
+    limiter = RequestLimiter(rate=1000, max_concurrent=2)
+    in_flight = 0
+    peak = 0
+
+    async def _slow() -> None:
+        nonlocal in_flight, peak
+        async with limiter.slot():
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def _burst() -> None:
+        await asyncio.gather(*(_slow() for _ in range(8)))
+
+    asyncio.run(_burst())
+
+    assert peak == 2
+
+
+def test_polls_go_ahead_of_background_work() -> None:
+    """A long action queued first must not make the sensors late."""
+    limiter = RequestLimiter(rate=1000, max_concurrent=1)
+    order: list[str] = []
+
+    async def _poll() -> None:
+        with request_priority(Priority.POLL):
+            await _request(limiter, order, "poll")
+
+    async def _run() -> None:
+        background = [
+            asyncio.create_task(_request(limiter, order, f"bg{n}", 0.01))
+            for n in range(3)
+        ]
+        await asyncio.sleep(0.001)
+        await asyncio.gather(_poll(), *background)
+
+    asyncio.run(_run())
+
+    # bg0 already held the slot; the poll is next, however long bg1 waited.
+    assert order == ["bg0", "poll", "bg1", "bg2"]
+
+
+def test_waiting_is_recorded() -> None:
+    """So throttling shows up in diagnostics rather than as a slow server."""
+    limiter = RequestLimiter(rate=1000, max_concurrent=1)
+    order: list[str] = []
+
+    async def _burst() -> None:
+        await asyncio.gather(
+            *(_request(limiter, order, str(n), 0.01) for n in range(3))
+        )
+
+    asyncio.run(_burst())
+
+    stats = limiter.as_dict()
+    assert stats["requests"] == 3
+    assert stats["throttled"] == 2
+    assert stats["max_wait_seconds"] >= 0.01
+
+
+def test_giving_up_while_queued_frees_nothing_it_never_had() -> None:
+    """A caller cancelled in the queue must not leak or steal a slot."""
+    limiter = RequestLimiter(rate=1000, max_concurrent=1)
+    order: list[str] = []
+
+    async def _run() -> None:
+        holder = asyncio.create_task(_request(limiter, order, "holder", 0.02))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(_request(limiter, order, "queued"))
+        await asyncio.sleep(0.001)
+        queued.cancel()
+        await holder
+        await asyncio.wait_for(_request(limiter, order, "after"), timeout=1)
+
+    asyncio.run(_run())
+
+    assert order == ["holder", "after"]
+    assert limiter._in_flight == 0  # noqa: SLF001
+
+
+def test_session_reads_the_body_inside_the_slot() -> None:
+    """The cap has to cover the download, not just the headers."""
+    limiter = RequestLimiter(rate=1000, max_concurrent=1)
+    response = MagicMock()
+    response.read = AsyncMock(return_value=b"{}")
+    session: Any = MagicMock()
+    session.request = AsyncMock(return_value=response)
+
+    limited = LimitedSession(session, limiter)
+    result = asyncio.run(limited.get("http://abs/api/users", timeout=5))
+
+    assert result is response
+    session.request.assert_awaited_once_with("GET", "http://abs/api/users", timeout=5)
+    response.read.assert_awaited_once()
+    assert limiter.requests == 1
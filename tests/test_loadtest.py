@@ -0,0 +1,88 @@
+"""Tests for the load-test script."""
+
+import asyncio
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from multidict import CIMultiDict
+
+from custom_components.audiobookshelf import (
+    audiobook_shelf_data_update_coordinator as coordinator_module,
+)
+from scripts.fake_abs import ADMIN_TOKEN, FakeAudiobookshelf
+from scripts.loadtest import (
+    Settings,
+    async_load_test,
+    endpoint_for,
+    format_table,
+    percentile,
+    transferred_bytes,
+)
+
+
+def test_endpoint_folds_ids() -> None:
+    """Every library's stats, and every user's record, count as one endpoint."""
+    assert (
+        endpoint_for("http://abs.local//api/libraries/lib-3/stats")
+        == "api/libraries/{id}/stats"
+    )
+    assert endpoint_for("http://abs.local/api/users") == "api/users"
+    assert endpoint_for("http://abs.local/api/users/user-2") == "api/users/{id}"
+    assert endpoint_for("http://abs.local/api/users/online") == "api/users/online"
+
+
+def test_percentile_is_nearest_rank() -> None:
+    """A percentile is always one of the latencies measured."""
+    latencies = [float(n) for n in range(1, 101)]
+
+    assert percentile(latencies, 50) == 50.0
+    assert percentile(latencies, 99) == 99.0
+    assert percentile([0.25], 95) == 0.25
+
+
+def _response(**headers: str) -> Any:
+    return MagicMock(headers=CIMultiDict(headers))
+
+
+def test_transferred_bytes_are_what_was_sent() -> None:
+    """A compressed response counts what crossed the wire, not what it decoded to."""
+    body = b"x" * 1000
+
+    assert transferred_bytes(_response(), body) == 1000
+    assert (
+        transferred_bytes(
+            _response(**{"Content-Encoding": "gzip", "Content-Length": "40"}), body
+        )
+        == 40
+    )
+    assert transferred_bytes(_response(**{"Content-Encoding": "br"}), body) is None
+
+
+def test_load_test_counts_every_request() -> None:
+    """Each poll asks for each endpoint once, and each library's stats."""
+    settings = Settings(polls=6, rate=0, concurrency=2, max_requests_per_second=1000)
+
+    async def _run() -> tuple[dict[str, Any], FakeAudiobookshelf]:
+        async with FakeAudiobookshelf(libraries=2, users=3, sessions=1) as server:
+            return await async_load_test(server.url, ADMIN_TOKEN, settings), server
+
+    # Setup waits out each library's first refresh, which are spaced apart.
+    with patch.object(coordinator_module, "LIBRARY_START_SPACING_SECONDS", 0):
+        report, server = asyncio.run(_run())
+
+    assert report["polls"] == 6
+    assert report["failed_polls"] == 0
+    assert set(report["latency_seconds"]) == {"p50", "p95", "p99"}
+    assert report["endpoints"]["api/users"]["requests"] == 6
+    assert report["endpoints"]["api/libraries/{id}/stats"]["requests"] == 12
+    # Setup is left out of the report, but not out of what the server saw:
+    # each entry's first refresh is a poll too.
+    assert server.requests["api/users"] == 8
+    assert server.requests["api/authorize"] == 2
+    assert "api/authorize" not in report["endpoints"]
+    # The fake does not compress, so what was sent is what was decoded.
+    users = report["endpoints"]["api/users"]
+    assert users["bytes"] == users["decoded_bytes"]
+    assert users["bytes"] == server.bytes_sent["api/users"] * 6 // 8
+    assert users["unsized_responses"] == 0
+    assert "api/libraries/{id}/stats" in format_table(report)
@@ -1,23 +1,38 @@
 """Tests for reading the scan interval and for the options flow default."""
 
 import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
 from typing import Any
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 import voluptuous as vol
-from homeassistant.const import CONF_SCAN_INTERVAL
-
+from homeassistant.const import CONF_API_KEY, CONF_SCAN_INTERVAL, CONF_URL, Platform
+from homeassistant.util import dt as dt_util
+
+import custom_components.audiobookshelf as integration
+from custom_components.audiobookshelf import async_update_options
+from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
+    AudiobookShelfDataUpdateCoordinator,
+    LibraryStatsCoordinator,
+)
 from custom_components.audiobookshelf.config_flow import (
     SCAN_INTERVAL_SELECTOR,
     AudiobookshelfOptionsFlow,
 )
 from custom_components.audiobookshelf.const import (
+    CONF_CHECK_FOR_UPDATES,
+    CONF_HEDGE_REQUESTS,
+    CONF_LIBRARY_STATS_PER_POLL,
+    CONF_MAX_REQUESTS_PER_SECOND,
     DEFAULT_SCAN_INTERVAL,
     MIN_SCAN_INTERVAL,
     scan_interval_for,
 )
 
+from .benchmarking import standalone_coordinator
+
 
 def _entry(data: dict[str, Any], options: dict[str, Any]) -> Any:
     """Build a config entry stub with the given data and options."""
@@ -82,3 +97,129 @@ def test_submitting_options_stores_them() -> None:
     asyncio.run(flow.async_step_init({CONF_SCAN_INTERVAL: 90}))
 
     flow.async_create_entry.assert_called_once_with(data={CONF_SCAN_INTERVAL: 90})
+
+
+URL = "http://abs.local:13378"
+
+
+def _running_entry(**changes: Any) -> tuple[Any, Any]:
+    """Build hass and a loaded entry, its data changed by changes."""
+    coordinator = MagicMock()
+    coordinator.api_url = URL
+    coordinator.token = "api-key"  # noqa: S105
+    entry = _entry({CONF_URL: URL, CONF_API_KEY: "api-key", **changes}, {})
+    entry.runtime_data = coordinator
+    hass = MagicMock()
+    hass.config_entries.async_reload = AsyncMock()
+    return hass, entry
+
+
+def test_changed_options_are_applied_without_a_reload() -> None:
+    """The client, entities and data all survive a new interval."""
+    hass, entry = _running_entry()
+
+    asyncio.run(async_update_options(hass, entry))
+
+    hass.config_entries.async_reload.assert_not_awaited()
+    entry.runtime_data.async_apply_options.assert_called_once_with(entry)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [{CONF_URL: "http://other:13378"}, {CONF_API_KEY: "other-key"}],
+)
+def test_new_server_or_key_reloads(change: dict[str, str]) -> None:
+    """Nothing held for one server or account is any use for another."""
+    hass, entry = _running_entry(**change)
+
+    asyncio.run(async_update_options(hass, entry))
+
+    hass.config_entries.async_reload.assert_awaited_once_with(entry.entry_id)
+    entry.runtime_data.async_apply_options.assert_not_called()
+
+
+def test_opting_in_forwards_the_update_platform() -> None:
+    """The platform is loaded into the running entry, not by a reload."""
+    hass, entry = _running_entry()
+    hass.config_entries.async_forward_entry_setups = AsyncMock()
+    entry.runtime_data.platforms = [Platform.SENSOR]
+    entry.options = {CONF_CHECK_FOR_UPDATES: True}
+
+    for _ in range(2):
+        asyncio.run(async_update_options(hass, entry))
+
+    hass.config_entries.async_forward_entry_setups.assert_awaited_once_with(
+        entry, [Platform.UPDATE]
+    )
+    assert entry.runtime_data.platforms == [Platform.SENSOR, Platform.UPDATE]
+    hass.config_entries.async_reload.assert_not_awaited()
+
+
+def test_opting_out_unloads_the_platform_and_removes_the_entity() -> None:
+    """Rather than leaving it behind as no longer provided."""
+    hass, entry = _running_entry()
+    hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+    entry.runtime_data.platforms = [Platform.SENSOR, Platform.UPDATE]
+    registry = MagicMock()
+    registry.async_get_entity_id.return_value = "update.audiobookshelf_server"
+
+    with patch.object(integration.er, "async_get", return_value=registry):
+        asyncio.run(async_update_options(hass, entry))
+
+    hass.config_entries.async_unload_platforms.assert_awaited_once_with(
+        entry, [Platform.UPDATE]
+    )
+    registry.async_remove.assert_called_once_with("update.audiobookshelf_server")
+    assert entry.runtime_data.platforms == [Platform.SENSOR]
+
+
+def _coordinator() -> AudiobookShelfDataUpdateCoordinator:
+    """Build a running coordinator with one library on its own schedule."""
+    coordinator = standalone_coordinator(URL, "api-key")
+    with patch.object(LibraryStatsCoordinator, "async_start"):
+        coordinator.async_attach_library(
+            SimpleNamespace(id_="lib-1", name="Books")  # type: ignore[arg-type]
+        )
+    return coordinator
+
+
+def test_options_are_applied_in_place() -> None:
+    """Each option reaches the part of the running entry that uses it."""
+    coordinator = _coordinator()
+    client = MagicMock()
+    coordinator._client = client  # noqa: SLF001
+    entry = _entry(
+        {CONF_SCAN_INTERVAL: 300},
+        {
+            CONF_SCAN_INTERVAL: 60,
+            CONF_HEDGE_REQUESTS: True,
+            CONF_MAX_REQUESTS_PER_SECOND: 2,
+        },
+    )
+
+    coordinator.async_apply_options(entry)
+
+    assert coordinator.update_interval == timedelta(seconds=60)
+    assert coordinator.freshness.max_age == timedelta(seconds=180)
+    assert coordinator.hedger.enabled is True
+    assert coordinator.limiter.rate == 2
+    # The library interval follows the main one until set on its own.
+    child = coordinator.library_coordinators["lib-1"]
+    assert child.update_interval == timedelta(seconds=60)
+    assert coordinator._client is client  # noqa: SLF001
+
+
+def test_turning_rotation_on_stops_libraries_polling_themselves() -> None:
+    """From then on the entry's poll decides when each library refreshes."""
+    coordinator = _coordinator()
+    two_hours_ago = dt_util.utcnow() - timedelta(hours=2)
+    coordinator.freshness.succeeded("library_stats:lib-1", two_hours_ago)
+    assert not coordinator.freshness.is_fresh("library_stats:lib-1")
+    entry = _entry({}, {CONF_LIBRARY_STATS_PER_POLL: 5})
+
+    coordinator.async_apply_options(entry)
+
+    child = coordinator.library_coordinators["lib-1"]
+    assert child.update_interval is None
+    # Stale is now measured against the maximum age rotation promises.
+    assert coordinator.freshness.is_fresh("library_stats:lib-1")
@@ -0,0 +1,168 @@
+"""Tests and a walk-time benchmark for adaptive, prefetching pagination."""
+
+import asyncio
+import time
+from contextlib import aclosing
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from custom_components.audiobookshelf.const import PAGINATION_ITEMS_PER_PAGE
+from custom_components.audiobookshelf.pagination import (
+    AdaptivePageSize,
+    async_iter_pages,
+)
+
+
+class _FakeServer:
+    """A paged endpoint whose latency grows with the page asked for."""
+
+    def __init__(
+        self, total: int, *, base_seconds: float = 0.0, per_item_seconds: float = 0.0
+    ) -> None:
+        """Serve total items with the given latency model."""
+        self.total = total
+        self.base_seconds = base_seconds
+        self.per_item_seconds = per_item_seconds
+        self.requests: list[tuple[int, int]] = []
+        self.completed = 0
+
+    async def fetch(self, page: int, limit: int) -> Any:
+        """Return one page after the modelled delay."""
+        self.requests.append((page, limit))
+        await asyncio.sleep(self.base_seconds + self.per_item_seconds * limit)
+        self.completed += 1
+        start = page * limit
+        return SimpleNamespace(
+            results=list(range(start, min(start + limit, self.total)))
+        )
+
+
+async def _collect(server: _FakeServer, page_size: AdaptivePageSize) -> list[int]:
+    """Walk every page and return the items in the order they arrived."""
+    items: list[int] = []
+    async for page in async_iter_pages(server.fetch, page_size):
+        items.extend(page.results)
+    return items
+
+
+def test_every_item_arrives_once_in_order_while_the_size_changes() -> None:
+    """Offsets must line up however the size moves between pages."""
+    server = _FakeServer(5_000)
+    page_size = AdaptivePageSize(initial=25, minimum=25, maximum=800)
+
+    items = asyncio.run(_collect(server, page_size))
+
+    assert items == list(range(5_000))
+    assert len({limit for _, limit in server.requests}) > 1
+
+
+def test_fast_pages_grow_the_size() -> None:
+    """A server answering well inside the target is given bigger pages."""
+    page_size = AdaptivePageSize(initial=100, minimum=25, maximum=1600)
+    page_size.record(0.01)
+    assert page_size.next_size(offset=200) == 200
+
+
+def test_slow_pages_shrink_the_size() -> None:
+    """A page over the target halves the next one."""
+    page_size = AdaptivePageSize(initial=100, minimum=25, maximum=1600)
+    page_size.record(page_size.target_seconds * 2)
+    assert page_size.next_size(offset=100) == 50
+
+
+def test_growth_waits_for_an_offset_it_divides() -> None:
+    """Page 1 at size 200 would skip items 100 to 199."""
+    page_size = AdaptivePageSize(initial=100, minimum=25, maximum=1600)
+    page_size.record(0.01)
+    assert page_size.next_size(offset=100) == 100
+    assert page_size.next_size(offset=200) == 200
+
+
+def test_size_stays_within_bounds() -> None:
+    """Neither a very fast nor a very slow server pushes it out of range."""
+    page_size = AdaptivePageSize(initial=100, minimum=25, maximum=200)
+    for _ in range(5):
+        page_size.record(0.0)
+        page_size.next_size(offset=0)
+    assert page_size.size == 200
+    for _ in range(5):
+        page_size.record(60.0)
+        page_size.next_size(offset=0)
+    assert page_size.size == 25
+
+
+def test_wants_more_stops_the_prefetch() -> None:
+    """A walk known to end on this page must not spend a request on the next."""
+    server = _FakeServer(1_000)
+
+    async def _walk() -> None:
+        async for _ in async_iter_pages(
+            server.fetch, AdaptivePageSize(initial=100), lambda _page: False
+        ):
+            pass
+
+    asyncio.run(_walk())
+
+    assert server.requests == [(0, 100)]
+
+
+def test_stopping_early_cancels_the_prefetch() -> None:
+    """A consumer that breaks off leaves no request running behind it."""
+    server = _FakeServer(1_000, base_seconds=0.05)
+
+    async def _walk() -> None:
+        async with aclosing(
+            async_iter_pages(server.fetch, AdaptivePageSize(initial=100))
+        ) as pages:
+            async for _ in pages:
+                break
+        await asyncio.sleep(0.1)
+
+    asyncio.run(_walk())
+
+    # Long enough for a prefetch left running to have finished.
+    assert server.completed == 1
+
+
+async def _fixed_walk(server: _FakeServer, process_seconds: float) -> None:
+    """Walk the way the client library does: fixed size, strictly in turn."""
+    page = 0
+    while True:
+        response = await server.fetch(page, PAGINATION_ITEMS_PER_PAGE)
+        await asyncio.sleep(process_seconds)
+        if len(response.results) < PAGINATION_ITEMS_PER_PAGE:
+            return
+        page += 1
+
+
+async def _adaptive_walk(server: _FakeServer, process_seconds: float) -> None:
+    """Walk with adaptive sizing and one page of prefetch."""
+    async for _ in async_iter_pages(server.fetch, AdaptivePageSize()):
+        await asyncio.sleep(process_seconds)
+
+
+@pytest.mark.parametrize("library_size", [1_000, 5_000, 20_000])
+def test_benchmark_walk_time(library_size: int) -> None:
+    """The adaptive walk has to beat the fixed one end to end at every size."""
+    # Scaled well down from a real server so the suite stays quick: a fixed
+    # per-request cost, a per-item cost, and some work per page on our side.
+    latency = {"base_seconds": 0.002, "per_item_seconds": 0.00001}
+    process_seconds = 0.001
+
+    timings = {}
+    for name, walk in (("fixed", _fixed_walk), ("adaptive", _adaptive_walk)):
+        server = _FakeServer(library_size, **latency)
+        started = time.perf_counter()
+        asyncio.run(walk(server, process_seconds))
+        timings[name] = (time.perf_counter() - started, len(server.requests))
+
+    # Shown with pytest -s.
+    print(  # noqa: T201
+        f"\n{library_size:>6} items:"
+        f" fixed {timings['fixed'][0]:.3f}s in {timings['fixed'][1]} requests,"
+        f" adaptive {timings['adaptive'][0]:.3f}s in {timings['adaptive'][1]}"
+    )
+    assert timings["adaptive"][0] < timings["fixed"][0]
+    assert timings["adaptive"][1] < timings["fixed"][1]
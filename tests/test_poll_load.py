@@ -0,0 +1,176 @@
+"""Tests for the repairs issue about a scan interval polls have outgrown."""
+
+import asyncio
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers import issue_registry as ir
+
+from custom_components.audiobookshelf.const import (
+    MIN_SCAN_INTERVAL,
+    POLL_LOAD_WINDOW,
+)
+from custom_components.audiobookshelf.poll_load import PollLoad, poll_load_issue_id
+from custom_components.audiobookshelf.repairs import (
+    ScanIntervalRepairFlow,
+    async_create_fix_flow,
+)
+from scripts.fake_abs import ADMIN_TOKEN, FakeAudiobookshelf
+
+from .benchmarking import close, standalone_coordinator
+
+
+def _load(*seconds: float) -> PollLoad:
+    """Build a record of polls taking seconds each."""
+    load = PollLoad()
+    for duration in seconds:
+        load.record(duration, 6)
+    return load
+
+
+def test_too_few_polls_are_not_judged() -> None:
+    """One slow poll after a restart raises nothing."""
+    assert not _load(*[200.0] * (POLL_LOAD_WINDOW - 1)).is_heavy(300)
+
+
+def test_heavy_once_half_the_polls_take_half_the_interval() -> None:
+    """Regularly, not only the odd poll."""
+    half = POLL_LOAD_WINDOW // 2
+    assert _load(*[150.0] * half, *[1.0] * half).is_heavy(300)
+    assert not _load(*[150.0] * (half - 1), *[1.0] * (half + 1)).is_heavy(300)
+
+
+def test_suggestion_fits_the_slowest_poll_in_whole_minimum_intervals() -> None:
+    """A poll of 40 s, at most a quarter of the interval, rounds up to 180 s."""
+    load = _load(*[20.0] * (POLL_LOAD_WINDOW - 1), 40.0)
+
+    assert load.suggested_interval() == 180
+    assert load.suggested_interval() % MIN_SCAN_INTERVAL == 0
+    assert load.typical().seconds == 20.0
+    assert load.typical().requests == 6
+
+
+def _coordinator(interval: int = 60) -> Any:
+    """Build a coordinator polling every interval seconds."""
+    return standalone_coordinator(
+        "http://abs.local", "token", options={CONF_SCAN_INTERVAL: interval}
+    )
+
+
+def _check(coordinator: Any, seconds: float) -> None:
+    """Record a full window of polls and check them."""
+    for _ in range(POLL_LOAD_WINDOW):
+        coordinator.poll_load.record(seconds, 6)
+    coordinator._async_check_poll_load()  # noqa: SLF001
+
+
+def test_issue_raised_once_and_cleared_when_polls_fit() -> None:
+    """The suggestion is not rewritten after every poll, and goes away."""
+    coordinator = _coordinator()
+
+    with (
+        patch.object(ir, "async_create_issue") as create,
+        patch.object(ir, "async_delete_issue") as delete,
+    ):
+        _check(coordinator, 45.0)
+        _check(coordinator, 45.0)
+        _check(coordinator, 1.0)
+
+    create.assert_called_once()
+    assert create.call_args.args[2] == poll_load_issue_id("entry-1")
+    assert create.call_args.kwargs["is_fixable"] is True
+    assert create.call_args.kwargs["data"] == {
+        "entry_id": "entry-1",
+        "scan_interval": 180,
+    }
+    assert create.call_args.kwargs["translation_placeholders"]["interval"] == "60"
+    delete.assert_called_once()
+
+
+def test_new_interval_is_judged_afresh() -> None:
+    """Polls timed against the old interval are forgotten with it."""
+    coordinator = _coordinator()
+    entry = MagicMock()
+    entry.options = {CONF_SCAN_INTERVAL: 180}
+    entry.data = {}
+
+    with patch.object(ir, "async_create_issue"):
+        _check(coordinator, 45.0)
+    with patch.object(coordinator, "async_reschedule"):
+        coordinator.async_apply_options(entry)
+
+    assert not coordinator.poll_load.is_full
+    with patch.object(ir, "async_delete_issue") as delete:
+        _check(coordinator, 45.0)
+    delete.assert_called_once()
+
+
+def _flow(entry: Any) -> tuple[ScanIntervalRepairFlow, MagicMock]:
+    """Build the fix flow for entry, suggesting 180 seconds, and its hass."""
+    flow = asyncio.run(
+        async_create_fix_flow(
+            MagicMock(), "issue", {"entry_id": "entry-1", "scan_interval": 180}
+        )
+    )
+    assert isinstance(flow, ScanIntervalRepairFlow)
+    hass = MagicMock()
+    hass.config_entries.async_get_entry.return_value = entry
+    flow.hass = hass
+    flow.issue_id = poll_load_issue_id("entry-1")
+    return flow, hass
+
+
+def test_fix_flow_applies_the_suggestion_to_the_options() -> None:
+    """Through the options, where the update listener picks it up."""
+    entry = MagicMock()
+    entry.options = {CONF_SCAN_INTERVAL: 60, "hedge_requests": True}
+    flow, hass = _flow(entry)
+
+    with patch.object(ir, "async_get"):
+        form = asyncio.run(flow.async_step_init())
+    done = asyncio.run(flow.async_step_confirm({}))
+
+    assert form["type"] is FlowResultType.FORM
+    assert done["type"] is FlowResultType.CREATE_ENTRY
+    hass.config_entries.async_update_entry.assert_called_once_with(
+        entry, options={CONF_SCAN_INTERVAL: 180, "hedge_requests": True}
+    )
+
+
+def test_fix_flow_aborts_for_a_removed_entry() -> None:
+    """Nothing is left to apply the suggestion to."""
+    flow, _ = _flow(None)
+
+    result = asyncio.run(flow.async_step_confirm({}))
+
+    assert result["type"] is FlowResultType.ABORT
+
+
+def test_only_the_polls_own_requests_are_counted() -> None:
+    """Actions sharing the session while it runs are not the poll's cost."""
+
+    async def _run() -> tuple[int, int]:
+        async with FakeAudiobookshelf(libraries=2, users=2, latency=0.01) as server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+            try:
+                client = await coordinator.get_client()
+                server.requests.clear()
+
+                async def _action() -> None:
+                    for _ in range(5):
+                        await client._get("api/authorize")  # noqa: SLF001
+
+                await asyncio.gather(
+                    coordinator._async_update_data(),  # noqa: SLF001
+                    _action(),
+                )
+            finally:
+                await close(coordinator)
+        polled = sum(server.requests.values()) - server.requests["api/authorize"]
+        return coordinator.poll_load.typical().requests, polled
+
+    counted, polled = asyncio.run(_run())
+
+    assert counted == polled
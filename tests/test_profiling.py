@@ -0,0 +1,151 @@
+"""Tests for the profile_poll action."""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.exceptions import (
+    ServiceValidationError,
+    Unauthorized,
+    UnknownUser,
+)
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.audiobookshelf.const import (
+    PROBE_DOWN_AFTER_FAILURES,
+    PROFILE_HOT_FUNCTIONS,
+)
+from custom_components.audiobookshelf.profiling import async_profile_poll
+from custom_components.audiobookshelf.services import (
+    SERVICE_PROFILE_POLL,
+    SERVICE_SEARCH,
+    async_check_admin,
+    async_setup_services,
+)
+from scripts.fake_abs import ADMIN_TOKEN, FakeAudiobookshelf
+
+from .benchmarking import close, standalone_coordinator
+
+
+def _hass(config_dir: Path) -> Any:
+    """Build a hass stub with a config directory and a working executor."""
+    loop = asyncio.get_running_loop()
+    hass = MagicMock()
+    hass.loop = loop
+    hass.config.path = lambda name: str(config_dir / name)
+    hass.async_add_executor_job = lambda target, *args: loop.run_in_executor(
+        None, target, *args
+    )
+    return hass
+
+
+def test_profile_poll_reports_steps_and_hot_functions(tmp_path: Path) -> None:
+    """One refresh is profiled, timed step by step and written out."""
+
+    async def _run() -> dict[str, Any]:
+        async with FakeAudiobookshelf(libraries=2, users=3, sessions=1) as server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+            coordinator.async_refresh = AsyncMock(  # type: ignore[method-assign]
+                side_effect=coordinator._async_update_data  # noqa: SLF001
+            )
+            coordinator.last_update_success = True
+            try:
+                return await async_profile_poll(_hass(tmp_path), coordinator)
+            finally:
+                await close(coordinator)
+
+    result = asyncio.run(_run())
+
+    assert Path(result["stats_file"]).parent == tmp_path
+    assert Path(result["stats_file"]).stat().st_size > 0
+    assert result["succeeded"] is True
+    assert result["error"] is None
+    assert set(result["steps"]) == {
+        "users",
+        "users online",
+        "user progress",
+        "open sessions",
+        "auth sessions",
+        "libraries",
+    }
+    assert result["seconds"] >= max(result["steps"].values())
+    assert 0 < len(result["hot_functions"]) <= PROFILE_HOT_FUNCTIONS
+    own = [function["own_seconds"] for function in result["hot_functions"]]
+    assert own == sorted(own, reverse=True)
+
+
+def test_profile_poll_leaves_out_a_poll_it_did_not_run(tmp_path: Path) -> None:
+    """A refresh stopped before polling reports no steps, not the last poll's."""
+
+    async def _run() -> dict[str, Any]:
+        async with FakeAudiobookshelf() as server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+
+            async def _refresh() -> None:
+                try:
+                    await coordinator._async_update_data()  # noqa: SLF001
+                except UpdateFailed as err:
+                    coordinator.last_update_success = False
+                    coordinator.last_exception = err
+
+            coordinator.async_refresh = _refresh  # type: ignore[method-assign]
+            try:
+                await coordinator._async_update_data()  # noqa: SLF001
+                coordinator.probe.failures = PROBE_DOWN_AFTER_FAILURES
+                return await async_profile_poll(_hass(tmp_path), coordinator)
+            finally:
+                await close(coordinator)
+
+    result = asyncio.run(_run())
+
+    assert result["succeeded"] is False
+    assert "not answering" in result["error"]
+    assert result["steps"] == {}
+
+
+def _call(user_id: str | None) -> Any:
+    """Build a service call made by user_id."""
+    return SimpleNamespace(data={}, context=SimpleNamespace(user_id=user_id))
+
+
+def _hass_with_user(user: Any) -> Any:
+    """Build a hass stub whose only user is user."""
+    hass = MagicMock()
+    hass.auth.async_get_user = AsyncMock(return_value=user)
+    return hass
+
+
+def test_admin_may_profile() -> None:
+    """An admin, or an automation with no user, gets through."""
+    asyncio.run(async_check_admin(_hass_with_user(None), _call(None)))
+    admin = SimpleNamespace(is_admin=True)
+    asyncio.run(async_check_admin(_hass_with_user(admin), _call("admin")))
+
+
+def test_non_admin_may_not_profile() -> None:
+    """A profile shows the whole installation's internals."""
+    user = SimpleNamespace(is_admin=False)
+
+    with pytest.raises(Unauthorized):
+        asyncio.run(async_check_admin(_hass_with_user(user), _call("user")))
+    with pytest.raises(UnknownUser):
+        asyncio.run(async_check_admin(_hass_with_user(None), _call("gone")))
+
+
+def test_non_admin_is_refused_before_the_server_is_looked_up() -> None:
+    """A user who may not profile is told so, not which servers are set up."""
+    hass = _hass_with_user(SimpleNamespace(is_admin=False))
+    hass.config_entries.async_entries.return_value = []
+    async_setup_services(hass)
+    handlers = {
+        registration.args[1]: registration.args[2]
+        for registration in hass.services.async_register.call_args_list
+    }
+
+    with pytest.raises(Unauthorized):
+        asyncio.run(handlers[SERVICE_PROFILE_POLL](_call("user")))
+    with pytest.raises(ServiceValidationError):
+        asyncio.run(handlers[SERVICE_SEARCH](_call("user")))
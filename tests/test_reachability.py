@@ -0,0 +1,106 @@
+"""Tests for the reachability probe and the polls it pauses."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiohttp import ClientConnectionError
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
+    AudiobookShelfDataUpdateCoordinator,
+    LibraryStatsCoordinator,
+)
+from custom_components.audiobookshelf.reachability import ReachabilityProbe
+from scripts.fake_abs import ADMIN_TOKEN, FakeAudiobookshelf
+
+from .benchmarking import close, standalone_coordinator, stub_hass
+
+URL = "http://abs.local:13378"
+
+
+def _probed(*round_trips: float | Exception) -> AudiobookShelfDataUpdateCoordinator:
+    """Build a coordinator whose pings take round_trips in turn, or fail."""
+    hass = stub_hass()
+    hass.async_create_task = asyncio.ensure_future
+    coordinator = standalone_coordinator(URL, ADMIN_TOKEN, hass=hass)
+    coordinator.probe._async_ping = AsyncMock(  # type: ignore[method-assign]  # noqa: SLF001
+        side_effect=list(round_trips)
+    )
+    return coordinator
+
+
+async def _pings(probe: ReachabilityProbe, count: int) -> None:
+    """Run count of the probe's updates."""
+    for _ in range(count):
+        probe.async_set_updated_data(await probe._async_update_data())  # noqa: SLF001
+
+
+def test_ping_reaches_the_server_without_a_token() -> None:
+    """One small request, answered before any client is built."""
+
+    async def _run() -> dict[str, Any]:
+        async with FakeAudiobookshelf() as server:
+            coordinator = standalone_coordinator(server.url, "not-a-token")
+            try:
+                data = await coordinator.probe._async_update_data()  # noqa: SLF001
+            finally:
+                await close(coordinator)
+            assert dict(server.requests) == {"ping": 1}
+            return data
+
+    data = asyncio.run(_run())
+
+    assert data["server_reachable"] is True
+    assert data["server_latency"] > 0
+
+
+def test_latency_is_smoothed() -> None:
+    """One slow answer moves the figure a fifth of the way, not all of it."""
+    coordinator = _probed(10.0, 110.0)
+
+    asyncio.run(_pings(coordinator.probe, 2))
+
+    assert coordinator.probe.data["server_latency"] == pytest.approx(30.0)
+
+
+def test_one_lost_ping_does_not_pause_polling() -> None:
+    """Only misses in a row say the server is down."""
+    coordinator = _probed(10.0, ClientConnectionError(), 10.0)
+
+    async def _run() -> None:
+        await _pings(coordinator.probe, 2)
+        assert coordinator.probe.data["server_reachable"] is True
+        assert not coordinator.probe.server_down
+
+    asyncio.run(_run())
+
+
+def test_polls_are_skipped_while_the_server_is_down() -> None:
+    """No request is sent, and the poll catches up once the server is back."""
+    coordinator = _probed(ClientConnectionError(), TimeoutError(), 10.0)
+    get_client = AsyncMock()
+    coordinator.get_client = get_client  # type: ignore[method-assign]
+    with patch.object(LibraryStatsCoordinator, "async_start"):
+        child = coordinator.async_attach_library(MagicMock(id_="lib-1"))
+    child.data = {"library_stats": {"lib-1": "last"}}
+
+    async def _run() -> None:
+        await _pings(coordinator.probe, 2)
+        assert coordinator.probe.data == {
+            "server_reachable": False,
+            "server_latency": None,
+        }
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()  # noqa: SLF001
+        assert await child._async_update_data() == child.data  # noqa: SLF001
+        get_client.assert_not_called()
+
+        await _pings(coordinator.probe, 1)
+        await asyncio.sleep(0)
+
+    asyncio.run(_run())
+
+    assert coordinator.probe.data["server_reachable"] is True
+    coordinator.async_request_refresh.assert_called_once()  # type: ignore[attr-defined]
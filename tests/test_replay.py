@@ -0,0 +1,287 @@
+"""Tests against recorded, anonymised responses of a real server's shape."""
+
+import asyncio
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
+    AllUsersResponse,
+    AudiobookShelfDataUpdateCoordinator,
+    LibraryStats,
+    OpenSessionsResponse,
+    UsersOnlineResponse,
+    UserWithProgress,
+)
+from custom_components.audiobookshelf.services import (
+    SERVICE_ATTRIBUTE_SERIES_NAME,
+    SERVICE_REMOVE_PROGRESS,
+)
+from scripts.fake_abs import ADMIN_TOKEN, FakeAudiobookshelf
+
+from .benchmarking import (
+    Measurement,
+    attach_libraries,
+    check_baseline,
+    measure,
+    service_handlers,
+    standalone_coordinator,
+    summary,
+)
+from .replay import (
+    ENDPOINTS,
+    KEPT_KEYS,
+    RECORDINGS,
+    SECRET_KEYS,
+    Anonymiser,
+    Recording,
+    ReplaySession,
+    async_record,
+)
+
+URL = "http://abs.local:13378"
+MULTIPLIERS = [1, 10, 50]
+RUNS = 5
+# Every value the server may send under each enumeration or discriminator
+# key, so one replaced by a hash is caught rather than decoded as garbage.
+ENUMS = {
+    "mediaItemType": {"book", "podcastEpisode"},
+    "mediaType": {"book", "podcast"},
+    "type": {"root", "admin", "user", "guest", "episodic", "serial"},
+    "authActiveAuthMethods": {"local", "openid"},
+    "metadataPrecedence": {
+        "folderStructure",
+        "audioMetatags",
+        "nfoFile",
+        "txtFiles",
+        "opfFile",
+        "absMetadata",
+    },
+    "dateFormat": {
+        "MM/dd/yyyy",
+        "dd/MM/yyyy",
+        "dd.MM.yyyy",
+        "yyyy-MM-dd",
+        "MMM do, yyyy",
+        "MMMM do, yyyy",
+        "dd MMM yyyy",
+        "dd MMMM yyyy",
+    },
+    "timeFormat": {"HH:mm", "h:mma"},
+    "metadataFileFormat": {"abs", "json"},
+    "deviceType": {"desktop", "mobile", "tablet"},
+}
+
+
+def _recorded(name: str) -> Any:
+    """Return one recorded response body."""
+    return json.loads((RECORDINGS / name).read_text())
+
+
+def _walk(value: Any, key: str | None = None) -> Iterator[tuple[str | None, Any]]:
+    """Yield every value in a body with the key it is under."""
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _walk(v, k)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _walk(v, key)
+    else:
+        yield key, value
+
+
+def _replaying(recording: Recording) -> AudiobookShelfDataUpdateCoordinator:
+    """Build a coordinator whose every request is answered from recording."""
+    coordinator = standalone_coordinator(URL, ADMIN_TOKEN)
+    coordinator._session = ReplaySession(recording)  # type: ignore[assignment]  # noqa: SLF001
+    return coordinator
+
+
+async def _poll(coordinator: AudiobookShelfDataUpdateCoordinator) -> dict[str, Any]:
+    """Run one poll of the coordinator."""
+    return await coordinator._async_update_data()  # noqa: SLF001
+
+
+def test_anonymiser_keeps_lengths_and_links() -> None:
+    """Payload sizes and ids referring to each other survive anonymising."""
+    anonymiser = Anonymiser(b"key")
+    body = anonymiser.body(
+        {
+            "id": "lib-1",
+            "libraryId": "lib-1",
+            "username": "alice",
+            "token": "secret",
+            "mediaType": "book",
+            "duration": 12.5,
+        }
+    )
+
+    assert body["id"] == body["libraryId"] != "lib-1"
+    assert len(body["username"]) == len("alice")
+    assert body["username"] != "alice"
+    assert body["token"] is None
+    assert body["mediaType"] == "book"
+    assert body["duration"] == 12.5
+    assert Anonymiser(b"other").text("alice") != body["username"]
+
+
+def test_recordings_hold_no_secrets() -> None:
+    """A recording committed by mistake with a credential in it fails here."""
+    for file in RECORDINGS.glob("*.json"):
+        for key, value in _walk(json.loads(file.read_text())):
+            assert key not in SECRET_KEYS or value is None, f"{key} in {file.name}"
+
+
+def test_recordings_keep_their_enumerations() -> None:
+    """An enumeration hashed by the anonymiser fails here, not in a replay."""
+    assert ENUMS.keys() <= KEPT_KEYS
+    seen: set[str] = set()
+    for file in RECORDINGS.glob("*.json"):
+        for key, value in _walk(json.loads(file.read_text())):
+            if key in ENUMS and value is not None:
+                assert value in ENUMS[key], f"{key}: {value!r} in {file.name}"
+                seen.add(key)
+    # Guards the check itself: a key renamed away would otherwise pass.
+    assert {"mediaItemType", "mediaType", "type"} <= seen
+
+
+def test_poll_decodes_the_recorded_payloads() -> None:
+    """Every step of a poll parses what a real server sends."""
+    recording = Recording.load()
+    libraries = _recorded("api__libraries.json")["libraries"]
+
+    async def _run() -> dict[str, Any]:
+        coordinator = _replaying(recording)
+        await attach_libraries(coordinator)
+        data = await _poll(coordinator)
+        for library in libraries:
+            child = coordinator.library_coordinators[library["id"]]
+            assert child.data["library_stats"][library["id"]].total_items > 0
+        return data
+
+    data = asyncio.run(_run())
+
+    users = _recorded("api__users.json")["users"]
+    assert data["count_users"] == len(users)
+    assert set(data["user_activity"]) == {user["id"] for user in users}
+    activity = data["user_activity"][users[0]["id"]]
+    progress = _recorded(f"api__users__{users[0]['id']}.json")["mediaProgress"]
+    assert activity.books_in_progress + activity.books_finished == sum(
+        1 for entry in progress if not entry.get("episodeId")
+    )
+    sessions = _recorded("api__sessions__open.json")["sessions"]
+    assert data["count_open_sessions"] == len(sessions)
+    for grouping in ("user", "device", "library"):
+        groups = data[f"listening_by_{grouping}"].values()
+        assert sum(group.sessions for group in groups) == len(sessions)
+    assert data["count_auth_sessions"] == _recorded("api__me__sessions.json")["total"]
+    assert data["count_libraries"] == len(libraries)
+
+
+def test_multiplier_scales_the_server_up() -> None:
+    """Ten times the users and sessions, each with an id of its own."""
+    recording = Recording.load(multiplier=10)
+
+    data = asyncio.run(_poll(_replaying(recording)))
+
+    assert data["count_users"] == 10 * len(_recorded("api__users.json")["users"])
+    # Every copy's progress is its original's record.
+    assert all(
+        activity.books_finished is not None
+        for activity in data["user_activity"].values()
+    )
+    assert data["count_open_sessions"] == 10 * len(
+        _recorded("api__sessions__open.json")["sessions"]
+    )
+
+
+def test_remove_my_progress_walks_the_recorded_catalog() -> None:
+    """The catalog is built from the recorded items pages of every library."""
+    coordinator = _replaying(Recording.load())
+    handler = service_handlers(coordinator)[SERVICE_REMOVE_PROGRESS]
+    recorded = sum(
+        len(json.loads(file.read_text())["results"])
+        for file in RECORDINGS.glob("api__libraries__*__items.json")
+    )
+
+    asyncio.run(handler(SimpleNamespace(data={SERVICE_ATTRIBUTE_SERIES_NAME: "0"})))
+
+    assert len(coordinator.catalog) == recorded
+
+
+def test_recorder_writes_what_replay_reads(tmp_path: Path) -> None:
+    """A recording of a server replays as that server, minus its secrets."""
+
+    async def _record() -> list[Path]:
+        server = FakeAudiobookshelf(
+            libraries=2, items_per_library=5, users=3, sessions=1
+        )
+        # Behind a reverse proxy, which answers nothing outside its path.
+        server.base_path = "/abs"
+        async with server:
+            return await async_record(server.url, ADMIN_TOKEN, tmp_path)
+
+    written = asyncio.run(_record())
+
+    assert len(written) == 1 + len(ENDPOINTS) + 3 + 2 * 2
+    authorize = json.loads((tmp_path / "api__authorize.json").read_text())
+    assert authorize["user"]["token"] is None
+    assert authorize["user"]["username"] != "listener0"
+    data = asyncio.run(_poll(_replaying(Recording.load(tmp_path))))
+    assert data["count_users"] == 3
+    assert len(data["user_activity"]) == 3
+    assert data["count_libraries"] == 2
+
+
+def _decode(recording: Recording) -> None:
+    """Parse each recorded poll response with the model a poll uses."""
+    bodies = recording.bodies
+    AllUsersResponse.from_json(bodies["api/users"])
+    UsersOnlineResponse.from_json(bodies["api/users/online"])
+    OpenSessionsResponse.from_json(bodies["api/sessions/open"])
+    for path, body in bodies.items():
+        if path.endswith("/stats"):
+            LibraryStats.from_json(body)
+        elif path.startswith("api/users/") and path != "api/users/online":
+            # Once for each copy of the user a scaled-up server has.
+            for _ in range(recording.multiplier):
+                UserWithProgress.from_json(body)
+
+
+@pytest.mark.parametrize("multiplier", MULTIPLIERS, ids=lambda m: f"x{m}")
+def test_decode_cost(multiplier: int) -> None:
+    """Parsing alone, on production-shaped payloads."""
+    recording = Recording.load(multiplier=multiplier)
+
+    async def _run() -> list[Measurement]:
+        async def _once() -> None:
+            _decode(recording)
+
+        return [await measure(_once) for _ in range(RUNS)]
+
+    runs = asyncio.run(_run())
+
+    check_baseline(f"replay_decode[x{multiplier}]", summary(runs))
+
+
+@pytest.mark.parametrize("multiplier", MULTIPLIERS, ids=lambda m: f"x{m}")
+def test_poll_cost(multiplier: int) -> None:
+    """A whole poll with no network in it, on production-shaped payloads."""
+    recording = Recording.load(multiplier=multiplier)
+
+    async def _run() -> list[Measurement]:
+        coordinator = _replaying(recording)
+        await attach_libraries(coordinator)
+        await _poll(coordinator)
+        return [
+            await measure(coordinator._async_update_data)  # noqa: SLF001
+            for _ in range(RUNS)
+        ]
+
+    runs = asyncio.run(_run())
+
+    check_baseline(f"replay_poll[x{multiplier}]", summary(runs))
@@ -0,0 +1,256 @@
+"""Tests for the per-entry cache of slow-changing responses."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aioaudiobookshelf.exceptions import NotFoundError
+from aiohttp import ClientError
+
+from custom_components.audiobookshelf import (
+    audiobook_shelf_data_update_coordinator as coordinator_module,
+)
+from custom_components.audiobookshelf import cache
+from custom_components.audiobookshelf.cache import ResponseCache
+from custom_components.audiobookshelf.const import (
+    LIBRARIES_ENDPOINT,
+    SERVER_SETTINGS_ENDPOINT,
+)
+from custom_components.audiobookshelf.services import (
+    SERVICE_ATTRIBUTE_SERIES_NAME,
+    SERVICE_REMOVE_PROGRESS,
+)
+from scripts.fake_abs import ADMIN_TOKEN, FakeAudiobookshelf
+
+from .benchmarking import (
+    attach_libraries,
+    close,
+    service_handlers,
+    standalone_coordinator,
+)
+
+TTLS = {"slow": 600, "fast": 10}
+
+
+def test_each_endpoint_expires_on_its_own_time() -> None:
+    """A response is served until its endpoint's time runs out."""
+    responses = ResponseCache(TTLS, max_entries=8)
+    with patch.object(cache.time, "monotonic", return_value=1000):
+        responses.set("slow", ["a"])
+        responses.set("fast", ["b"])
+    with patch.object(cache.time, "monotonic", return_value=1100):
+        assert responses.get("slow") == ["a"]
+        assert responses.get("fast") is None
+
+    assert responses.as_dict()["endpoints"] == {
+        "slow": {"ttl": 600, "hits": 1, "misses": 0},
+        "fast": {"ttl": 10, "hits": 0, "misses": 1},
+    }
+
+
+def test_least_recently_used_goes_first_across_endpoints() -> None:
+    """One bound for the whole entry, however the entries are spread."""
+    responses = ResponseCache(TTLS, max_entries=2)
+    responses.set("slow", "libraries")
+    responses.set("fast", "first", key="a")
+    responses.get("slow")
+    responses.set("fast", "second", key="b")
+
+    assert len(responses) == 2
+    assert responses.get("slow") == "libraries"
+    assert responses.get("fast", "a") is None
+    assert responses.get("fast", "b") == "second"
+
+
+def test_invalidate_drops_every_key_of_an_endpoint() -> None:
+    """Only the endpoints named are dropped."""
+    responses = ResponseCache(TTLS, max_entries=8)
+    responses.set("fast", 1, key="a")
+    responses.set("fast", 2, key="b")
+    responses.set("slow", 3)
+
+    responses.invalidate("fast")
+
+    assert responses.get("fast", "a") is None
+    assert responses.get("fast", "b") is None
+    assert responses.get("slow") == 3
+
+
+def test_async_get_fetches_once_while_fresh() -> None:
+    """The second caller is answered without fetching."""
+    responses = ResponseCache(TTLS, max_entries=8)
+    fetch = AsyncMock(return_value=["library"])
+
+    async def _run() -> None:
+        assert await responses.async_get("slow", fetch) == ["library"]
+        assert await responses.async_get("slow", fetch) == ["library"]
+
+    asyncio.run(_run())
+
+    assert fetch.await_count == 1
+
+
+def test_actions_reuse_the_library_list_a_poll_fetched() -> None:
+    """Every poll asks for the library list, and remove_my_progress reuses it."""
+
+    async def _run() -> FakeAudiobookshelf:
+        async with FakeAudiobookshelf(libraries=2, items_per_library=5) as server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+            handler = service_handlers(coordinator)[SERVICE_REMOVE_PROGRESS]
+            call = SimpleNamespace(data={SERVICE_ATTRIBUTE_SERIES_NAME: "Series 3"})
+            try:
+                await attach_libraries(coordinator)
+                await coordinator._async_update_data()  # noqa: SLF001
+                await coordinator._async_update_data()  # noqa: SLF001
+                await handler(call)
+            finally:
+                await close(coordinator)
+        return server
+
+    server = asyncio.run(_run())
+
+    # Once to attach the libraries and once for each poll.
+    assert server.requests[LIBRARIES_ENDPOINT] == 3
+
+
+def test_polls_pick_up_a_new_library_while_the_list_is_cached() -> None:
+    """A library created on the server shows up at the next poll."""
+
+    async def _run() -> tuple[list[str], list[str]]:
+        async with FakeAudiobookshelf(libraries=1) as server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+            try:
+                await coordinator._async_update_data()  # noqa: SLF001
+                server.libraries.append({**server.libraries[0], "id": "lib-new"})
+                await coordinator._async_update_data()  # noqa: SLF001
+            finally:
+                await close(coordinator)
+        cached = coordinator.response_cache.get(LIBRARIES_ENDPOINT)
+        return (
+            [library.id_ for library in coordinator.libraries],
+            [library.id_ for library in cached],
+        )
+
+    polled, cached = asyncio.run(_run())
+
+    assert polled[-1] == "lib-new"
+    # Written back, so actions and searches see it too.
+    assert cached == polled
+
+
+def test_progress_is_only_asked_again_of_users_who_listen() -> None:
+    """A user's record is fetched while they listen, and now and then otherwise."""
+    finished = {"libraryItemId": "lib-0-item-0", "isFinished": True, "lastUpdate": 1}
+
+    async def _run() -> tuple[list[int], int | None]:
+        async with FakeAudiobookshelf(users=4, sessions=1) as server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+            fetched = []
+
+            async def _poll() -> dict[str, Any]:
+                data = await coordinator._async_update_data()  # noqa: SLF001
+                fetched.append(server.requests["api/users/{id}"])
+                return data
+
+            try:
+                await _poll()
+                # user-0 has the one open session.
+                server.users[0]["mediaProgress"] = [finished]
+                data = await _poll()
+                server.sessions.clear()
+                await _poll()
+                await _poll()
+                with patch.object(coordinator_module, "USER_PROGRESS_MAX_AGE", 0):
+                    await _poll()
+            finally:
+                await close(coordinator)
+        return fetched, data["user_activity"]["user-0"].books_finished
+
+    fetched, books_finished = asyncio.run(_run())
+
+    # Everyone at first, then the listener, then once more after they stop,
+    # then nobody until their progress is due again.
+    assert fetched == [4, 5, 6, 6, 10]
+    assert books_finished == 1
+
+
+def test_a_failed_progress_fetch_waits_for_the_others() -> None:
+    """The step fails once every fetch is done, and the failed user keeps theirs."""
+
+    async def _run() -> tuple[list[str], bool, bool]:
+        async with FakeAudiobookshelf(users=3) as server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+            fetch = coordinator.user_with_progress
+            finished = []
+
+            async def _slow_or_failing(user_id: str) -> Any:
+                if user_id == "user-0":
+                    raise NotFoundError  # Deleted: not a failure.
+                if user_id == "user-1":
+                    msg = "boom"
+                    raise ClientError(msg)
+                await asyncio.sleep(0.05)
+                finished.append(user_id)
+                return await fetch(user_id)
+
+            try:
+                await coordinator._async_update_data()  # noqa: SLF001
+                before = coordinator._user_progress["user-1"]  # noqa: SLF001
+                with (
+                    patch.object(coordinator_module, "USER_PROGRESS_MAX_AGE", 0),
+                    patch.object(coordinator, "user_with_progress", _slow_or_failing),
+                ):
+                    await coordinator._async_update_data()  # noqa: SLF001
+                kept = coordinator._user_progress["user-1"] is before  # noqa: SLF001
+            finally:
+                await close(coordinator)
+        return finished, kept, coordinator.freshness.is_stale("user_activity")
+
+    finished, kept, stale = asyncio.run(_run())
+
+    assert finished == ["user-2"]
+    assert kept
+    assert stale
+
+
+def test_server_version_is_not_reread_while_fresh() -> None:
+    """The update entity's first check after setup reuses the client's build."""
+
+    async def _run() -> FakeAudiobookshelf:
+        async with FakeAudiobookshelf() as server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+            try:
+                await coordinator.get_client()
+                assert await coordinator.async_refresh_server_version() == "2.36.0"
+                coordinator.response_cache.invalidate(SERVER_SETTINGS_ENDPOINT)
+                await coordinator.async_refresh_server_version()
+            finally:
+                await close(coordinator)
+        return server
+
+    server = asyncio.run(_run())
+
+    assert server.requests[SERVER_SETTINGS_ENDPOINT] == 2
+
+
+def test_a_library_gone_from_the_server_drops_the_list() -> None:
+    """The next poll fetches the list again, rather than the deleted library."""
+
+    async def _run() -> None:
+        async with FakeAudiobookshelf(libraries=2) as server:
+            coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+            try:
+                library = (await coordinator.get_libraries())[0]
+                server.libraries.pop(0)
+                del server.items[library.id_]
+                with pytest.raises(NotFoundError):
+                    await coordinator.library_stats(library)
+                assert coordinator.response_cache.get(LIBRARIES_ENDPOINT) is None
+                libraries = await coordinator.get_libraries()
+            finally:
+                await close(coordinator)
+        assert [library.id_ for library in libraries] == [server.libraries[0]["id"]]
+
+    asyncio.run(_run())
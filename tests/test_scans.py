@@ -0,0 +1,249 @@
+"""Tests for following library scans through socket events and /api/tasks."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from types import SimpleNamespace
+from typing import Any, cast
+from unittest.mock import MagicMock, patch
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.audiobookshelf import scans as scans_module
+from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
+    AudiobookShelfDataUpdateCoordinator,
+)
+from custom_components.audiobookshelf.const import LIBRARIES_ENDPOINT, SEARCH_ENDPOINT
+from custom_components.audiobookshelf.scans import socketio_path_for
+from custom_components.audiobookshelf.services import (
+    SERVICE_ATTRIBUTE_FORCE,
+    SERVICE_ATTRIBUTE_LIBRARY,
+    SERVICE_ATTRIBUTE_TIMEOUT,
+    SERVICE_ATTRIBUTE_WAIT,
+    SERVICE_SCAN_LIBRARY,
+)
+from scripts.fake_abs import ADMIN_TOKEN, FakeAudiobookshelf
+
+from .benchmarking import (
+    close,
+    service_handlers,
+    standalone_coordinator,
+    stub_hass,
+)
+
+
+def _server(
+    *, libraries: int = 1, socket: bool, scan_seconds: float
+) -> FakeAudiobookshelf:
+    """Build a fake server whose scans take scan_seconds."""
+    server = FakeAudiobookshelf(libraries=libraries, items_per_library=3)
+    server.serve_socket = socket
+    server.scan_seconds = scan_seconds
+    return server
+
+
+def _following(server: FakeAudiobookshelf) -> AudiobookShelfDataUpdateCoordinator:
+    """Build a coordinator for server, with scans followed on the running loop."""
+    hass = stub_hass()
+    hass.async_create_task = asyncio.ensure_future
+    coordinator = standalone_coordinator(server.url, ADMIN_TOKEN, hass=hass)
+    entry = cast("MagicMock", coordinator.config_entry)
+    entry.async_create_background_task = (
+        lambda _hass, coro, name: asyncio.ensure_future(coro)  # noqa: ARG005
+    )
+    return coordinator
+
+
+def _scan_call(library: str, **data: Any) -> Any:
+    """Build a scan_library call made by Home Assistant itself."""
+    return SimpleNamespace(
+        data={
+            SERVICE_ATTRIBUTE_LIBRARY: library,
+            SERVICE_ATTRIBUTE_FORCE: False,
+            SERVICE_ATTRIBUTE_WAIT: True,
+            SERVICE_ATTRIBUTE_TIMEOUT: 5,
+            **data,
+        },
+        context=SimpleNamespace(user_id=None),
+    )
+
+
+async def _until(condition: Callable[[], bool]) -> None:
+    """Wait for condition to hold, for a second at most."""
+    # Polled: what it waits on happens in the server or the socket client,
+    # neither of which has an event to wait on.
+    async with asyncio.timeout(1):
+        while not condition():  # noqa: ASYNC110
+            await asyncio.sleep(0.01)
+
+
+async def _with_scans(
+    server: FakeAudiobookshelf,
+    run: Callable[[AudiobookShelfDataUpdateCoordinator], Awaitable[Any]],
+) -> Any:
+    """Run against server with scans followed, shutting everything down after."""
+    async with server:
+        coordinator = _following(server)
+        try:
+            await coordinator.scans.async_refresh()
+            return await run(coordinator)
+        finally:
+            await coordinator.scans.async_shutdown()
+            await close(coordinator)
+
+
+def test_scan_is_followed_through_socket_events() -> None:
+    """Started, counted and finished with no polling of /api/tasks."""
+    server = _server(socket=True, scan_seconds=0.1)
+
+    async def _run(coordinator: AudiobookShelfDataUpdateCoordinator) -> Any:
+        await _until(lambda: bool(server.signed_in))
+        handler = service_handlers(coordinator)[SERVICE_SCAN_LIBRARY]
+        await coordinator.get_libraries()
+        coordinator.response_cache.set(SEARCH_ENDPOINT, {}, ("lib-0", "dune", 10))
+        result = await handler(_scan_call("Library 0"))
+        assert coordinator.response_cache.get(LIBRARIES_ENDPOINT) is None
+        assert (
+            coordinator.response_cache.get(SEARCH_ENDPOINT, ("lib-0", "dune", 10))
+            is None
+        )
+        return result
+
+    result = asyncio.run(_with_scans(server, _run))
+
+    assert server.scans_requested == ["lib-0"]
+    assert result["library_id"] == "lib-0"
+    assert result["finished"] is True
+    assert result["items_changed"] == 3
+    assert result["last_scan"] is not None
+    # Only the catch-up poll at setup: the events said everything else.
+    assert server.requests["api/tasks"] == 1
+
+
+def test_socket_is_found_under_the_servers_path() -> None:
+    """A server behind a reverse proxy at a subpath still has its socket used."""
+    server = _server(socket=True, scan_seconds=0)
+    server.base_path = "/abs"
+
+    async def _run(_coordinator: AudiobookShelfDataUpdateCoordinator) -> None:
+        await _until(lambda: bool(server.signed_in))
+
+    asyncio.run(_with_scans(server, _run))
+
+    assert socketio_path_for("https://abs.local") == "socket.io"
+    assert socketio_path_for("https://host/abs/") == "abs/socket.io"
+
+
+def test_scan_is_followed_by_polling_without_a_socket() -> None:
+    """A server whose socket cannot be reached still has its scans followed."""
+    server = _server(socket=False, scan_seconds=0.05)
+
+    async def _run(coordinator: AudiobookShelfDataUpdateCoordinator) -> Any:
+        handler = service_handlers(coordinator)[SERVICE_SCAN_LIBRARY]
+        with patch.object(scans_module, "SCAN_WAIT_POLL_SECONDS", 0.02):
+            result = await handler(_scan_call("lib-0"))
+        assert not coordinator.scans.socket_connected
+        return result
+
+    result = asyncio.run(_with_scans(server, _run))
+
+    assert result["finished"] is True
+    assert result["last_scan"] is not None
+    assert server.requests["api/tasks"] > 1
+
+
+def test_wait_gives_up_at_its_timeout() -> None:
+    """The action returns while the scan carries on without it."""
+    server = _server(socket=False, scan_seconds=5)
+
+    async def _run(coordinator: AudiobookShelfDataUpdateCoordinator) -> Any:
+        handler = service_handlers(coordinator)[SERVICE_SCAN_LIBRARY]
+        with patch.object(scans_module, "SCAN_WAIT_POLL_SECONDS", 0.02):
+            result = await handler(_scan_call("lib-0", timeout=0.1))
+        assert coordinator.scans.scan_for("lib-0").scanning
+        return result
+
+    result = asyncio.run(_with_scans(server, _run))
+
+    assert result["finished"] is False
+
+
+def test_poll_catches_a_missed_scan() -> None:
+    """A scan that started and finished between events still shows up."""
+    server = _server(libraries=2, socket=False, scan_seconds=5)
+
+    async def _run(coordinator: AudiobookShelfDataUpdateCoordinator) -> Any:
+        scans = coordinator.scans
+        # One the server is running, and one it finished unseen.
+        server.tasks.append(
+            {
+                "id": "scan-1",
+                "action": "library-scan",
+                "data": {"libraryId": "lib-0"},
+                "isFinished": False,
+            }
+        )
+        scans.scan_for("lib-1").scanning = True
+        await scans.async_refresh()
+        return scans.scans
+
+    found = asyncio.run(_with_scans(server, _run))
+
+    assert found["lib-0"].state == "scanning"
+    assert found["lib-1"].state == "idle"
+    assert found["lib-1"].last_scan is not None
+
+
+def test_items_are_counted_only_for_a_running_scan() -> None:
+    """Items a user adds by hand between scans are not scan progress."""
+    scans = standalone_coordinator("http://abs.local:13378", ADMIN_TOKEN).scans
+    items = [{"id": "a", "libraryId": "lib-0"}, {"id": "b", "libraryId": "lib-1"}]
+
+    async def _run() -> None:
+        await scans._on_items(items)  # noqa: SLF001
+        scans.async_scan_requested("lib-0")
+        await scans._on_items(items)  # noqa: SLF001
+        await scans._on_task(  # noqa: SLF001
+            {
+                "id": "scan-1",
+                "action": "library-scan",
+                "data": {"libraryId": "lib-0"},
+                "isFinished": True,
+                "isFailed": True,
+                "error": "No folders",
+                "finishedAt": 1_700_000_000_000,
+            }
+        )
+
+    asyncio.run(_run())
+
+    scan = scans.scan_for("lib-0")
+    assert scan.items_changed == 1
+    assert scan.error == "No folders"
+    assert scan.last_scan is not None
+    assert scan.last_scan.year == 2023
+    assert "lib-1" not in scans.scans
+
+
+def test_task_event_that_does_not_parse_is_dropped() -> None:
+    """An event from a newer server with another shape changes nothing."""
+    scans = standalone_coordinator("http://abs.local:13378", ADMIN_TOKEN).scans
+    scans.async_scan_requested("lib-0")
+
+    asyncio.run(scans._on_task({"action": "library-scan"}))  # noqa: SLF001
+    asyncio.run(scans._on_task({"id": "scan-1", "action": 3}))  # noqa: SLF001
+
+    assert scans.scan_for("lib-0").scanning
+
+
+def test_poll_of_tasks_in_another_shape_fails_the_update() -> None:
+    """Schema drift in /api/tasks is a failed update, not an unexpected error."""
+    server = _server(socket=False, scan_seconds=0)
+
+    async def _run(coordinator: AudiobookShelfDataUpdateCoordinator) -> Any:
+        server.tasks.append({"action": "library-scan"})
+        await coordinator.scans.async_refresh()
+        return coordinator.scans.last_exception
+
+    error = asyncio.run(_with_scans(server, _run))
+
+    assert isinstance(error, UpdateFailed)
@@ -0,0 +1,181 @@
+"""Tests for polling several servers side by side."""
+
+import asyncio
+import itertools
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from aiohttp import ClientSession, web
+
+from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
+    AudiobookShelfDataUpdateCoordinator,
+)
+from custom_components.audiobookshelf.const import (
+    CONF_MAX_REQUESTS_PER_SECOND,
+)
+from custom_components.audiobookshelf.limiter import LimitedSession
+from custom_components.audiobookshelf.scheduler import PollScheduler, scheduler_for
+
+from .benchmarking import standalone_coordinator, stub_hass
+
+SPACING = 0.3
+
+
+class _FakeServer:
+    """An Audiobookshelf server answering the endpoints a poll asks for."""
+
+    def __init__(self, users: int, *, failing: bool = False) -> None:
+        """Report users users, or fail the users endpoint when failing."""
+        self.users = users
+        self.failing = failing
+        self.requests: list[tuple[float, float]] = []
+        self.url = ""
+        self._runner: web.AppRunner | None = None
+
+    async def _answer(self, request: web.Request) -> web.Response:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.sleep(0.01)
+        self.requests.append((started, loop.time()))
+        path = request.path.removeprefix("/")
+        if path == "api/users" and self.failing:
+            return web.Response(status=500)
+        users = [
+            {"id": f"u{n}", "username": f"user{n}", "type": "user"}
+            for n in range(self.users)
+        ]
+        bodies: dict[str, Any] = {
+            "api/users": {"users": users},
+            "api/users/online": {"usersOnline": []},
+            "api/sessions/open": {"sessions": []},
+            "api/me/sessions": {"total": 0},
+            "api/libraries": {"libraries": []},
+        }
+        return web.json_response(bodies[path])
+
+    async def start(self) -> None:
+        """Listen on a free local port."""
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._answer)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def busy(self) -> tuple[float, float]:
+        """Return when the server was first and last working on a request."""
+        return min(s for s, _ in self.requests), max(e for _, e in self.requests)
+
+
+class _Client:
+    """Just enough of the admin client for a poll, over a real connection."""
+
+    def __init__(self, session: LimitedSession, url: str) -> None:
+        self._session = session
+        self._url = url
+
+    async def _get(self, endpoint: str) -> bytes:
+        response = await self._session.get(f"{self._url}/{endpoint}")
+        if response.status >= 400:
+            msg = f"{endpoint} answered {response.status}"
+            raise ValueError(msg)
+        return await response.read()
+
+    async def get_all_libraries(self) -> list[Any]:
+        await self._get("api/libraries")
+        return []
+
+
+def _coordinator(
+    server: _FakeServer, session: ClientSession, hass: Any
+) -> AudiobookShelfDataUpdateCoordinator:
+    """Build an entry's coordinator polling server through hass's scheduler."""
+    coordinator = standalone_coordinator(
+        server.url, "token", options={CONF_MAX_REQUESTS_PER_SECOND: 100}, hass=hass
+    )
+    limited = LimitedSession(
+        session, coordinator.limiter, budget=coordinator.scheduler.budget
+    )
+    coordinator.get_client = AsyncMock(  # type: ignore[method-assign]
+        return_value=_Client(limited, server.url)
+    )
+    return coordinator
+
+
+def test_servers_poll_apart_and_independently() -> None:
+    """Three servers set up together poll one after another, not in lockstep."""
+    servers = [_FakeServer(1), _FakeServer(2, failing=True), _FakeServer(3)]
+    hass = stub_hass()
+    scheduler = scheduler_for(hass)
+    scheduler.spacing = SPACING
+
+    async def _run() -> list[dict[str, Any]]:
+        for server in servers:
+            await server.start()
+        try:
+            async with ClientSession() as session:
+                coordinators = [
+                    _coordinator(server, session, hass) for server in servers
+                ]
+                return list(
+                    await asyncio.gather(
+                        *(
+                            coordinator._async_update_data()  # noqa: SLF001
+                            for coordinator in coordinators
+                        )
+                    )
+                )
+        finally:
+            for server in servers:
+                await server.stop()
+
+    results = asyncio.run(_run())
+
+    # Each server's results are its own, and one failing does not touch
+    # the others.
+    assert results[0]["count_users"] == 1
+    assert "count_users" not in results[1]
+    assert results[1]["count_users_online"] == 0
+    assert results[2]["count_users"] == 3
+
+    windows = sorted(server.busy() for server in servers)
+    for (_, first_end), (second_start, _) in itertools.pairwise(windows):
+        assert first_end <= second_start
+    starts = [start for start, _ in windows]
+    for earlier, later in itertools.pairwise(starts):
+        assert later - earlier >= SPACING * 0.9
+
+    total = sum(len(server.requests) for server in servers)
+    assert scheduler.budget.requests == total
+
+
+def test_turns_are_taken_in_order_asked() -> None:
+    """Polls arriving together start spacing apart, first come first served."""
+    scheduler = PollScheduler(spacing=0.05)
+    started: dict[str, float] = {}
+
+    async def _poll(name: str) -> None:
+        await scheduler.async_wait_turn()
+        started[name] = asyncio.get_running_loop().time()
+
+    async def _run() -> None:
+        await asyncio.gather(*(_poll(name) for name in "abc"))
+
+    asyncio.run(_run())
+
+    assert sorted(started, key=started.__getitem__) == ["a", "b", "c"]
+    assert started["c"] - started["a"] >= 0.09
+
+
+def test_every_entry_shares_one_scheduler() -> None:
+    """The budget only means anything if it is the same one for all."""
+    hass = MagicMock()
+    hass.data = {}
+
+    assert scheduler_for(hass) is scheduler_for(hass)
@@ -0,0 +1,207 @@
+"""Tests for the search action and how it merges per-library results."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import voluptuous as vol
+from aioaudiobookshelf.exceptions import ApiError
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.audiobookshelf.cache import ResponseCache
+from custom_components.audiobookshelf.const import RESPONSE_CACHE_TTLS
+from custom_components.audiobookshelf.search import rank
+from custom_components.audiobookshelf.services import (
+    SERVICE_ATTRIBUTE_LIMIT,
+    SERVICE_ATTRIBUTE_QUERY,
+    SERVICE_SCHEMAS,
+    SERVICE_SEARCH,
+    async_setup_services,
+)
+
+SCHEMA = SERVICE_SCHEMAS[SERVICE_SEARCH]
+
+
+def _item(item_id: str, title: str, library_id: str) -> dict[str, Any]:
+    """Build one expanded library item as search returns it."""
+    return {
+        "libraryItem": {
+            "id": item_id,
+            "libraryId": library_id,
+            "mediaType": "book",
+            "addedAt": 1,
+            "updatedAt": 2,
+            "size": 1024,
+            "media": {
+                "duration": 3600.0,
+                "metadata": {
+                    "title": title,
+                    "seriesName": "The Expanse",
+                    "authorName": "James S. A. Corey",
+                },
+            },
+        },
+        "matchKey": "title",
+    }
+
+
+RESPONSES = {
+    "lib-1": {
+        "book": [
+            _item("a", "Leviathan Wakes", "lib-1"),
+            _item("b", "Expanse", "lib-1"),
+        ],
+        "series": [
+            {
+                "series": {"id": "ser-1", "name": "The Expanse"},
+                "books": [_item("a", "Leviathan Wakes", "lib-1")["libraryItem"]],
+            }
+        ],
+        "authors": [{"id": "aut-1", "name": "James S. A. Corey"}],
+    },
+    "lib-2": {
+        "book": [_item("c", "Expanse Origins", "lib-2")],
+    },
+}
+
+
+def _hass(responses: dict[str, Any]) -> tuple[Any, MagicMock]:
+    """Build a hass stub whose client answers search per library."""
+
+    async def _get(endpoint: str, params: dict[str, Any]) -> bytes:
+        library_id = endpoint.split("/")[2]
+        assert endpoint == f"api/libraries/{library_id}/search"
+        assert params["q"]
+        response = responses[library_id]
+        if isinstance(response, Exception):
+            raise response
+        return json.dumps(response).encode()
+
+    client = MagicMock()
+    client._get = AsyncMock(side_effect=_get)  # noqa: SLF001
+
+    coordinator = MagicMock()
+    coordinator.get_client = AsyncMock(return_value=client)
+    coordinator.libraries = [
+        SimpleNamespace(id_=library_id) for library_id in responses
+    ]
+    coordinator.response_cache = ResponseCache(RESPONSE_CACHE_TTLS, max_entries=4)
+
+    entry = MagicMock()
+    entry.state = ConfigEntryState.LOADED
+    entry.runtime_data = coordinator
+
+    hass = MagicMock()
+    hass.data = {}
+    hass.config_entries.async_entries.return_value = [entry]
+    async_setup_services(hass)
+    return hass, client
+
+
+def _search(hass: Any, query: str, **extra: Any) -> Any:
+    """Invoke the search action on the stub and return its response."""
+    registrations = {
+        registration.args[1]: registration
+        for registration in hass.services.async_register.call_args_list
+    }
+    handler = registrations[SERVICE_SEARCH].args[2]
+    call = SimpleNamespace(data=SCHEMA({SERVICE_ATTRIBUTE_QUERY: query, **extra}))
+    return asyncio.run(handler(call))
+
+
+def test_registered_as_returning_a_response() -> None:
+    """Without a response the action would have no effect at all."""
+    hass, _ = _hass(RESPONSES)
+    registration = next(
+        registration
+        for registration in hass.services.async_register.call_args_list
+        if registration.args[1] == SERVICE_SEARCH
+    )
+    assert registration.kwargs["supports_response"] is SupportsResponse.ONLY
+
+
+def test_results_from_every_library_are_merged_and_ranked() -> None:
+    """An exact title beats a prefix, which beats a match on something else."""
+    hass, client = _hass(RESPONSES)
+
+    result = _search(hass, "expanse")
+
+    assert [item["id"] for item in result["items"]] == ["b", "c", "a"]
+    assert result["items"][1]["library_id"] == "lib-2"
+    assert result["series"] == [
+        {"id": "ser-1", "library_id": "lib-1", "name": "The Expanse", "books": 1}
+    ]
+    assert result["authors"][0]["name"] == "James S. A. Corey"
+    assert client._get.await_count == 2  # noqa: SLF001
+
+
+def test_records_are_compact() -> None:
+    """Only the fields an automation needs, not the whole library item."""
+    hass, _ = _hass(RESPONSES)
+
+    item = _search(hass, "expanse")["items"][0]
+
+    assert set(item) == {
+        "id",
+        "library_id",
+        "media_type",
+        "title",
+        "author",
+        "series",
+        "duration",
+    }
+
+
+def test_limit_applies_to_the_merged_results() -> None:
+    """Each library honours the limit, so their union can exceed it."""
+    hass, _ = _hass(RESPONSES)
+
+    result = _search(hass, "expanse", **{SERVICE_ATTRIBUTE_LIMIT: 2})
+
+    assert len(result["items"]) == 2
+
+
+def test_repeated_query_is_answered_from_the_cache() -> None:
+    """The same search again within the TTL costs no requests."""
+    hass, client = _hass(RESPONSES)
+
+    first = _search(hass, "Expanse")
+    second = _search(hass, "expanse")
+
+    assert first == second
+    assert client._get.await_count == 2  # noqa: SLF001
+
+
+def test_failure_is_reported() -> None:
+    """One library failing fails the search rather than returning half of it."""
+    hass, _ = _hass({**RESPONSES, "lib-2": ApiError("boom")})
+    with pytest.raises(HomeAssistantError):
+        _search(hass, "expanse")
+
+
+@pytest.mark.parametrize("query", ["", "   "])
+def test_blank_query_is_rejected(query: str) -> None:
+    """A blank query would ask every library for everything."""
+    with pytest.raises(vol.Invalid):
+        SCHEMA({SERVICE_ATTRIBUTE_QUERY: query})
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("Dune", 0),
+        ("Dune Messiah", 1),
+        ("Children of Dune", 2),
+        ("Dunedin", 1),
+        ("Frank Herbert", 4),
+        (None, 4),
+    ],
+)
+def test_rank(text: str | None, expected: int) -> None:
+    """Exact, prefix, word prefix, substring, then anything else."""
+    assert rank("dune", text) == expected
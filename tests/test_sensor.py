@@ -2,26 +2,56 @@
 
 import asyncio
 import json
+from datetime import timedelta
 from pathlib import Path
 from types import SimpleNamespace
 from typing import TYPE_CHECKING, Any, cast
 from unittest.mock import MagicMock, patch
 
 from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.util import dt as dt_util
 
 from custom_components.audiobookshelf import sensor as sensor_module
+from custom_components.audiobookshelf.audiobook_shelf_data_update_coordinator import (
+    Listening,
+    UserActivity,
+)
 from custom_components.audiobookshelf.const import DOMAIN
+from custom_components.audiobookshelf.freshness import MetricFreshness, metric_key
+from custom_components.audiobookshelf.scans import LibraryScan
 from custom_components.audiobookshelf.sensor import (
     SENSOR_DESCRIPTIONS,
     AudiobookShelfSensor,
     AudiobookShelfSensorEntityDescription,
+    LibraryScanSensor,
+    OpenSessionsSensor,
+    ServerLatencySensor,
+    UserListeningSensor,
+    UserSensor,
+    user_descriptions,
+    user_listening_description,
 )
 
 if TYPE_CHECKING:
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 # Built per library at runtime, so they are not in SENSOR_DESCRIPTIONS.
-LIBRARY_TRANSLATION_KEYS = ("library_size", "library_items", "library_duration")
+LIBRARY_TRANSLATION_KEYS = (
+    "library_size",
+    "library_items",
+    "library_duration",
+    "library_scan",
+    "library_scan_progress",
+    "library_last_scan",
+)
+# Built per user, from the users step's data.
+USER_TRANSLATION_KEYS = (
+    "user_books_in_progress",
+    "user_books_finished",
+    "user_last_seen",
+    "user_last_listened",
+    "user_open_sessions",
+)
 
 LIBRARY_SENSOR = AudiobookShelfSensorEntityDescription(
     key="library_stats",
@@ -39,8 +69,15 @@ def _sensor(
     coordinator = MagicMock()
     coordinator.data = data
     coordinator.last_update_success = True
+    coordinator.freshness = MetricFreshness(timedelta(minutes=15))
+    for key, value in data.items():
+        if key == "library_stats":
+            for library_id in value:
+                coordinator.freshness.succeeded(metric_key(key, library_id))
+        else:
+            coordinator.freshness.succeeded(key)
     with patch.object(AudiobookShelfSensor, "__init__", return_value=None):
-        sensor = AudiobookShelfSensor(coordinator, description)  # type: ignore[call-arg]
+        sensor = AudiobookShelfSensor(coordinator, MagicMock(), description)
     sensor.coordinator = coordinator
     sensor.entity_description = description
     return sensor
@@ -133,9 +170,23 @@ def _setup_platform(libraries: list[Any]) -> tuple[Any, list[Any], list[Any]]:
 
     coordinator = MagicMock()
     coordinator.api_url = "http://abs.local:13378"
+    coordinator.data = {}
     coordinator.libraries = libraries
+    coordinator.library_coordinators = {}
     coordinator.async_add_listener = _add_listener
 
+    def _attach(library: Any) -> Any:
+        """Start a child coordinator the way the real one would."""
+        child = MagicMock()
+        child.library = library
+        coordinator.library_coordinators[library.id_] = child
+        return child
+
+    coordinator.async_attach_library = _attach
+    coordinator.async_detach_library = MagicMock(
+        side_effect=coordinator.library_coordinators.pop
+    )
+
     entry = MagicMock()
     entry.entry_id = "entry-1"
     entry.data = {}
@@ -153,7 +204,8 @@ def test_libraries_present_at_setup_get_sensors() -> None:
     """Six global sensors plus three for the one library."""
     _, _, entities = _setup_platform([SimpleNamespace(id_="lib-1", name="Books")])
 
-    assert len(entities) == len(SENSOR_DESCRIPTIONS) + 3
+    # The latency sensor, then six per library.
+    assert len(entities) == len(SENSOR_DESCRIPTIONS) + 1 + 6
 
 
 def test_library_added_later_does_not_need_a_reload() -> None:
@@ -167,13 +219,199 @@ def test_library_added_later_does_not_need_a_reload() -> None:
     for listener in listeners:
         listener()
 
-    assert len(entities) == before + 3
+    assert len(entities) == before + 6
     new_ids = {e.unique_id for e in entities[before:]}
     assert new_ids == {
         "entry-1_library_stats_lib-2_total_size",
         "entry-1_library_stats_lib-2_total_items",
         "entry-1_library_stats_lib-2_total_duration",
+        "entry-1_library_scans_lib-2_state",
+        "entry-1_library_scans_lib-2_items_changed",
+        "entry-1_library_scans_lib-2_last_scan",
+    }
+
+
+def test_library_sensors_follow_their_own_coordinator() -> None:
+    """So one library's stats update and fail apart from everything else."""
+    coordinator, _, entities = _setup_platform(
+        [SimpleNamespace(id_="lib-1", name="Books")]
+    )
+    child = coordinator.library_coordinators["lib-1"]
+
+    library_sensors = [e for e in entities if e.coordinator is child]
+    assert len(library_sensors) == 3
+    scan_sensors = [e for e in entities if e.coordinator is coordinator.scans]
+    assert len(scan_sensors) == 3
+    assert all(
+        e.coordinator is coordinator
+        for e in entities
+        if e.entity_description in SENSOR_DESCRIPTIONS
+    )
+    latency = next(e for e in entities if isinstance(e, ServerLatencySensor))
+    assert latency.coordinator is coordinator.probe
+
+
+def test_latency_is_unknown_while_the_server_is_down() -> None:
+    """Available from the first ping on, with no value while pings go unanswered."""
+    _, _, entities = _setup_platform([])
+    sensor = next(e for e in entities if isinstance(e, ServerLatencySensor))
+    probe = sensor.coordinator
+    probe.data = None  # type: ignore[assignment]
+
+    assert sensor.available is False
+
+    probe.data = {"server_reachable": True, "server_latency": 12.5}
+
+    assert sensor.available is True
+    assert sensor.native_value == 12.5
+
+    probe.data = {"server_reachable": False, "server_latency": None}
+
+    assert sensor.available is True
+    assert sensor.native_value is None
+
+
+def test_scan_sensors_read_the_library_scan() -> None:
+    """State, progress and error, available for as long as scans are followed."""
+    _, _, entities = _setup_platform([SimpleNamespace(id_="lib-1", name="Books")])
+    by_method = {
+        e.entity_description.key_context_method: e
+        for e in entities
+        if isinstance(e, LibraryScanSensor)
+    }
+    scans = by_method["state"].coordinator
+    scans.data = {
+        "library_scans": {
+            "lib-1": LibraryScan(scanning=True, items_changed=4, error="No folders")
+        }
+    }
+    scans.last_update_success = True
+
+    assert by_method["state"].native_value == "scanning"
+    assert by_method["items_changed"].native_value == 4
+    assert by_method["state"].extra_state_attributes == {"error": "No folders"}
+    assert by_method["items_changed"].extra_state_attributes is None
+    assert by_method["state"].available is True
+
+    scans.last_update_success = False
+
+    assert by_method["state"].available is False
+
+
+def _activity(username: str) -> UserActivity:
+    """Build one user's activity."""
+    return UserActivity(
+        username=username,
+        books_in_progress=2,
+        books_finished=5,
+        last_seen=None,
+        last_listened=None,
+    )
+
+
+def test_users_get_sensors_as_they_appear() -> None:
+    """Created from the users step's data, like libraries from theirs."""
+    coordinator, listeners, entities = _setup_platform([])
+    before = len(entities)
+
+    coordinator.data = {"user_activity": {"user-1": _activity("alice")}}
+    for listener in listeners:
+        listener()
+    for listener in listeners:
+        listener()
+
+    new = entities[before:]
+    assert {e.unique_id for e in new} == {
+        "entry-1_user_activity_user-1_books_in_progress",
+        "entry-1_user_activity_user-1_books_finished",
+        "entry-1_user_activity_user-1_last_seen",
+        "entry-1_user_activity_user-1_last_listened",
+        "entry-1_listening_by_user_user-1_sessions",
     }
+    assert all(isinstance(e, UserSensor) for e in new)
+
+
+def test_user_sensor_goes_by_the_users_step() -> None:
+    """Fresh while api/users is, and unavailable once the user is deleted."""
+    data = {"user_activity": {"user-1": _activity("alice")}}
+    sensor = _sensor(user_descriptions("user-1", _activity("alice"))[0], data)
+    sensor.__class__ = UserSensor
+
+    assert sensor.available is True
+    assert sensor.native_value == 2
+
+    data["user_activity"] = {}
+
+    assert sensor.available is False
+
+
+def _listening(sessions: int, **groups: set[str]) -> Listening:
+    """Build one group of open sessions."""
+    return Listening(sessions=sessions, **groups)
+
+
+def test_open_sessions_are_broken_down_by_name() -> None:
+    """Users and libraries go by their names, ids where none is known yet."""
+    data = {
+        "count_open_sessions": 3,
+        "user_activity": {"user-1": _activity("alice")},
+        "listening_by_user": {"user-1": _listening(2), "user-2": _listening(1)},
+        "listening_by_device": {"Pixel 8": _listening(2), "Abs Web": _listening(1)},
+        "listening_by_library": {"lib-1": _listening(3)},
+    }
+    sensor = _sensor(SENSOR_DESCRIPTIONS[2], data)
+    sensor.__class__ = OpenSessionsSensor
+    cast("Any", sensor.coordinator).libraries = [
+        SimpleNamespace(id_="lib-1", name="Books")
+    ]
+
+    assert sensor.native_value == 3
+    assert sensor.extra_state_attributes == {
+        "users": {"alice": 2, "user-2": 1},
+        "devices": {"Pixel 8": 2, "Abs Web": 1},
+        "libraries": {"Books": 3},
+    }
+
+
+def test_user_with_nothing_open_has_no_sessions() -> None:
+    """Missing from the grouping means none open, not a deleted user."""
+    data: dict[str, Any] = {"listening_by_user": {}}
+    description = user_listening_description("user-1", _activity("alice"))
+    sensor = _sensor(description, data)
+    sensor.__class__ = UserListeningSensor
+    cast("Any", sensor.coordinator).libraries = [
+        SimpleNamespace(id_="lib-1", name="Books")
+    ]
+
+    assert sensor.available is True
+    assert sensor.native_value == 0
+    assert sensor.extra_state_attributes == {"devices": [], "libraries": []}
+
+    data["listening_by_user"] = {
+        "user-1": _listening(
+            2, devices={"Pixel 8", "Abs Web"}, libraries={"lib-1", "lib-2"}
+        )
+    }
+
+    assert sensor.native_value == 2
+    assert sensor.extra_state_attributes == {
+        "devices": ["Abs Web", "Pixel 8"],
+        "libraries": ["Books", "lib-2"],
+    }
+
+
+def test_deleted_library_stops_being_polled() -> None:
+    """Its coordinator would otherwise keep asking for stats of nothing."""
+    coordinator, listeners, _ = _setup_platform(
+        [SimpleNamespace(id_="lib-1", name="Books")]
+    )
+
+    coordinator.libraries = []
+    for listener in listeners:
+        listener()
+
+    coordinator.async_detach_library.assert_called_once_with("lib-1")
+    assert coordinator.library_coordinators == {}
 
 
 def test_unchanged_libraries_are_not_added_twice() -> None:
@@ -207,6 +445,7 @@ def test_every_translation_key_has_a_name() -> None:
     assert all(key is not None for key in keys)
     assert set(keys) <= set(names)
     assert set(LIBRARY_TRANSLATION_KEYS) <= set(names)
+    assert set(USER_TRANSLATION_KEYS) <= set(names)
 
 
 def test_library_names_carry_the_placeholder() -> None:
@@ -215,6 +454,8 @@ def test_library_names_carry_the_placeholder() -> None:
 
     for key in LIBRARY_TRANSLATION_KEYS:
         assert "{library}" in names[key]["name"]
+    for key in USER_TRANSLATION_KEYS:
+        assert "{user}" in names[key]["name"]
 
 
 def test_none_value_stays_none() -> None:
@@ -224,3 +465,47 @@ def test_none_value_stays_none() -> None:
         {"count_auth_sessions": None},
     )
     assert sensor.native_value is None
+
+
+def test_stale_value_stays_available_and_says_when_it_was_fetched() -> None:
+    """One failed endpoint keeps its last value rather than going unavailable."""
+    sensor = _sensor(GLOBAL_SENSOR, {"count_users": 3})
+    assert sensor.extra_state_attributes is None
+
+    sensor.coordinator.freshness.failed("count_users", "boom")
+
+    assert sensor.available is True
+    assert sensor.native_value == 3
+    attributes = sensor.extra_state_attributes
+    assert attributes is not None
+    assert attributes["last_fetched"] == (
+        sensor.coordinator.freshness.fetched_at("count_users").isoformat()  # type: ignore[union-attr]
+    )
+
+
+def test_value_too_old_is_unavailable() -> None:
+    """Past its age limit a held-over value is no longer shown."""
+    sensor = _sensor(GLOBAL_SENSOR, {"count_users": 3})
+    sensor.coordinator.freshness.succeeded(
+        "count_users", dt_util.utcnow() - timedelta(hours=1)
+    )
+
+    assert sensor.available is False
+
+
+def test_availability_is_per_sensor_not_per_poll() -> None:
+    """A poll that failed as a whole still leaves recent values showing."""
+    sensor = _sensor(GLOBAL_SENSOR, {"count_users": 3})
+    sensor.coordinator.last_update_success = False
+
+    assert sensor.available is True
+
+
+def test_library_on_a_longer_interval_has_a_longer_age_limit() -> None:
+    """Stats polled hourly must not go unavailable after a quarter of an hour."""
+    sensor = _sensor(LIBRARY_SENSOR, {"library_stats": {"lib-1": SimpleNamespace()}})
+    freshness = sensor.coordinator.freshness
+    freshness.set_max_age("library_stats:lib-1", timedelta(hours=3))
+    freshness.succeeded("library_stats:lib-1", dt_util.utcnow() - timedelta(hours=1))
+
+    assert sensor.available is True
@@ -1,7 +1,6 @@
 """Tests for the guards on which items remove_my_progress matches."""
 
 import asyncio
-from collections.abc import AsyncIterator
 from types import SimpleNamespace
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock
@@ -9,11 +8,12 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 import voluptuous as vol
 from aioaudiobookshelf.exceptions import ApiError
-from aioaudiobookshelf.schema.library import LibraryItemMinifiedBook
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 
+from custom_components.audiobookshelf.catalog import CatalogItem, LibraryCatalog
 from custom_components.audiobookshelf.services import (
+    SERVICE_ATTRIBUTE_CONFIG_ENTRY_ID,
     SERVICE_ATTRIBUTE_SERIES_NAME,
     SERVICE_REMOVE_PROGRESS,
     SERVICE_SCHEMAS,
@@ -23,27 +23,25 @@ from custom_components.audiobookshelf.services import (
 SCHEMA = SERVICE_SCHEMAS[SERVICE_REMOVE_PROGRESS]
 
 
-def _book(item_id: str, series_name: str) -> Any:
-    """Build a stand-in book that satisfies the handler's isinstance check."""
-    book = MagicMock()
-    book.__class__ = LibraryItemMinifiedBook  # type: ignore[assignment]
-    book.id_ = item_id
-    book.media.metadata.series_name = series_name
-    book.media.metadata.title_ignore_prefix = item_id
-    return book
-
-
-def _client(books: list[Any], remove_error: Exception | None = None) -> MagicMock:
-    """Build a client serving one library of the given books."""
+def _book(item_id: str, series_name: str) -> CatalogItem:
+    """Build a catalog entry for one book in the given series."""
+    return CatalogItem(
+        id_=item_id,
+        library_id="lib-1",
+        media_type="book",
+        title=item_id,
+        series=series_name or None,
+        author=None,
+        added_at=0,
+        updated_at=0,
+        duration=None,
+        size=None,
+    )
 
-    async def _get_library_items(library_id: str) -> AsyncIterator[Any]:  # noqa: ARG001
-        """Yield one page of results, then an empty page to end pagination."""
-        yield SimpleNamespace(results=books)
-        yield SimpleNamespace(results=[])
 
+def _client(remove_error: Exception | None = None) -> MagicMock:
+    """Build a client holding progress for every item."""
     client = MagicMock()
-    client.get_all_libraries = AsyncMock(return_value=[SimpleNamespace(id_="lib-1")])
-    client.get_library_items = _get_library_items
     client.get_my_media_progress = AsyncMock(
         side_effect=lambda item_id: SimpleNamespace(id_=f"prog-{item_id}")
     )
@@ -51,10 +49,18 @@ def _client(books: list[Any], remove_error: Exception | None = None) -> MagicMoc
     return client
 
 
-def _hass(client: MagicMock, state: ConfigEntryState = ConfigEntryState.LOADED) -> Any:
+def _hass(
+    client: MagicMock,
+    books: list[CatalogItem] | None = None,
+    state: ConfigEntryState = ConfigEntryState.LOADED,
+) -> Any:
     """Build a hass stub holding a single config entry in the given state."""
+    catalog = LibraryCatalog(MagicMock())
+    catalog._items = {"lib-1": {book.id_: book for book in books or []}}  # noqa: SLF001
+
     coordinator = MagicMock()
     coordinator.get_client = AsyncMock(return_value=client)
+    coordinator.async_sync_catalog = AsyncMock(return_value=catalog)
     coordinator.async_request_refresh = AsyncMock()
 
     entry = MagicMock()
@@ -66,18 +72,28 @@ def _hass(client: MagicMock, state: ConfigEntryState = ConfigEntryState.LOADED)
     return hass
 
 
-def _call(hass: Any, series_name: str) -> None:
+def _handlers(hass: Any) -> dict[str, Any]:
+    """Return the registered handlers, keyed by service name."""
+    return {
+        registration.args[1]: registration.args[2]
+        for registration in hass.services.async_register.call_args_list
+    }
+
+
+def _call(hass: Any, series_name: str, **target: str) -> None:
     """Register the services and invoke remove_my_progress on the stub."""
     async_setup_services(hass)
-    handler = hass.services.async_register.call_args.args[2]
-    call = SimpleNamespace(data=SCHEMA({SERVICE_ATTRIBUTE_SERIES_NAME: series_name}))
+    handler = _handlers(hass)[SERVICE_REMOVE_PROGRESS]
+    call = SimpleNamespace(
+        data=SCHEMA({SERVICE_ATTRIBUTE_SERIES_NAME: series_name, **target})
+    )
     asyncio.run(handler(call))
 
 
 def _removed_progress_for(books: list[Any], series_name: str) -> list[str]:
     """Run the service over one library and return the progress ids it deleted."""
-    client = _client(books)
-    _call(_hass(client), series_name)
+    client = _client()
+    _call(_hass(client, books), series_name)
     return [
         c.kwargs["media_progress_id"]
         for c in client.remove_my_media_progress.call_args_list
@@ -122,7 +138,7 @@ def test_match_ignores_case() -> None:
 
 def test_unconfigured_integration_is_reported() -> None:
     """The action exists even with no entry, so it has to explain itself."""
-    hass = _hass(_client([]))
+    hass = _hass(_client())
     hass.config_entries.async_entries.return_value = []
     with pytest.raises(ServiceValidationError):
         _call(hass, "Expanse")
@@ -130,7 +146,7 @@ def test_unconfigured_integration_is_reported() -> None:
 
 def test_unloaded_entry_is_reported() -> None:
     """An entry that failed to load has no coordinator to work with."""
-    hass = _hass(_client([]), state=ConfigEntryState.SETUP_ERROR)
+    hass = _hass(_client(), state=ConfigEntryState.SETUP_ERROR)
     with pytest.raises(ServiceValidationError):
         _call(hass, "Expanse")
 
@@ -138,17 +154,75 @@ def test_unloaded_entry_is_reported() -> None:
 def test_api_failure_reports_how_far_it_got() -> None:
     """Deletions cannot be rolled back, so the count so far has to surface."""
     books = [_book("a", "The Expanse"), _book("b", "The Expanse")]
-    hass = _hass(_client(books, remove_error=ApiError("server went away")))
+    hass = _hass(_client(remove_error=ApiError("server went away")), books)
     with pytest.raises(HomeAssistantError, match="after 0 item"):
         _call(hass, "Expanse")
 
 
 def test_refresh_is_requested_even_when_the_run_fails() -> None:
     """A partial run still changed state, so the sensors must be refreshed."""
-    hass = _hass(
-        _client([_book("a", "The Expanse")], remove_error=ApiError("boom")),
-    )
+    hass = _hass(_client(remove_error=ApiError("boom")), [_book("a", "The Expanse")])
     coordinator = hass.config_entries.async_entries.return_value[0].runtime_data
     with pytest.raises(HomeAssistantError):
         _call(hass, "Expanse")
     assert coordinator.async_request_refresh.await_count == 1
+
+
+def test_podcasts_are_never_matched() -> None:
+    """Podcasts have no series, and progress on them is not this action's to remove."""
+    podcast = _book("p", "The Expanse")
+    podcast = CatalogItem(**{**podcast.__dict__, "media_type": "podcast"})
+    assert _removed_progress_for([podcast, _book("a", "The Expanse")], "Expanse") == [
+        "prog-a"
+    ]
+
+
+def test_catalog_is_synced_before_matching() -> None:
+    """Items added since the last sync have to be considered too."""
+    hass = _hass(_client(), [_book("a", "The Expanse")])
+    coordinator = hass.config_entries.async_entries.return_value[0].runtime_data
+    _call(hass, "Expanse")
+    assert coordinator.async_sync_catalog.await_count == 1
+
+
+def _two_servers() -> tuple[Any, MagicMock, MagicMock]:
+    """Build a hass stub with two loaded servers, each holding one book."""
+    first, second = _client(), _client()
+    hass = _hass(first, [_book("a", "The Expanse")])
+    other = _hass(second, [_book("b", "The Expanse")])
+    entries = [
+        *hass.config_entries.async_entries.return_value,
+        *other.config_entries.async_entries.return_value,
+    ]
+    for entry_id, entry in zip(("entry-1", "entry-2"), entries, strict=True):
+        entry.entry_id = entry_id
+    hass.config_entries.async_entries.return_value = entries
+    return hass, first, second
+
+
+def test_targeted_server_is_the_one_used() -> None:
+    """With several servers, the action works on the one it names."""
+    hass, first, second = _two_servers()
+
+    _call(hass, "Expanse", **{SERVICE_ATTRIBUTE_CONFIG_ENTRY_ID: "entry-2"})
+
+    assert first.remove_my_media_progress.await_count == 0
+    second.remove_my_media_progress.assert_awaited_once_with(media_progress_id="prog-b")
+
+
+def test_several_servers_need_a_target() -> None:
+    """Guessing which server to delete progress from is not an option."""
+    hass, first, second = _two_servers()
+
+    with pytest.raises(ServiceValidationError, match="choose one"):
+        _call(hass, "Expanse")
+    assert first.remove_my_media_progress.await_count == 0
+    assert second.remove_my_media_progress.await_count == 0
+
+
+def test_unknown_target_is_reported() -> None:
+    """An id from another integration, or a removed entry, is not ignored."""
+    hass, _, _ = _two_servers()
+
+    with pytest.raises(ServiceValidationError, match="entry-3"):
+        _call(hass, "Expanse", **{SERVICE_ATTRIBUTE_CONFIG_ENTRY_ID: "entry-3"})
@@ -0,0 +1,257 @@
+"""Tests for tracing polls and actions as OTLP/JSON."""
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+from aiohttp import ClientSession, web
+
+from custom_components.audiobookshelf import tracing
+from custom_components.audiobookshelf.const import CONF_TRACE_EXPORT
+from custom_components.audiobookshelf.services import (
+    SERVICE_ATTRIBUTE_SERIES_NAME,
+    SERVICE_REMOVE_PROGRESS,
+)
+from custom_components.audiobookshelf.tracing import (
+    FileTraceExporter,
+    HttpTraceExporter,
+    SpanKind,
+    StatusCode,
+    Tracer,
+    span,
+    tracer_for,
+)
+from scripts.fake_abs import ADMIN_TOKEN, FakeAudiobookshelf
+
+from .benchmarking import (
+    attach_libraries,
+    close,
+    service_handlers,
+    standalone_coordinator,
+)
+
+
+class _Collected:
+    """An exporter keeping every trace it is sent."""
+
+    def __init__(self) -> None:
+        """Start with nothing."""
+        self.payloads: list[dict[str, Any]] = []
+
+    async def async_export(self, payload: dict[str, Any]) -> None:
+        """Keep one trace."""
+        self.payloads.append(payload)
+
+    def spans(self, trace: int = -1) -> list[dict[str, Any]]:
+        """Return the spans of one trace."""
+        spans: list[dict[str, Any]] = self.payloads[trace]["resourceSpans"][0][
+            "scopeSpans"
+        ][0]["spans"]
+        return spans
+
+
+def _hass() -> Any:
+    """Build a hass stub that runs background tasks on the running loop."""
+    hass = MagicMock()
+    hass.async_create_background_task = lambda coro, _name: asyncio.ensure_future(coro)
+    return hass
+
+
+def _attribute(encoded: dict[str, Any], key: str) -> Any:
+    """Return one attribute's value from an OTLP/JSON span."""
+    for attribute in encoded["attributes"]:
+        if attribute["key"] == key:
+            return next(iter(attribute["value"].values()))
+    return None
+
+
+def test_spans_nest_and_encode_as_otlp() -> None:
+    """Children point at their parent, failures carry their message."""
+    collected = _Collected()
+
+    async def _run() -> None:
+        tracer = Tracer(_hass(), collected, {"service.name": "test"})
+        with tracer.root_span("poll", {"n": 1}):
+            with span("GET api/users", kind=SpanKind.CLIENT) as child:
+                child.add("http.response.body.size", 10)
+                child.add("http.response.body.size", 5)
+            with pytest.raises(ValueError, match="bad"), span("GET api/libraries"):
+                raise ValueError("bad")  # noqa: EM101
+        await asyncio.sleep(0)
+
+    asyncio.run(_run())
+
+    root, users, libraries = sorted(
+        collected.spans(), key=lambda s: s["startTimeUnixNano"]
+    )
+    assert "parentSpanId" not in root
+    assert users["parentSpanId"] == libraries["parentSpanId"] == root["spanId"]
+    assert len({root["traceId"], users["traceId"], libraries["traceId"]}) == 1
+    assert users["kind"] == SpanKind.CLIENT
+    assert _attribute(users, "http.response.body.size") == "15"
+    assert _attribute(root, "n") == "1"
+    assert users["status"] == {"code": StatusCode.OK}
+    assert libraries["status"] == {"code": StatusCode.ERROR, "message": "bad"}
+    resource = collected.payloads[0]["resourceSpans"][0]["resource"]
+    assert resource["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "test"}}
+    ]
+
+
+def test_nothing_is_recorded_outside_a_trace() -> None:
+    """Instrumented code runs the same with tracing off."""
+    collected = _Collected()
+    tracer = Tracer(MagicMock(), None, {})
+
+    with tracer.root_span("poll"), span("GET api/users") as child:
+        tracing.record_response(MagicMock(status=200), b"{}")
+
+    assert child.trace is None
+    assert child.attributes == {}
+    assert collected.payloads == []
+
+
+def _traced(server: FakeAudiobookshelf, collected: _Collected) -> Any:
+    """Build a coordinator for server, tracing into collected."""
+    coordinator = standalone_coordinator(server.url, ADMIN_TOKEN)
+    coordinator.tracer = Tracer(_hass(), collected, {})
+    return coordinator
+
+
+def test_poll_is_one_trace_with_a_span_per_endpoint() -> None:
+    """Each request's status and size is on its endpoint's span."""
+    collected = _Collected()
+
+    async def _run() -> None:
+        async with FakeAudiobookshelf(libraries=2, users=3, sessions=1) as server:
+            coordinator = _traced(server, collected)
+            try:
+                await attach_libraries(coordinator)
+                await coordinator._async_update_data()  # noqa: SLF001
+                await asyncio.sleep(0)
+            finally:
+                await close(coordinator)
+
+    asyncio.run(_run())
+
+    spans = {encoded["name"]: encoded for encoded in collected.spans()}
+    root = spans.pop("poll")
+    assert set(spans) == {
+        "GET api/users",
+        "GET api/users/online",
+        "GET api/users/{id}",
+        "GET api/sessions/open",
+        "GET api/me/sessions",
+        "GET api/libraries",
+        "GET api/libraries/{id}/stats",
+    }
+    users = spans["GET api/users"]
+    assert users["parentSpanId"] == root["spanId"]
+    assert _attribute(users, "http.response.status_code") == "200"
+    assert int(_attribute(users, "http.response.body.size")) > 0
+    assert _attribute(users, "http.request.count") == "1"
+    # One request per user, under their step's one span.
+    assert _attribute(spans["GET api/users/{id}"], "http.request.count") == "3"
+    assert len(collected.spans()) == 8 + 1  # both libraries' stats
+
+
+def test_remove_my_progress_traces_every_page() -> None:
+    """A library walk has a span per page under its library's sync."""
+    collected = _Collected()
+
+    async def _run() -> None:
+        async with FakeAudiobookshelf(libraries=1, items_per_library=250) as server:
+            coordinator = _traced(server, collected)
+            coordinator.catalog._page_size.size = 100  # noqa: SLF001
+            handler = service_handlers(coordinator)[SERVICE_REMOVE_PROGRESS]
+            call = SimpleNamespace(data={SERVICE_ATTRIBUTE_SERIES_NAME: "Series 3"})
+            try:
+                await handler(call)
+                await asyncio.sleep(0)
+            finally:
+                await close(coordinator)
+
+    asyncio.run(_run())
+
+    spans = collected.spans()
+    root = next(s for s in spans if s["name"] == "action remove_my_progress")
+    sync = next(s for s in spans if s["name"] == "catalog sync")
+    pages = [s for s in spans if s["name"] == "GET api/libraries/{id}/items"]
+    assert sync["parentSpanId"] == root["spanId"]
+    assert {page["parentSpanId"] for page in pages} == {sync["spanId"]}
+    assert sum(int(_attribute(page, "audiobookshelf.results")) for page in pages) == 250
+
+
+def test_file_exporter_appends_a_line_per_trace(tmp_path: Path) -> None:
+    """One OTLP/JSON request per line, as the collector's file exporter."""
+    path = tmp_path / "traces.jsonl"
+    hass = MagicMock()
+
+    async def _executor(target: Any, *args: Any) -> Any:
+        return target(*args)
+
+    hass.async_add_executor_job = _executor
+    exporter = FileTraceExporter(hass, path)
+
+    asyncio.run(exporter.async_export({"resourceSpans": [1]}))
+    asyncio.run(exporter.async_export({"resourceSpans": [2]}))
+
+    lines = path.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"resourceSpans": [1]},
+        {"resourceSpans": [2]},
+    ]
+
+
+def test_http_exporter_posts_to_the_traces_path() -> None:
+    """OTLP/HTTP collectors take traces at /v1/traces."""
+    received: list[Any] = []
+
+    async def _collector(request: web.Request) -> web.Response:
+        received.append((request.path, await request.json()))
+        return web.Response()
+
+    async def _run() -> None:
+        app = web.Application()
+        app.router.add_post("/v1/traces", _collector)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+        try:
+            async with ClientSession() as session:
+                with patch.object(
+                    tracing, "async_get_clientsession", return_value=session
+                ):
+                    exporter = HttpTraceExporter(MagicMock(), url)
+                    await exporter.async_export({"resourceSpans": []})
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(_run())
+
+    assert received == [("/v1/traces", {"resourceSpans": []})]
+
+
+@pytest.mark.parametrize(
+    ("option", "exporter"),
+    [
+        ("", type(None)),
+        ("http://localhost:4318", HttpTraceExporter),
+        ("traces.jsonl", FileTraceExporter),
+    ],
+)
+def test_option_picks_the_exporter(option: str, exporter: type) -> None:
+    """A URL is a collector, anything else a file."""
+    entry = MagicMock(entry_id="entry-1", options={CONF_TRACE_EXPORT: option})
+    hass = MagicMock()
+    hass.config.path = lambda name: f"/config/{name}"
+
+    tracer = tracer_for(hass, entry, "http://abs.local")
+
+    assert isinstance(tracer.exporter, exporter)
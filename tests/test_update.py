@@ -2,17 +2,19 @@
 
 import asyncio
 from contextlib import asynccontextmanager
+from http import HTTPStatus
 from typing import TYPE_CHECKING, Any, cast
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from aiohttp import ClientError
-from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.const import Platform
 
 from custom_components.audiobookshelf import update as update_module
 from custom_components.audiobookshelf.const import (
     CONF_CHECK_FOR_UPDATES,
     check_for_updates_for,
+    platforms_for,
 )
 from custom_components.audiobookshelf.update import (
     AudiobookshelfUpdate,
@@ -37,20 +39,46 @@ def _entry(options: dict[str, Any] | None = None) -> Any:
     return entry
 
 
-def _github_returning(payload: Any, *, error: Exception | None = None) -> Any:
+def _store(cached: dict[str, str] | None = None) -> Any:
+    """Build a release store stub holding the given cache."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=cached)
+    store.async_save = AsyncMock()
+    return store
+
+
+def _update_entity(store: Any = None) -> AudiobookshelfUpdate:
+    """Build an opted-in update entity over the given store."""
+    entry = _entry({CONF_CHECK_FOR_UPDATES: True})
+    return AudiobookshelfUpdate(
+        entry.runtime_data, entry, store if store is not None else _store()
+    )
+
+
+def _github_returning(
+    payload: Any,
+    *,
+    error: Exception | None = None,
+    status: int = HTTPStatus.OK,
+    etag: str | None = None,
+) -> Any:
     """Build a session whose GitHub call yields payload, or raises."""
 
     @asynccontextmanager
-    async def _get(*_args: Any, **_kwargs: Any) -> Any:
+    async def _get(*_args: Any, **kwargs: Any) -> Any:
+        session.sent_headers.append(kwargs["headers"])
         if error is not None:
             raise error
         response = MagicMock()
+        response.status = status
+        response.headers = {"ETag": etag} if etag else {}
         response.raise_for_status = MagicMock()
         response.json = AsyncMock(return_value=payload)
         yield response
 
     session = MagicMock()
     session.get = _get
+    session.sent_headers = []
     return session
 
 
@@ -71,19 +99,22 @@ def test_enabled_when_the_option_is_set() -> None:
     assert check_for_updates_for(_entry({CONF_CHECK_FOR_UPDATES: True})) is True
 
 
-def test_no_entity_created_when_disabled() -> None:
-    """The platform is always forwarded, so opting out must add nothing."""
-    added: list[Any] = []
-    entry = _entry({CONF_SCAN_INTERVAL: 300})
+def test_update_platform_not_forwarded_when_disabled() -> None:
+    """Nothing of the update platform is loaded for users who never opt in."""
+    assert platforms_for(_entry()) == [Platform.SENSOR, Platform.BINARY_SENSOR]
 
-    add = cast("AddEntitiesCallback", lambda e, _=False: added.extend(e))
-    asyncio.run(async_setup_entry(MagicMock(), entry, add))
 
-    assert added == []
+def test_update_platform_forwarded_when_enabled() -> None:
+    """Opting in is what brings the platform in."""
+    assert platforms_for(_entry({CONF_CHECK_FOR_UPDATES: True})) == [
+        Platform.SENSOR,
+        Platform.BINARY_SENSOR,
+        Platform.UPDATE,
+    ]
 
 
-def test_entity_created_when_enabled() -> None:
-    """Opting in creates exactly one update entity."""
+def test_entity_created_when_set_up() -> None:
+    """The platform is only forwarded once opted in, so it always adds one."""
     added: list[Any] = []
     entry = _entry({CONF_CHECK_FOR_UPDATES: True})
 
@@ -96,8 +127,7 @@ def test_entity_created_when_enabled() -> None:
 
 def test_tag_prefix_is_stripped() -> None:
     """Releases are tagged v2.37.0 while the server reports 2.37.0."""
-    entry = _entry({CONF_CHECK_FOR_UPDATES: True})
-    entity = AudiobookshelfUpdate(entry.runtime_data, entry)
+    entity = _update_entity()
 
     _updated(entity, _github_returning({"tag_name": "v2.37.0"}))
 
@@ -110,8 +140,7 @@ def test_tag_prefix_is_stripped() -> None:
 
 def test_matching_versions_report_no_update() -> None:
     """Up to date is the common case and must not offer an update."""
-    entry = _entry({CONF_CHECK_FOR_UPDATES: True})
-    entity = AudiobookshelfUpdate(entry.runtime_data, entry)
+    entity = _update_entity()
 
     _updated(entity, _github_returning({"tag_name": "v2.36.0"}))
 
@@ -122,7 +151,7 @@ def test_installed_version_is_re_read_each_poll() -> None:
     """Otherwise the entity offers an update the user has already applied."""
     entry = _entry({CONF_CHECK_FOR_UPDATES: True})
     coordinator = entry.runtime_data
-    entity = AudiobookshelfUpdate(coordinator, entry)
+    entity = AudiobookshelfUpdate(coordinator, entry, _store())
 
     _updated(entity, _github_returning({"tag_name": "v2.37.0"}))
 
@@ -142,8 +171,7 @@ def test_github_failures_keep_the_last_known_answer(
     payload: Any, error: Exception | None
 ) -> None:
     """A GitHub blip must not blank the entity, nor touch anything else."""
-    entry = _entry({CONF_CHECK_FOR_UPDATES: True})
-    entity = AudiobookshelfUpdate(entry.runtime_data, entry)
+    entity = _update_entity()
 
     _updated(entity, _github_returning({"tag_name": "v2.37.0"}))
     assert entity.latest_version == "2.37.0"
@@ -156,8 +184,76 @@ def test_github_failures_keep_the_last_known_answer(
 
 def test_release_url_is_none_before_the_first_answer() -> None:
     """Nothing to link to until GitHub has been reached once."""
-    entry = _entry({CONF_CHECK_FOR_UPDATES: True})
-    entity = AudiobookshelfUpdate(entry.runtime_data, entry)
+    entity = _update_entity()
 
     assert entity.latest_version is None
     assert entity.release_url is None
+
+
+def _added(entity: AudiobookshelfUpdate) -> MagicMock:
+    """Add the entity to a stub hass, returning its state scheduler."""
+    entity.hass = MagicMock()
+    schedule = MagicMock()
+    with patch.object(entity, "async_schedule_update_ha_state", schedule):
+        asyncio.run(entity.async_added_to_hass())
+    return schedule
+
+
+def test_startup_serves_the_cached_release_without_asking_github() -> None:
+    """A restart should not spend the rate limit on an answer already known."""
+    entity = _update_entity(_store({"etag": 'W/"abc"', "tag_name": "v2.37.0"}))
+
+    schedule = _added(entity)
+
+    assert entity.latest_version == "2.37.0"
+    schedule.assert_not_called()
+
+
+def test_startup_without_a_cache_asks_github() -> None:
+    """Otherwise the entity would be unknown until the first hourly poll."""
+    entity = _update_entity()
+
+    schedule = _added(entity)
+
+    schedule.assert_called_once_with(force_refresh=True)
+
+
+def test_release_and_etag_are_persisted() -> None:
+    """What the next run needs to ask conditionally and to start warm."""
+    store = _store()
+    entity = _update_entity(store)
+    _added(entity)
+
+    _updated(entity, _github_returning({"tag_name": "v2.37.0"}, etag='W/"abc"'))
+
+    store.async_save.assert_awaited_once_with(
+        {"etag": 'W/"abc"', "tag_name": "v2.37.0"}
+    )
+
+
+def test_request_is_conditional_once_an_etag_is_known() -> None:
+    """A 304 keeps the cached release and costs nothing against the limit."""
+    store = _store({"etag": 'W/"abc"', "tag_name": "v2.37.0"})
+    entity = _update_entity(store)
+    _added(entity)
+    session = _github_returning(None, status=HTTPStatus.NOT_MODIFIED)
+
+    _updated(entity, session)
+
+    assert session.sent_headers[0]["If-None-Match"] == 'W/"abc"'
+    assert entity.latest_version == "2.37.0"
+    store.async_save.assert_not_called()
+
+
+def test_changed_release_replaces_the_cache() -> None:
+    """A new release answers 200 with a new ETag, which is kept from then on."""
+    store = _store({"etag": 'W/"abc"', "tag_name": "v2.37.0"})
+    entity = _update_entity(store)
+    _added(entity)
+
+    _updated(entity, _github_returning({"tag_name": "v2.38.0"}, etag='W/"def"'))
+
+    assert entity.latest_version == "2.38.0"
+    store.async_save.assert_awaited_once_with(
+        {"etag": 'W/"def"', "tag_name": "v2.38.0"}
+    )